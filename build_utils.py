@@ -83,4 +83,115 @@ def bump_version_patch(with_poetry=True):
             with open(f"{_project_name}/__version__.py", "w") as f:
                 f.writelines(lines)
 
-    print(f"{bcolors.OKGREEN}{bcolors.BOLD}-- Version number bumped to {version_name}!{bcolors.ENDC}")
\ No newline at end of file
+    print(f"{bcolors.OKGREEN}{bcolors.BOLD}-- Version number bumped to {version_name}!{bcolors.ENDC}")
+
+def import_time_benchmark(runs=None, budget_ms=None):
+    """
+    Measures cold start time of ``import rickle`` and ``from rickle.cli import main`` in fresh interpreters.
+    Runs and the budget (in milliseconds) can be set with ``RICKLE_IMPORT_RUNS`` and ``RICKLE_IMPORT_BUDGET_MS``.
+    """
+    import os
+    import statistics
+    import sys
+    import time
+
+    runs = int(runs or os.getenv('RICKLE_IMPORT_RUNS', 10))
+    budget_ms = float(budget_ms or os.getenv('RICKLE_IMPORT_BUDGET_MS', 150))
+    print(f'{bcolors.UNDERLINE}{bcolors.BOLD}{bcolors.HEADER}-- Import time benchmark ({runs} runs){bcolors.ENDC}')
+
+    baseline = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        baseline.append(time.perf_counter() - start)
+    baseline_ms = statistics.median(baseline) * 1000
+
+    within_budget = True
+    for statement in ['import rickle', 'from rickle.cli import main']:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', statement], check=True)
+            timings.append(time.perf_counter() - start)
+        median_ms = statistics.median(timings) * 1000 - baseline_ms
+        colour = bcolors.OKGREEN if median_ms <= budget_ms else bcolors.FAIL
+        within_budget = within_budget and median_ms <= budget_ms
+        print(f"{colour}{statement:<30} {median_ms:8.1f} ms (budget {budget_ms:.0f} ms){bcolors.ENDC}")
+
+    return within_budget
+
+
+def schema_validation_benchmark(records=None):
+    """
+    Measures schema validation throughput (records per second) of a compiled schema on generated records.
+    The number of records can be set with ``RICKLE_SCHEMA_BENCH_RECORDS``.
+    """
+    import os
+    import random
+    import time
+    from rickle.schema import Schema
+
+    records = int(records or os.getenv('RICKLE_SCHEMA_BENCH_RECORDS', 100000))
+    print(f'{bcolors.UNDERLINE}{bcolors.BOLD}{bcolors.HEADER}-- Schema validation benchmark ({records} records){bcolors.ENDC}')
+
+    rng = random.Random(42)
+    data = [{'id': i,
+             'name': f'user-{i}',
+             'score': rng.random(),
+             'active': rng.random() > 0.5,
+             'email': None,
+             'tags': [rng.choice(['a', 'b', 'c']) for _ in range(rng.randint(0, 5))],
+             'address': {'street': 'Main', 'number': rng.randint(1, 100), 'code': f'{rng.randint(1000, 9999)}'}}
+            for i in range(records)]
+    schema = Schema.generate_from_obj(data[0])
+    schema.schema['properties']['address']['properties']['code'] = {'type': 'regex', 'pattern': r'^\d{4}$'}
+
+    start = time.perf_counter()
+    validate = schema.compile()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    passed = sum(1 for record in data if validate(record))
+    elapsed = time.perf_counter() - start
+
+    print(f"{bcolors.OKGREEN}compile {compile_ms:8.3f} ms{bcolors.ENDC}")
+    print(f"{bcolors.OKGREEN}validate {records / elapsed:12,.0f} records/s ({passed} passed){bcolors.ENDC}")
+    return passed == records
+
+
+def flat_dict_benchmark(leaves=None):
+    """
+    Measures ``flatten_dict``, ``iter_flatten`` and ``inflate_dict`` on a generated tree of nested dictionaries and
+    lists.
+    The number of leaves can be set with ``RICKLE_FLAT_BENCH_LEAVES``.
+    """
+    import os
+    import time
+    from rickle.tools import flatten_dict, iter_flatten, inflate_dict
+
+    leaves = int(leaves or os.getenv('RICKLE_FLAT_BENCH_LEAVES', 1000000))
+    print(f'{bcolors.UNDERLINE}{bcolors.BOLD}{bcolors.HEADER}-- Flat dictionary benchmark ({leaves} leaves){bcolors.ENDC}')
+
+    # 100 sections of 100 items, each item with a few values and a list
+    items = max(1, leaves // 10000)
+    tree = {f'section_{s}': [{'name': f'item-{i}', 'port': i, 'enabled': True, 'ratio': 0.5,
+                              'tags': ['a', 'b', 'c', 'd', 'e']}
+                             for i in range(items)]
+            for s in range(100)}
+    tree = {f'group_{g}': tree for g in range(10)}
+
+    start = time.perf_counter()
+    flat = flatten_dict(tree, path_sep='.')
+    elapsed = time.perf_counter() - start
+    print(f"{bcolors.OKGREEN}flatten_dict {len(flat) / elapsed:12,.0f} leaves/s ({len(flat)} leaves){bcolors.ENDC}")
+
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_flatten(tree, path_sep='.'))
+    elapsed = time.perf_counter() - start
+    print(f"{bcolors.OKGREEN}iter_flatten {count / elapsed:12,.0f} leaves/s{bcolors.ENDC}")
+
+    start = time.perf_counter()
+    inflated = inflate_dict(flat, path_sep='.')
+    elapsed = time.perf_counter() - start
+    print(f"{bcolors.OKGREEN}inflate_dict {len(flat) / elapsed:12,.0f} keys/s{bcolors.ENDC}")
+    return count == len(flat) and inflated == tree
@@ -9,19 +9,16 @@ from io import TextIOWrapper, BytesIO, StringIO
 import yaml
 import base64
 import re
-import inspect
+import threading
+import types
+from abc import ABC, abstractmethod
+import weakref
+import datetime
+import hashlib
 from functools import partial
-import uuid
 import sys
 from pathlib import Path
-import importlib.util
 import configparser
-import tomli_w as tomlw
-
-try:
-    import requests
-except ModuleNotFoundError as exc:
-    warnings.warn(f"The module requests is not installed. This will break API calls.")
 
 if sys.version_info < (3, 11):
     import tomli as toml
@@ -29,10 +26,312 @@ else:
     import tomllib as toml
 
 from rickle.tools import toml_null_stripper, inflate_dict, flatten_dict, parse_ini, unparse_ini, supported_encodings, \
-    generate_random_value, object_to_dict
+    generate_random_value, object_to_dict, http_fetch, fetch_secret, fetch_secrets, access_key_fingerprint, \
+    ColumnarTable, CSVRowStream, is_available
 
 yaml.add_representer(OrderedDict, lambda dumper, data: dumper.represent_mapping('tag:yaml.org,2002:map', data.items()))
 
+# Secrets fetched for the document being internalized, shared by its nested nodes
+_prefetched_secrets = threading.local()
+
+
+def _http_options(init_args: dict) -> dict:
+    return {
+        'pool_size': init_args.get('RICKLE_HTTP_POOL_SIZE', None),
+        'max_retries': init_args.get('RICKLE_HTTP_RETRIES', None),
+        'backoff_factor': init_args.get('RICKLE_HTTP_BACKOFF', None),
+        'timeout': init_args.get('RICKLE_HTTP_TIMEOUT', None),
+        'conditional': init_args.get('RICKLE_HTTP_CONDITIONAL', True),
+    }
+
+def _child_args(init_args: dict, load_lambda: bool, deep: bool) -> dict:
+    args = copy.copy(init_args)
+    args['load_lambda'] = load_lambda
+    args['deep'] = deep
+    return args
+
+def _load_file(init_args: dict,
+               file_path: str,
+               load_as_rick: bool = False,
+               deep: bool = False,
+               load_lambda: bool = False,
+               is_binary: bool = False,
+               encoding: str = 'utf-8'):
+    if load_as_rick and not is_binary:
+        return Rickle(file_path, **_child_args(init_args, load_lambda, deep))
+    if is_binary:
+        with open(file_path, 'rb') as fn:
+            return fn.read()
+    with open(file_path, 'r', encoding=encoding) as fn:
+        return fn.read()
+
+def _load_api(init_args: dict,
+              url: str,
+              http_verb: str = 'GET',
+              headers: dict = None,
+              params: dict = None,
+              body: dict = None,
+              load_as_rick: bool = False,
+              deep: bool = False,
+              load_lambda: bool = False,
+              expected_http_status: int = 200):
+    status_code, resp_input = http_fetch(url=url,
+                                         http_verb=http_verb,
+                                         headers=headers,
+                                         params=params,
+                                         body=body,
+                                         **_http_options(init_args))
+
+    if status_code != expected_http_status:
+        raise ValueError(f'Unexpected HTTP status code in response {status_code}')
+    if load_as_rick:
+        return Rickle(resp_input, **_child_args(init_args, load_lambda, deep))
+    return resp_input
+
+def _resolve_access_key(provider_access_key: Union[str, dict, None]) -> dict:
+    if isinstance(provider_access_key, str):
+        return Rickle(provider_access_key).dict()
+    if provider_access_key is None:
+        return dict()
+    return provider_access_key
+
+def _secret_cache_ttl(init_args: dict) -> float:
+    return float(init_args.get('RICKLE_SECRET_CACHE_TTL', os.getenv('RICKLE_SECRET_CACHE_TTL', 0)))
+
+def _load_secret(init_args: dict,
+                 secret_id: str,
+                 provider: str,
+                 provider_access_key: Union[str, dict],
+                 secret_version: str = None,
+                 load_as_rick: bool = False,
+                 deep: bool = False,
+                 load_lambda: bool = False,
+                 prefetched: dict = None):
+    provider = provider.strip().lower()
+    provider_access_key = _resolve_access_key(provider_access_key)
+
+    prefetch_key = (provider, access_key_fingerprint(provider_access_key), secret_id)
+    if prefetched and not secret_version and prefetch_key in prefetched:
+        secret = prefetched[prefetch_key]
+    else:
+        secret = fetch_secret(provider=provider,
+                              provider_access_key=provider_access_key,
+                              secret_id=secret_id,
+                              secret_version=secret_version,
+                              ttl=_secret_cache_ttl(init_args))
+
+    if load_as_rick and not isinstance(secret, (bytes, bytearray)):
+        return Rickle(secret, **_child_args(init_args, load_lambda, deep))
+    return secret
+
+
+class HotLoad(ABC):
+    """
+    Base for hot loaded members. The arguments are checked once when the member is added; every call loads the value.
+    Hot loaded members hold plain data only, so they can be inspected (``kwargs``) and pickled.
+    """
+    __slots__ = ('kwargs', 'init_args')
+
+    def __init__(self, init_args: dict = None, **kwargs):
+        self.kwargs = kwargs
+        self.init_args = dict(init_args) if init_args else dict()
+
+    @abstractmethod
+    def __call__(self, **kwargs):
+        """
+        Load the value.
+        """
+
+    def __getstate__(self):
+        return self.kwargs, self.init_args
+
+    def __setstate__(self, state):
+        self.kwargs, self.init_args = state
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.kwargs})"
+
+
+class HotFile(HotLoad):
+    """
+    Hot loaded file member.
+    """
+    __slots__ = ()
+
+    def __call__(self):
+        return _load_file(self.init_args, **self.kwargs)
+
+
+class HotAPI(HotLoad):
+    """
+    Hot loaded API member. Headers, params, and body can be overridden per call.
+    """
+    __slots__ = ()
+
+    def __call__(self, headers: dict = None, params: dict = None, body: dict = None):
+        kwargs = dict(self.kwargs)
+        if headers is not None:
+            kwargs['headers'] = headers
+        if params is not None:
+            kwargs['params'] = params
+        if body is not None:
+            kwargs['body'] = body
+        return _load_api(self.init_args, **kwargs)
+
+
+class HotSecret(HotLoad):
+    """
+    Hot loaded secret member.
+    """
+    __slots__ = ()
+
+    def __call__(self):
+        return _load_secret(self.init_args, **self.kwargs)
+
+
+class HotRandomValue(HotLoad):
+    """
+    Hot loaded random value member.
+    """
+    __slots__ = ()
+
+    def __call__(self):
+        return generate_random_value(**self.kwargs)
+
+
+def _flat_members(node, serialised: bool):
+    # Children of a node as (key or index, value) pairs and whether they are list indices, None for leaf values
+    if isinstance(node, BaseRickle):
+        if node._input_type == 'array':
+            return enumerate(node.__list__), True
+        return node._items(serialised=serialised), False
+    if isinstance(node, dict):
+        return node.items(), False
+    if isinstance(node, list):
+        return enumerate(node), True
+    return None, False
+
+def _iter_flat(node, prefix: str, path_sep: str, list_brackets: tuple, serialised: bool):
+    opening, closing = list_brackets
+    members, is_list = _flat_members(node, serialised)
+    for key, value in members:
+        path = f'{prefix}{opening}{key}{closing}' if is_list else f'{prefix}{key}'
+        if isinstance(value, (BaseRickle, dict, list)):
+            yield from _iter_flat(value, f'{path}{path_sep}', path_sep, list_brackets, serialised)
+        else:
+            yield path, value
+
+def _iter_flat_diff(node, other, prefix: str, path_sep: str, list_brackets: tuple, serialised: bool):
+    opening, closing = list_brackets
+    members, is_list = _flat_members(node, serialised)
+    other_members, other_is_list = _flat_members(other, serialised)
+    other_members = dict(other_members)
+    if is_list != other_is_list:
+        # A list replaced by a mapping or vice versa
+        for path, _ in _iter_flat(other, prefix, path_sep, list_brackets, serialised):
+            yield 'delete', path, None
+        for path, value in _iter_flat(node, prefix, path_sep, list_brackets, serialised):
+            yield 'put', path, value
+        return
+
+    containers = (BaseRickle, dict, list)
+    for key, value in members:
+        path = f'{prefix}{opening}{key}{closing}' if is_list else f'{prefix}{key}'
+        missing = key not in other_members
+        other_value = other_members.pop(key, None)
+        if not missing and isinstance(other_value, containers):
+            if isinstance(value, containers):
+                yield from _iter_flat_diff(value, other_value, f'{path}{path_sep}', path_sep, list_brackets, serialised)
+                continue
+            for other_path, _ in _iter_flat(other_value, f'{path}{path_sep}', path_sep, list_brackets, serialised):
+                yield 'delete', other_path, None
+            missing = True
+        elif isinstance(value, containers):
+            if not missing:
+                yield 'delete', path, None
+            for new_path, new_value in _iter_flat(value, f'{path}{path_sep}', path_sep, list_brackets, serialised):
+                yield 'put', new_path, new_value
+            continue
+        if missing or type(value) is not type(other_value) or value != other_value:
+            yield 'put', path, value
+
+    for key, other_value in other_members.items():
+        path = f'{prefix}{opening}{key}{closing}' if is_list else f'{prefix}{key}'
+        if isinstance(other_value, containers):
+            for other_path, _ in _iter_flat(other_value, f'{path}{path_sep}', path_sep, list_brackets, serialised):
+                yield 'delete', other_path, None
+        else:
+            yield 'delete', path, None
+
+def _plain_value(value, serialised: bool):
+    # Deconstructed copy of a value for patch operations
+    if isinstance(value, BaseRickle):
+        return value.list(serialised=serialised) if value._input_type == 'array' else value.dict(serialised=serialised)
+    if isinstance(value, list):
+        return [_plain_value(element, serialised) for element in value]
+    if isinstance(value, dict):
+        return copy.deepcopy(value)
+    return value
+
+def _hash_entries(kind: str, entries) -> str:
+    # Entries are representations, which do not contain line breaks
+    return hashlib.sha256('\n'.join([kind, *entries]).encode('utf-8')).hexdigest()
+
+# Values that can only change by being replaced, which the owning node notices
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes,
+                    datetime.date, datetime.time, datetime.timedelta)
+
+def _digest_token(value, serialised: bool, owner=None) -> tuple:
+    # Digest of containers, typed representation of other values, and whether the value is clean: it can not change
+    # without the nodes holding it noticing, so that their digests can be cached
+    if isinstance(value, BaseRickle):
+        return value._digest(serialised=serialised, parent=owner)
+    if isinstance(value, dict):
+        tokens = [(k, _digest_token(v, serialised, owner)) for k, v in value.items()]
+        return _hash_entries('map', sorted(f'{k!r}:{token}' for k, (token, _) in tokens)), False
+    if isinstance(value, list):
+        tokens = [_digest_token(v, serialised, owner) for v in value]
+        return _hash_entries('list', (token for token, _ in tokens)), False
+    return f'{type(value).__name__}:{value!r}', isinstance(value, _IMMUTABLE_TYPES)
+
+def _diff(node, other, path: str, path_sep: str, serialised: bool, ops: list):
+    # Operations turning node into other, both mappings or both lists
+    members, is_list = _flat_members(node, serialised)
+    other_members = dict(_flat_members(other, serialised)[0])
+    containers = (BaseRickle, dict, list)
+    prefix = path if path.endswith(path_sep) else f'{path}{path_sep}'
+
+    length = 0
+    removed = list()
+    for key, value in members:
+        length += 1
+        member_path = f'{prefix}[{key}]' if is_list else f'{prefix}{key}'
+        if key not in other_members:
+            removed.append(member_path)
+            continue
+        other_value = other_members.pop(key)
+        if value is other_value:
+            continue
+        if isinstance(value, BaseRickle) and isinstance(other_value, BaseRickle):
+            # Digests of nodes holding lists, dictionaries or other mutable values could be stale
+            digest, clean = value._digest(serialised=serialised)
+            other_digest, other_clean = other_value._digest(serialised=serialised)
+            if clean and other_clean and digest == other_digest:
+                continue
+        if isinstance(value, containers) and isinstance(other_value, containers) and \
+                _flat_members(value, serialised)[1] == _flat_members(other_value, serialised)[1]:
+            _diff(value, other_value, member_path, path_sep, serialised, ops)
+        elif type(value) is not type(other_value) or value != other_value:
+            ops.append({'op': 'replace', 'path': member_path, 'value': _plain_value(other_value, serialised)})
+
+    # List elements are removed from the end, so that the indices of the preceding elements hold
+    for member_path in reversed(removed) if is_list else removed:
+        ops.append({'op': 'remove', 'path': member_path})
+    for key, other_value in other_members.items():
+        member_path = f'{prefix}[{key}]' if is_list else f'{prefix}{key}'
+        ops.append({'op': 'add', 'path': member_path, 'value': _plain_value(other_value, serialised)})
+
+
 class BaseRickle:
     """
         A base class that creates internal structures from embedded structures.
@@ -100,14 +399,13 @@ class BaseRickle:
                 try:
                     parsed = parse_url(base)
                     if all([parsed.scheme, parsed.host]):
-                        response = requests.get(url=base.strip(), )
-                        if response.status_code == 200:
-                            _d = response.json()
+                        status_code, _d = http_fetch(url=base.strip(), as_json=True, **self._http_options())
+                        if status_code == 200:
                             self._input_type = "url"
                             return _d
                         else:
-                            sys.stderr.write(f"Non-200 status {response.status_code} returned for URL {base}")
-                            raise ValueError(f"Non-200 status {response.status_code} returned for URL {base}")
+                            sys.stderr.write(f"Non-200 status {status_code} returned for URL {base}")
+                            raise ValueError(f"Non-200 status {status_code} returned for URL {base}")
                 except:
                     pass
             except (ImportError, ModuleNotFoundError):
@@ -183,7 +481,7 @@ class BaseRickle:
                 error_list.append(f"INI: {exc}")
         if file_ext == ".env":
             try:
-                if importlib.util.find_spec('dotenv'):
+                if is_available('dotenv'):
                     from io import StringIO
                     from dotenv import dotenv_values
 
@@ -195,7 +493,7 @@ class BaseRickle:
                 error_list.append(f"ENV: {exc}")
         if file_ext == ".xml":
             try:
-                if importlib.util.find_spec('xmltodict'):
+                if is_available('xmltodict'):
                     import xmltodict
 
                     _d = xmltodict.parse(stringed, process_namespaces=init_args.get('process_namespaces', False))
@@ -253,7 +551,7 @@ class BaseRickle:
         except Exception as exc:
             error_list.append(f"INI: {exc}")
         try:
-            if importlib.util.find_spec('dotenv'):
+            if is_available('dotenv'):
                 from io import StringIO
                 from dotenv import dotenv_values
 
@@ -264,7 +562,7 @@ class BaseRickle:
         except Exception as exc:
             error_list.append(f"ENV: {exc}")
         try:
-            if importlib.util.find_spec('xmltodict'):
+            if is_available('xmltodict'):
                 import xmltodict
 
                 _d = xmltodict.parse(stringed, process_namespaces=init_args.get('process_namespaces', False))
@@ -279,6 +577,9 @@ class BaseRickle:
 
         raise ValueError("Unable to infer data type")
 
+    def _http_options(self):
+        return _http_options(self._init_args)
+
     def _iternalize(self, obj: Union[dict, list], deep: bool, **init_args):
         if isinstance(obj, dict):
             for k, v in obj.items():
@@ -316,6 +617,7 @@ class BaseRickle:
         self._name_cleanup = init_args.get('RICKLE_NAME_CLEAN_UP', os.getenv("RICKLE_NAME_CLEAN_UP", True))
 
         self._init_args = init_args
+        self._source_path = None
 
         if base is None:
             return
@@ -333,6 +635,8 @@ class BaseRickle:
         if isinstance(base, str):
             _d = self.__create_dict_from_string(base, **init_args)
             self._iternalize(_d, deep=deep, **init_args)
+            if os.path.isfile(base):
+                self._source_path = base
 
         if isinstance(base, list):
             _l = list()
@@ -363,6 +667,126 @@ class BaseRickle:
     def __eq__(self, other):
         raise NotImplementedError("Removed since version 1.2.3")
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # Digests are recomputed when needed, and weak references can not be pickled
+        state.pop('_digests', None)
+        state.pop('_digest_parents', None)
+        # Functions created from source can not be pickled, they are rebuilt from the meta info instead
+        for key, meta in self._meta_info.items():
+            if meta.get('type') == 'add_python':
+                state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for key, meta in self._meta_info.items():
+            if meta.get('type') == 'add_python':
+                self.add_python(name=meta['name'],
+                                load=meta['load'],
+                                args=meta['args'],
+                                imports=meta['import'],
+                                is_method=meta['is_method'])
+
+    def to_shared_memory(self, name: str = None):
+        """
+        Export the object to a block of shared memory, so that other processes can attach to it without reading and
+        parsing the sources again (or fetching secrets and API responses again).
+
+        Notes:
+            The object is stored in the indexed format of ``rickle.snapshot.MappedRickle``, which the workers read in
+            place: every process shares the one copy, and values are only decoded when accessed. Only plain data is
+            stored, hot loaded members are left out, and values that could only be stored pickled raise TypeError.
+            The shared memory block stays allocated until ``unlink`` is called on the returned object. Typically the
+            parent process exports the object, starts the workers, and unlinks the block when the workers are done.
+
+        Args:
+            name (str): Name of the shared memory block, if None a random name is given (default = None).
+
+        Returns:
+            SharedMemory: The shared memory block, ``name`` is passed on to ``from_shared_memory``.
+        """
+        from multiprocessing import shared_memory
+        from rickle.snapshot import encode_mapped
+
+        encoded = encode_mapped(self)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=len(encoded))
+        shm.buf[:len(encoded)] = encoded
+        return shm
+
+    @staticmethod
+    def from_shared_memory(name: str):
+        """
+        Attach to an object that was exported with ``to_shared_memory``, see ``MappedRickle.from_shared_memory``.
+
+        Args:
+            name (str): Name of the shared memory block.
+
+        Returns:
+            MappedRickle: The read-only object, ``close`` it to detach from the block.
+        """
+        from rickle.snapshot import MappedRickle
+
+        return MappedRickle.from_shared_memory(name)
+
+    def save_snapshot(self, path: str, source: str = None, mapped: bool = False):
+        """
+        Save the object to a binary snapshot file, which loads much faster than parsing the source again.
+
+        Notes:
+            With ``mapped`` an indexed snapshot is written instead, which is opened read-only with
+            ``rickle.snapshot.MappedRickle``. Only the deserialised ``dict`` is stored, hot loaded members are left out.
+
+        Args:
+            path (str): Snapshot file path.
+            source (str): Source file used to invalidate the snapshot, defaults to the file the object was loaded from (default = None).
+            mapped (bool): Write an indexed snapshot for memory mapping (default = False).
+        """
+        from rickle.snapshot import write_snapshot, write_mapped_snapshot
+
+        source = source if source else self._source_path
+        if mapped:
+            write_mapped_snapshot(self, path, source=source)
+        else:
+            write_snapshot(self, path, source=source)
+
+    @classmethod
+    def load_snapshot(cls, path: str, source: str = None, **init_args):
+        """
+        Load an object from a snapshot file. If the snapshot is missing or out of date (the source file changed, or it was
+        written by another version) it is rebuilt from the source and saved again.
+
+        Notes:
+            Snapshots are pickles. ``Rickle`` only unpickles its own classes and plain data, ``UnsafeRickle`` unpickles
+            anything (including its Python functions), so only load snapshots that you wrote yourself with it.
+
+        Args:
+            path (str): Snapshot file path.
+            source (str): Source file, if None the source recorded in the snapshot is used (default = None).
+            **init_args (kw_args): Arguments used when the object has to be rebuilt from the source.
+
+        Returns:
+            BaseRickle: The object.
+        """
+        from rickle.snapshot import read_snapshot, read_snapshot_header
+
+        obj = read_snapshot(path, source=source, trusted=issubclass(cls, UnsafeRickle), classes=(cls,))
+        if obj is not None:
+            if not isinstance(obj, cls):
+                raise TypeError(f"Snapshot '{path}' holds {type(obj).__name__}, not {cls.__name__}")
+            return obj
+
+        if source is None and Path(path).is_file():
+            header = read_snapshot_header(path)
+            if header:
+                source = header.get('source')
+        if source is None:
+            raise ValueError(f"Snapshot '{path}' is missing or out of date, and no source to rebuild it from")
+
+        obj = cls(source, **init_args)
+        obj.save_snapshot(path, source=source)
+        return obj
+
     def __len__(self):
         if self._input_type == 'array':
             return len(self.__list__)
@@ -408,6 +832,7 @@ class BaseRickle:
             self.__list__[key] = value
         else:
             raise TypeError("Key can only be of case sensitive string type or if created from list, an integer index!")
+        self._invalidate_digest()
 
     def __delitem__(self, key):
         if key is None:
@@ -418,6 +843,17 @@ class BaseRickle:
             del self.__list__[key]
         else:
             raise TypeError("Key can only be of case sensitive string type or if created from list, an integer index!")
+        self._invalidate_digest()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith('_'):
+            self._invalidate_digest()
+
+    def __delattr__(self, name):
+        super().__delattr__(name)
+        if not name.startswith('_'):
+            self._invalidate_digest()
 
     def __contains__(self, key):
         return key in self.dict()
@@ -606,11 +1042,14 @@ class BaseRickle:
 
         return current_node
 
+    def _add_member(self, name, value):
+        # Members added after the object was created change its digest
+        self.__dict__.update({name: value})
+        self._invalidate_digest()
+
     def _eval_name(self, name):
-        if str(name).__contains__(self.__class__.__name__) or str(name).endswith('__n') or str(name).startswith('_'):
-            return True
-        else:
-            return False
+        name = str(name)
+        return name.startswith('_') or name.endswith('__n') or self.__class__.__name__ in name
 
     def _check_kw(self, name):
         if self._strict and name in dir(self):
@@ -823,6 +1262,7 @@ class BaseRickle:
             raise KeyError(f'Function params "{path_list[-1]}" included in path!')
 
         del current_node.__dict__[path_list[-1]]
+        current_node._invalidate_digest()
 
     def values(self):
         """
@@ -850,6 +1290,15 @@ class BaseRickle:
 
         return keys
 
+    def _items(self, serialised: bool = False):
+        """
+        Yields the members of this node as they are given by ``dict``, without deconstructing nested nodes.
+        """
+        for key, value in self.__dict__.items():
+            if self._eval_name(key) or str(key).endswith('_meta_info'):
+                continue
+            yield self._keys_map.get(key, key), value
+
     def dict(self, serialised: bool = False):
         """
         Deconstructs the whole object into a Python dictionary.
@@ -864,14 +1313,9 @@ class BaseRickle:
             dict: of object.
         """
         d = dict()
-        for key, value in self.__dict__.items():
-            actual_key = key
-            if key in self._keys_map.keys():
-                actual_key = self._keys_map[key]
-            if self._eval_name(key) or str(key).endswith('_meta_info'):
-                continue
-            if isinstance(value, BaseRickle) or isinstance(value, Rickle):
-                d[actual_key] = value.dict(serialised=serialised)
+        for key, value in self._items(serialised=serialised):
+            if isinstance(value, BaseRickle):
+                d[key] = value.dict(serialised=serialised)
             elif isinstance(value, list):
                 new_list = list()
                 for element in value:
@@ -879,9 +1323,9 @@ class BaseRickle:
                         new_list.append(element.dict(serialised=serialised))
                     else:
                         new_list.append(element)
-                d[actual_key] = new_list
+                d[key] = new_list
             else:
-                d[actual_key] = value
+                d[key] = value
         return d
 
     def list(self, serialised: bool = False):
@@ -899,6 +1343,272 @@ class BaseRickle:
         """
         return [_d.dict(serialised=serialised) for _d in self.__list__]
 
+    def iter_flat(self, path_sep: str = None, prefix: str = None, list_brackets: tuple = ('[', ']'),
+                  serialised: bool = False):
+        """
+        Lazily yields every leaf value with its flat path, walking the nodes directly instead of deconstructing into
+        a dictionary first. Useful to push into key-value stores like etcd or Consul.
+
+        Notes:
+            With the defaults, paths are document paths like '/servers/[0]/host' that can be used with ``get``.
+            Empty dictionaries and lists have no leaves and are not given.
+
+        Args:
+            path_sep (str): Path separator (default = RICKLE_PATH_SEP or '/').
+            prefix (str): Prepended to every path, for example '/config/app/' (default = path separator).
+            list_brackets (tuple): Tuple of strings for list index values (default = ('[', ']')).
+            serialised (bool): Give values in serialised (True) form or deserialised (default = False).
+
+        Yields:
+            tuple: str, object.
+        """
+        path_sep = path_sep or self._path_sep
+        prefix = path_sep if prefix is None else prefix
+        yield from _iter_flat(self, prefix, path_sep, list_brackets, serialised)
+
+    def iter_flat_diff(self, other, path_sep: str = None, prefix: str = None, list_brackets: tuple = ('[', ']'),
+                       serialised: bool = False):
+        """
+        Lazily yields only the flat paths that changed from ``other`` to this object, as key-value store operations.
+        Both objects are walked together, without deconstructing either into a dictionary.
+
+        Notes:
+            Operations are ``('put', path, value)`` for added or changed values and ``('delete', path, None)`` for
+            values no longer present. Values are compared by type and equality.
+
+        Args:
+            other (BaseRickle): Previous version to compare to.
+            path_sep (str): Path separator (default = RICKLE_PATH_SEP or '/').
+            prefix (str): Prepended to every path (default = path separator).
+            list_brackets (tuple): Tuple of strings for list index values (default = ('[', ']')).
+            serialised (bool): Compare values in serialised (True) form or deserialised (default = False).
+
+        Yields:
+            tuple: operation, path, value.
+        """
+        path_sep = path_sep or self._path_sep
+        prefix = path_sep if prefix is None else prefix
+        yield from _iter_flat_diff(self, other, prefix, path_sep, list_brackets, serialised)
+
+    @classmethod
+    def from_flat(cls, items, path_sep: str = None, prefix: str = None, list_brackets: tuple = ('[', ']'),
+                  **init_args):
+        """
+        Creates an object from flat ``(path, value)`` pairs, for example as given by ``iter_flat`` or read from a
+        key-value store. The pairs are consumed lazily and inserted with ``inflate_dict``.
+
+        Args:
+            items (dict, iterable): Dictionary of paths or iterable of ``(path, value)`` pairs.
+            path_sep (str): Path separator (default = RICKLE_PATH_SEP or '/').
+            prefix (str): Stripped from every path (default = path separator).
+            list_brackets (tuple): Tuple of strings for list index values (default = ('[', ']')).
+            **init_args (kw_args): Passed on to the constructor.
+
+        Raises:
+            ValueError: If a path does not start with the prefix.
+
+        Returns:
+            BaseRickle: With lists of dictionaries internalized (deep).
+        """
+        path_sep = path_sep or init_args.get('RICKLE_PATH_SEP', os.getenv("RICKLE_PATH_SEP", "/"))
+        prefix = path_sep if prefix is None else prefix
+
+        def strip_prefix():
+            for path, value in (items.items() if isinstance(items, dict) else items):
+                if not path.startswith(prefix):
+                    raise ValueError(f'Path {path} does not start with {prefix}')
+                yield path[len(prefix):], value
+
+        init_args.setdefault('deep', True)
+        return cls(inflate_dict(strip_prefix(), path_sep=path_sep, list_brackets=list_brackets), **init_args)
+
+    def diff(self, other, serialised: bool = False):
+        """
+        Compares to another object and gives the operations that turn this object into the other, in the style of
+        JSON Patch (RFC 6902) but with document paths like '/servers/[0]/host'.
+
+        Notes:
+            Operations are dictionaries with ``op`` (add, remove or replace), ``path`` and ``value`` (not for remove).
+            Both objects are walked together and only differing members are given. Nested nodes with equal cached
+            digests are skipped, so repeated comparisons take time proportional to the change; nodes holding lists,
+            dictionaries or other mutable values have no cached digest and are always compared. List elements are
+            compared by index; elements removed from the end are given last to first and new elements are added in
+            order.
+
+        Args:
+            other (BaseRickle): Object to compare to.
+            serialised (bool): Compare in serialised (True) form or deserialised (default = False).
+
+        Raises:
+            ValueError: If only one of the objects is of type 'array'.
+
+        Returns:
+            list: Operations, to be used with ``apply_patch``.
+        """
+        if (self._input_type == 'array') != (other._input_type == 'array'):
+            raise ValueError('Can not compare an array to a mapping')
+        ops = list()
+        _diff(self, other, self._path_sep, self._path_sep, serialised, ops)
+        return ops
+
+    def _stored_key(self, key: str):
+        # Member name of a key that might have been cleaned up
+        for stored_key, actual_key in self._keys_map.items():
+            if actual_key == key:
+                return stored_key
+        return key
+
+    def _patch_target(self, path: str):
+        # Node owning the container holding the last path segment, the container, and that segment as key or list index
+        if not path.startswith(self._path_sep) or path == self._path_sep:
+            raise KeyError(f'Invalid patch path {path}')
+        segments = path[len(self._path_sep):].split(self._path_sep)
+
+        def resolve(container, segment):
+            index_match = re.fullmatch(r'\[(\d+)\]', segment)
+            if isinstance(container, BaseRickle) and container._input_type == 'array':
+                container = container.__list__
+            if index_match and isinstance(container, list):
+                return container, int(index_match.group(1))
+            if isinstance(container, BaseRickle):
+                return container, container._stored_key(segment)
+            if isinstance(container, dict):
+                return container, segment
+            raise KeyError(f'The path {path} could not be traversed')
+
+        owner = current = self
+        for segment in segments[:-1]:
+            container, key = resolve(current, segment)
+            try:
+                current = container.__dict__[key] if isinstance(container, BaseRickle) else container[key]
+            except (KeyError, IndexError):
+                raise KeyError(f'The path {path} could not be traversed')
+            if isinstance(current, BaseRickle):
+                owner = current
+        return (owner, ) + resolve(current, segments[-1])
+
+    def apply_patch(self, ops: list):
+        """
+        Applies operations as given by ``diff`` in place.
+
+        Notes:
+            Operations are applied in order; if one fails, the preceding operations stay applied.
+            Dictionary values are added as new objects of this class, as with ``put``.
+
+        Args:
+            ops (list): Operations with ``op`` (add, remove or replace), ``path`` and ``value``.
+
+        Raises:
+            KeyError: If a path can not be traversed, or the member to remove or replace does not exist.
+            ValueError: If the operation is not supported.
+        """
+        for op in ops:
+            if op['op'] not in ('add', 'remove', 'replace'):
+                raise ValueError(f"Unsupported patch operation {op['op']}")
+
+            owner, container, key = self._patch_target(op['path'])
+            value = op.get('value')
+            if isinstance(value, dict):
+                value = self.__class__(value)
+
+            if isinstance(container, list):
+                if op['op'] == 'add':
+                    if key > len(container):
+                        raise KeyError(f"The path {op['path']} is past the end of the list")
+                    container.insert(key, value)
+                elif key >= len(container):
+                    raise KeyError(f"The path {op['path']} does not exist")
+                elif op['op'] == 'remove':
+                    del container[key]
+                else:
+                    container[key] = value
+            elif isinstance(container, BaseRickle):
+                if op['op'] != 'add' and key not in container.__dict__:
+                    raise KeyError(f"The path {op['path']} does not exist")
+                if op['op'] == 'remove':
+                    del container.__dict__[key]
+                    container._meta_info.pop(key, None)
+                elif key in container.__dict__:
+                    container[key] = value
+                    if container._meta_info.get(key, {}).get('type') == 'attribute':
+                        container._meta_info[key]['value'] = value
+                else:
+                    container.add(key, value)
+            else:
+                if op['op'] != 'add' and key not in container:
+                    raise KeyError(f"The path {op['path']} does not exist")
+                if op['op'] == 'remove':
+                    del container[key]
+                else:
+                    container[key] = value
+            owner._invalidate_digest()
+
+    def _digest(self, serialised: bool = False, parent=None) -> tuple:
+        # Digest, and whether it is clean (see _digest_token). Only clean digests are cached
+        if parent is not None:
+            # A node can be shared by several parents, all of them are invalidated
+            parents = self.__dict__.setdefault('_digest_parents', list())
+            if not any(ref() is parent for ref in parents):
+                parents[:] = [ref for ref in parents if ref() is not None]
+                parents.append(weakref.ref(parent))
+        digests = self.__dict__.setdefault('_digests', dict())
+        if serialised in digests:
+            return digests[serialised], True
+
+        if self._input_type == 'array':
+            tokens = [_digest_token(v, serialised, self) for v in self.__list__]
+            digest = _hash_entries('list', (token for token, _ in tokens))
+        else:
+            tokens = [(k, _digest_token(v, serialised, self)) for k, v in self._items(serialised=serialised)]
+            digest = _hash_entries('map', sorted(f'{k!r}:{token}' for k, (token, _) in tokens))
+            tokens = [token for _, token in tokens]
+        clean = all(token_clean for _, token_clean in tokens)
+        if clean:
+            digests[serialised] = digest
+        return digest, clean
+
+    def _invalidate_digest(self):
+        # Drop the cached digests of this node and its parents. Parents of a node without cached digests have none
+        # either, as theirs were computed from it
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not node.__dict__.get('_digests'):
+                continue
+            node.__dict__['_digests'] = dict()
+            for ref in node.__dict__.get('_digest_parents', list()):
+                parent = ref()
+                if parent is not None:
+                    stack.append(parent)
+
+    def digest(self, path: str = None, serialised: bool = False) -> str:
+        """
+        Gives a stable content hash (SHA-256 hex digest) of the object, or of the value at a path, for example as an
+        ETag or a cache key for a subtree.
+
+        Notes:
+            Digests are computed bottom-up from the digests of the nested nodes (a Merkle tree) and cached per node.
+            Changing a member (setting, adding or removing it, or ``apply_patch``) drops the cached digests of the
+            node and its parents only, so that only the changed path is hashed again.
+            Lists, dictionaries and other mutable values held by a node can be changed in place without the node
+            noticing, so the digests of such nodes (and their parents) are not cached but computed on every call.
+            Key order does not change the digest. Values other than plain data are hashed by their representation.
+
+        Args:
+            path (str): Path to a node or value (default = None, the object itself).
+            serialised (bool): Hash the serialised (True) form or deserialised (default = False).
+
+        Returns:
+            str: Hex digest.
+        """
+        if path is None or path == self._path_sep:
+            return self._digest(serialised=serialised)[0]
+        value = self(path)
+        token, _ = _digest_token(value, serialised)
+        if isinstance(value, (BaseRickle, dict, list)):
+            return token
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
     def has(self, key: str, deep=False) -> bool:
         """
         Checks whether the key exists in the object.
@@ -1015,6 +1725,8 @@ class BaseRickle:
         else:
             self_as_primitive = toml_null_stripper(self.dict(serialised=serialised))
 
+        import tomli_w as tomlw
+
         if output:
             if isinstance(output, BytesIO):
                 tomlw.dump(self_as_primitive, output)
@@ -1037,7 +1749,7 @@ class BaseRickle:
             Functions and lambdas are always given in serialised form.
             IO stream "output" needs to be BytesIO object
         """
-        if importlib.util.find_spec('xmltodict'):
+        if is_available('xmltodict'):
             import xmltodict
 
             if self._input_type == "array":
@@ -1131,7 +1843,7 @@ class BaseRickle:
             value (any): Value of new key.
         """
         name = self._check_kw(name)
-        self.__dict__.update({name: value})
+        self._add_member(name, value)
         self._meta_info[name] = {'type': 'attribute', 'value': value}
 
 class Rickle(BaseRickle):
@@ -1150,6 +1862,13 @@ class Rickle(BaseRickle):
     """
 
     def _iternalize(self, obj: dict, deep: bool, **init_args):
+        if getattr(_prefetched_secrets, 'secrets', None) is None:
+            # Only at the root, nested nodes are created while the secrets are set
+            _prefetched_secrets.secrets = self._prefetch_secrets(obj, deep=deep)
+            try:
+                return self._iternalize(obj, deep=deep, **init_args)
+            finally:
+                _prefetched_secrets.secrets = None
         if isinstance(obj, dict):
             for k, v in obj.items():
                 k = self._check_kw(k)  # Redundant but easier to check twice than to paste 10 times
@@ -1179,7 +1898,11 @@ class Rickle(BaseRickle):
                                               file_path_or_str=v['file_path'],
                                               fieldnames=v.get('fieldnames', None),
                                               load_as_rick=v.get('load_as_rick', False),
-                                              encoding=v.get('encoding', 'utf-8'))
+                                              encoding=v.get('encoding', 'utf-8'),
+                                              columnar=v.get('columnar', False),
+                                              key_column=v.get('key_column', None),
+                                              stream=v.get('stream', False),
+                                              dtypes=v.get('dtypes', None))
                             continue
                         if v['type'] == 'api':
                             self.add_api(name=k,
@@ -1289,7 +2012,7 @@ class Rickle(BaseRickle):
             if current_node is None:
                 raise NameError(f'The path {path} could not be traversed. Alternatively use "get"')
 
-        if self._init_args['load_lambda'] and inspect.isfunction(current_node):
+        if self._init_args['load_lambda'] and isinstance(current_node, (types.FunctionType, HotLoad)):
             try:
                 return current_node(**kwargs)
             except Exception as exc:
@@ -1298,51 +2021,34 @@ class Rickle(BaseRickle):
 
         return current_node
 
-    def dict(self, serialised: bool = False):
+    def _items(self, serialised: bool = False):
         """
-        Deconstructs the whole object into a Python dictionary.
-
-        Args:
-            serialised (bool): Give a Python dictionary in serialised (True) form or deserialised (default = False).
+        Yields the members of this node as they are given by ``dict``, without deconstructing nested nodes.
 
         Notes:
-            Functions and lambdas are always given in serialised form.
-
-        Returns:
-            dict: of object.
+            In serialised form, members with meta information are given as such. Otherwise, members that are only
+            available in serialised form or are hot loaded are skipped.
         """
-        d = dict()
         for key, value in self.__dict__.items():
-            actual_key = key
-            if key in self._keys_map.keys():
-                actual_key = self._keys_map[key]
             if self._eval_name(key):
                 continue
+            actual_key = self._keys_map.get(key, key)
             if serialised and key in self._meta_info.keys():
-                d[actual_key] = self._meta_info[key]
+                yield actual_key, self._meta_info[key]
             # Revisit this at some later point
             elif key in self._meta_info.keys() and \
                     self._meta_info[key]['type'] in ['base64']:
-                # d[actual_key] = self._meta_info[key]
                 continue
             elif key in self._meta_info.keys() and \
                     self._meta_info[key]['type'] in ['file', 'api', 'secret', 'random'] and \
                     self._meta_info[key]['hot_load']:
-                # d[actual_key] = self._meta_info[key]
                 continue
-            elif isinstance(value, BaseRickle):
-                d[actual_key] = value.dict(serialised=serialised)
-            elif isinstance(value, list):
-                new_list = list()
-                for element in value:
-                    if isinstance(element, BaseRickle):
-                        new_list.append(element.dict(serialised=serialised))
-                    else:
-                        new_list.append(element)
-                d[actual_key] = new_list
+            elif isinstance(value, ColumnarTable):
+                yield actual_key, value.dict()
+            elif isinstance(value, (CSVRowStream, HotLoad)):
+                continue
             else:
-                d[actual_key] = value
-        return d
+                yield actual_key, value
 
     def add_random_value(self, name, value_type: str, value_properties: dict = None, hot_load: bool = False):
         """
@@ -1371,17 +2077,11 @@ class Rickle(BaseRickle):
             value_properties = dict()
 
         if hot_load:
-            try:
-                _load = f"""lambda: generate_random_value(value_type='{str(value_type)}',
-                                                        value_properties={value_properties})"""
-
-                self.__dict__.update({name: eval(_load)})
-            except Exception as exc:
-                raise ValueError(f"At 'add_random_value', when trying to add lambda, this happened {exc}")
+            self._add_member(name, HotRandomValue(value_type=value_type, value_properties=value_properties))
         else:
             value = generate_random_value(value_type=value_type, value_properties=value_properties)
 
-            self.__dict__.update({name: value})
+            self._add_member(name, value)
 
         self._meta_info[name] = {'type': 'random',
                                  'value_type': value_type,
@@ -1398,7 +2098,7 @@ class Rickle(BaseRickle):
             default (any): Default to value (default = None).
         """
         name = self._check_kw(name)
-        self.__dict__.update({name: os.getenv(load, default)})
+        self._add_member(name, os.getenv(load, default))
         self._meta_info[name] = {'type': 'env', 'load': load, 'default': default}
 
     def add_base64(self, name, load):
@@ -1411,7 +2111,7 @@ class Rickle(BaseRickle):
         """
         name = self._check_kw(name)
         b = base64.b64decode(load)
-        self.__dict__.update({name: b})
+        self._add_member(name, b)
         self._meta_info[name] = {'type': 'base64',
                                  'load': load
                                  }
@@ -1421,66 +2121,100 @@ class Rickle(BaseRickle):
                      file_path_or_str: str,
                      fieldnames: list = None,
                      load_as_rick: bool = False,
-                     encoding: str = 'utf-8'
+                     encoding: str = 'utf-8',
+                     columnar: bool = False,
+                     key_column: str = None,
+                     stream: bool = False,
+                     dtypes: dict = None
                      ):
         """
         Adds the ability to load CSV data as lists or even a list of Ricks where the column names are the properties.
 
+        Notes:
+            With ``columnar`` the data is loaded as a ``ColumnarTable``, storing each column as a typed array
+            (integer and number columns) instead of a list of rows. Rows can be retrieved by index, or by value of the
+            ``key_column`` through a hash index (``table.lookup(key)``). Column types are inferred unless given by
+            ``dtypes``; values with leading zeros stay strings and empty cells of numeric columns are missing (None).
+
+            With ``stream`` nothing is read up front, the member is a ``CSVRowStream`` that reads rows lazily each time
+            it is iterated over. Rows are dicts when ``load_as_rick`` is set or ``fieldnames`` are given, else lists.
+            Streamed members are left out of ``dict``.
+
         Args:
             name (str): Property name.
             file_path_or_str (str): File path to load from, or CSV string.
             fieldnames (list): Column headers (default = None).
             load_as_rick (bool): If true, loads and creates Rick from source, else loads the contents as text (default = False).
             encoding (str): If text, encoding can be specified (default = 'utf-8').
+            columnar (bool): Load as a columnar table with typed columns (default = False).
+            key_column (str): Column to index for row lookups, only with ``columnar`` (default = None).
+            stream (bool): Read rows lazily on iteration instead of loading the data (default = False).
+            dtypes (dict): Column name to 'integer', 'number' or 'string', only with ``columnar`` (default = None).
 
         """
         name = self._check_kw(name)
+
+        self._meta_info[name] = {'type': 'csv',
+                                 'file_path_or_str': file_path_or_str,
+                                 'load_as_rick': load_as_rick,
+                                 'fieldnames': fieldnames,
+                                 'encoding': encoding,
+                                 'columnar': columnar,
+                                 'key_column': key_column,
+                                 'stream': stream,
+                                 'dtypes': dtypes
+                                 }
+
+        if stream:
+            self._add_member(name, CSVRowStream(file_path_or_str, fieldnames=fieldnames, as_dict=load_as_rick,
+                                                   encoding=encoding))
+            return
+
         import csv
 
         if Path(file_path_or_str).exists():
-            stream = Path(file_path_or_str).open()
+            csv_stream = Path(file_path_or_str).open(encoding=encoding, newline='')
         else:
-            stream = StringIO(file_path_or_str)
+            csv_stream = StringIO(file_path_or_str)
 
 
-        dialect = csv.Sniffer().sniff(stream.read(1024))
-        stream.seek(0)
+        dialect = csv.Sniffer().sniff(csv_stream.read(1024))
+        csv_stream.seek(0)
         l = list()
 
-        if load_as_rick:
-            csv_file = csv.DictReader(stream, fieldnames=fieldnames, dialect=dialect)
+        if columnar:
+            table = ColumnarTable.from_rows(csv.reader(csv_stream, dialect=dialect), fieldnames=fieldnames,
+                                            key_column=key_column, dtypes=dtypes)
+            self._add_member(name, table)
+        elif load_as_rick:
+            csv_file = csv.DictReader(csv_stream, fieldnames=fieldnames, dialect=dialect)
 
             for row in csv_file:
                 l.append(dict(row))
 
             self._iternalize({name: l}, deep=True)
+            self._invalidate_digest()
         elif not fieldnames is None:
 
             columns = {c: list() for c in fieldnames}
 
-            csv_file = csv.DictReader(stream, fieldnames=fieldnames, dialect=dialect)
+            csv_file = csv.DictReader(csv_stream, fieldnames=fieldnames, dialect=dialect)
 
             for row in csv_file:
                 for k, v in row.items():
                     columns[k].append(v)
 
             self._iternalize({name: columns}, deep=False)
+            self._invalidate_digest()
         else:
-            csv_file = csv.reader(stream, dialect=dialect)
+            csv_file = csv.reader(csv_stream, dialect=dialect)
 
             for row in csv_file:
                 l.append(row)
 
-            self.__dict__.update({name: l})
-
-        stream.close()
+            self._add_member(name, l)
 
-        self._meta_info[name] = {'type': 'csv',
-                                 'file_path_or_str': file_path_or_str,
-                                 'load_as_rick': load_as_rick,
-                                 'fieldnames': fieldnames,
-                                 'encoding': encoding
-                                 }
+        csv_stream.close()
 
     def _load_file(self,
                         file_path: str,
@@ -1489,18 +2223,13 @@ class Rickle(BaseRickle):
                         load_lambda: bool = False,
                         is_binary: bool = False,
                         encoding: str = 'utf-8'):
-        if load_as_rick and not is_binary:
-            args = copy.copy(self._init_args)
-            args['load_lambda'] = load_lambda
-            args['deep'] = deep
-            return Rickle(file_path, **args)
-        else:
-            if is_binary:
-                with open(file_path, 'rb') as fn:
-                    return fn.read()
-            else:
-                with open(file_path, 'r', encoding=encoding) as fn:
-                    return fn.read()
+        return _load_file(self._init_args,
+                          file_path=file_path,
+                          load_as_rick=load_as_rick,
+                          deep=deep,
+                          load_lambda=load_lambda,
+                          is_binary=is_binary,
+                          encoding=encoding)
 
     def add_file(self, name,
                       file_path: str,
@@ -1532,14 +2261,13 @@ class Rickle(BaseRickle):
             if (encoding in supported_encodings() and Path(file_path).is_file()
                     and self._init_args['load_lambda']):
 
-                _load = f"""lambda self=self: self._load_file(file_path='{str(file_path)}',
-                                              load_as_rick={load_as_rick == True},
-                                              deep={deep == True},
-                                              load_lambda={load_lambda == True},
-                                              is_binary={is_binary == True},
-                                              encoding='{str(encoding)}')"""
-
-                self.__dict__.update({name: eval(_load)})
+                self._add_member(name, HotFile(self._init_args,
+                                                   file_path=file_path,
+                                                   load_as_rick=load_as_rick,
+                                                   deep=deep,
+                                                   load_lambda=load_lambda,
+                                                   is_binary=is_binary,
+                                                   encoding=encoding))
             else:
                 raise ValueError(f"At 'add_from_file', when trying to add lambda, one or more checks failed")
         else:
@@ -1550,7 +2278,7 @@ class Rickle(BaseRickle):
                                           is_binary=is_binary,
                                           encoding=encoding)
 
-            self.__dict__.update({name: result})
+            self._add_member(name, result)
 
         self._meta_info[name] = {'type': 'file',
                                  'file_path': file_path,
@@ -1573,28 +2301,16 @@ class Rickle(BaseRickle):
                             deep: bool = False,
                             load_lambda: bool = False,
                             expected_http_status: int = 200):
-        if http_verb.lower() == 'post':
-            r = requests.post(url=url, data=body, headers=headers)
-        else:
-            r = requests.get(url=url, params=params, headers=headers)
-
-        if r.status_code == expected_http_status:
-            if r.headers.get('content-type', '').lower() == 'application/json':
-                resp_input = r.json()
-            else:
-                resp_input = r.text
-
-            if load_as_rick:
-                args = copy.copy(self._init_args)
-                args['load_lambda'] = load_lambda
-                args['deep'] = deep
-
-                return Rickle(resp_input, **args)
-            else:
-                return resp_input
-        else:
-            raise ValueError(f'Unexpected HTTP status code in response {r.status_code}')
-
+        return _load_api(self._init_args,
+                         url=url,
+                         http_verb=http_verb,
+                         headers=headers,
+                         params=params,
+                         body=body,
+                         load_as_rick=load_as_rick,
+                         deep=deep,
+                         load_lambda=load_lambda,
+                         expected_http_status=expected_http_status)
 
     def add_api(self, name,
                       url: str,
@@ -1629,36 +2345,23 @@ class Rickle(BaseRickle):
         """
         name = self._check_kw(name)
         if hot_load:
-            try:
-                from urllib3.util import parse_url
-                try:
-                    parsed = parse_url(url)
-                    if (all([parsed.scheme, parsed.host]) and self._init_args['load_lambda']
-                            and http_verb.lower().strip() in ['get', 'post', 'put']):
-                        _body = dict(body) if body else None
-                        _headers = dict(headers) if headers else None
-                        _params = dict(params) if params else None
-                        _load = f"""lambda self=self,\
-                                            headers={_headers},\
-                                            params={_params},\
-                                            body={_body}:\
-                                    self._load_api(url='{str(url)}', 
-                                        http_verb='{str(http_verb)}', 
-                                        headers=headers, 
-                                        params=params, 
-                                        body=body,
-                                        load_as_rick={load_as_rick == True},
-                                        deep={deep == True},
-                                        load_lambda={load_lambda == True},
-                                        expected_http_status={int(expected_http_status)})"""
-
-                        self.__dict__.update({name: eval(_load)})
-                    else:
-                        raise ValueError(f"When trying to add lambda, one or more checks failed")
-                except Exception as exc:
-                    raise exc
-            except Exception as exc:
-                raise ValueError(f"At 'add_api', when trying to add lambda, this happened {exc}")
+            from urllib.parse import urlsplit
+
+            parsed = urlsplit(url)
+            if not (all([parsed.scheme, parsed.netloc]) and self._init_args['load_lambda']
+                    and http_verb.lower().strip() in ['get', 'post', 'put']):
+                raise ValueError(f"At 'add_api', when trying to add hot load member, one or more checks failed")
+
+            self._add_member(name, HotAPI(self._init_args,
+                                             url=url,
+                                             http_verb=http_verb,
+                                             headers=dict(headers) if headers else None,
+                                             params=dict(params) if params else None,
+                                             body=dict(body) if body else None,
+                                             load_as_rick=load_as_rick,
+                                             deep=deep,
+                                             load_lambda=load_lambda,
+                                             expected_http_status=int(expected_http_status)))
 
         else:
             result = self._load_api(url=url,
@@ -1671,7 +2374,7 @@ class Rickle(BaseRickle):
                                               load_lambda=load_lambda,
                                               expected_http_status=expected_http_status)
 
-            self.__dict__.update({name: result})
+            self._add_member(name, result)
 
         self._meta_info[name] = {'type': 'api',
                                  'url': url,
@@ -1686,6 +2389,52 @@ class Rickle(BaseRickle):
                                  'hot_load': hot_load
                                  }
 
+    def _prefetch_secrets(self, obj: Union[dict, list], deep: bool):
+        """
+        Fetch all cold loaded (latest version) secrets of the same provider and access key in the whole document in
+        one go, rather than one request per member.
+        """
+        groups = dict()
+        # Mappings whose values are loaded as members, the same as in _iternalize
+        stack = [b for b in obj if isinstance(b, dict)] if isinstance(obj, list) else [obj]
+        while stack:
+            node = stack.pop()
+            for v in node.values():
+                # Only dictionaries in lists are internalized, when deep, and never as secrets
+                if isinstance(v, list):
+                    if deep:
+                        stack.extend(i for i in v if isinstance(i, dict))
+                    continue
+                if not isinstance(v, dict):
+                    continue
+                if v.get('type') != 'secret':
+                    stack.append(v)
+                    continue
+                provider, secret_id = v.get('provider'), v.get('secret_id')
+                if not isinstance(provider, str) or secret_id is None:
+                    # Left to _iternalize to report
+                    continue
+                if v.get('hot_load', False) or v.get('secret_version', None):
+                    continue
+                provider = provider.strip().lower()
+                provider_access_key = _resolve_access_key(v.get('provider_access_key', None))
+                group_key = (provider, access_key_fingerprint(provider_access_key))
+                if group_key not in groups:
+                    groups[group_key] = (provider_access_key, list())
+                groups[group_key][1].append(secret_id)
+
+        prefetched = dict()
+        for (provider, fingerprint), (provider_access_key, secret_ids) in groups.items():
+            if len(set(secret_ids)) < 2:
+                continue
+            secrets = fetch_secrets(provider=provider,
+                                    provider_access_key=provider_access_key,
+                                    secret_ids=secret_ids,
+                                    ttl=_secret_cache_ttl(self._init_args))
+            for secret_id, secret in secrets.items():
+                prefetched[(provider, fingerprint, secret_id)] = secret
+        return prefetched
+
     def _add_secret(self,
                     secret_id: str,
                     provider: str,
@@ -1695,136 +2444,15 @@ class Rickle(BaseRickle):
                     deep: bool = False,
                     load_lambda: bool = False
                     ):
-        provider = provider.strip().lower()
-
-        if isinstance(provider_access_key, str):
-            provider_access_key = Rickle(provider_access_key).dict()
-
-        if provider == 'aws':
-            import boto3
-            from botocore.exceptions import ClientError
-
-            client = boto3.session.Session(**provider_access_key).client('secretsmanager')
-            try:
-                args = {'SecretId': secret_id}
-                if secret_version:
-                    args['VersionId'] = secret_version
-                secret = client.get_secret_value(**args)
-
-            except ClientError as e:
-                sys.stderr.write(f"Error while accessing secret {e.response['Error']['Code']}")
-                raise e
-            else:
-                if 'SecretString' in secret:
-                    secret_string = secret['SecretString']
-
-                    if load_as_rick:
-                        args = copy.copy(self._init_args)
-                        args['load_lambda'] = load_lambda
-                        args['deep'] = deep
-                        return Rickle(secret_string, **args)
-                    return secret_string
-                else:
-                    return secret['SecretBinary']
-        elif provider == 'google':
-            from google.cloud import secretmanager
-            from google.oauth2 import service_account
-
-            credentials = service_account.Credentials.from_service_account_info(
-                provider_access_key)
-
-            if secret_version:
-                _secret_version_id = secret_version
-            else:
-                _secret_version_id = 'latest'
-
-            client = secretmanager.SecretManagerServiceClient(credentials=credentials)
-            name = f"projects/{provider_access_key['project_id']}/secrets/{secret_id}/versions/{_secret_version_id}"
-
-            response = client.access_secret_version(name=name)
-
-            if load_as_rick:
-                args = copy.copy(self._init_args)
-                args['load_lambda'] = load_lambda
-                args['deep'] = deep
-                return Rickle(response.payload.data.decode('UTF-8'), **args)
-
-            return response.payload.data.decode('UTF-8')
-        elif provider == 'azure':
-            from azure.identity import ClientSecretCredential
-            from azure.keyvault.secrets import SecretClient
-
-            key_vault_uri = f"https://{provider_access_key['key_vault_name']}.vault.azure.net"
-
-            credential = ClientSecretCredential(
-                tenant_id=provider_access_key['tenant_id'],
-                client_id=provider_access_key['client_id'],
-                client_secret=provider_access_key['client_secret']
-            )
-
-            client = SecretClient(vault_url=key_vault_uri, credential=credential)
-
-            secret = client.get_secret(name=secret_id, version=secret_version)
-
-            if load_as_rick:
-                args = copy.copy(self._init_args)
-                args['load_lambda'] = load_lambda
-                args['deep'] = deep
-                return Rickle(secret.value, **args)
-            return secret.value
-        elif provider == 'hashicorp':
-            import hvac
-
-            client = hvac.Client(
-                **provider_access_key
-            )
-
-            read_response = client.secrets.kv.read_secret_version(path=secret_id)
-
-            secret = read_response['data']['data']
-
-            if load_as_rick:
-                args = copy.copy(self._init_args)
-                args['load_lambda'] = load_lambda
-                args['deep'] = deep
-                return Rickle(secret, **args)
-            return secret
-        elif provider == 'oracle':
-            import oci
-
-            vault_client = oci.vault.VaultsClient(provider_access_key)
-
-            secret_response = vault_client.get_secret(secret_id=secret_id)
-
-            if load_as_rick:
-                args = copy.copy(self._init_args)
-                args['load_lambda'] = load_lambda
-                args['deep'] = deep
-                return Rickle(secret_response.data, **args)
-            return secret_response.data
-        elif provider == 'ibm':
-            from ibm_cloud_sdk_core.authenticators.iam_authenticator import IAMAuthenticator
-            from ibm_secrets_manager_sdk.secrets_manager_v2 import SecretsManagerV2
-
-            secrets_manager = SecretsManagerV2(
-                authenticator=IAMAuthenticator(provider_access_key['apikey'])
-            )
-            secrets_manager.set_service_url(provider_access_key['service_url'])
-
-            response = secrets_manager.get_secret(
-                id=secret_id
-            )
-
-            secret_payload = response.result['payload']
-
-            if load_as_rick:
-                args = copy.copy(self._init_args)
-                args['load_lambda'] = load_lambda
-                args['deep'] = deep
-                return Rickle(secret_payload, **args)
-            return secret_payload
-        else:
-            raise ValueError(f"Provider name '{provider}' not supported")
+        return _load_secret(self._init_args,
+                            secret_id=secret_id,
+                            provider=provider,
+                            provider_access_key=provider_access_key,
+                            secret_version=secret_version,
+                            load_as_rick=load_as_rick,
+                            deep=deep,
+                            load_lambda=load_lambda,
+                            prefetched=getattr(_prefetched_secrets, 'secrets', None))
 
     def add_secret(self,
                    name,
@@ -1857,20 +2485,14 @@ class Rickle(BaseRickle):
         """
         name = self._check_kw(name)
         if hot_load:
-            try:
-                if isinstance(provider_access_key, str):
-                    provider_access_key = f"'{provider_access_key}'"
-                _load = f"""lambda self=self: self._add_secret(secret_id='{str(secret_id)}', 
-                                                        provider='{str(provider)}', 
-                                                        provider_access_key={provider_access_key}, 
-                                                        secret_version={secret_version},
-                                                        load_as_rick={load_as_rick == True},
-                                                        deep={deep == True},
-                                                        load_lambda={load_lambda == True})"""
-
-                self.__dict__.update({name: eval(_load)})
-            except Exception as exc:
-                raise ValueError(f"At 'add_secret', when trying to add lambda, this happened {exc}")
+            self._add_member(name, HotSecret(self._init_args,
+                                                secret_id=secret_id,
+                                                provider=provider,
+                                                provider_access_key=provider_access_key,
+                                                secret_version=secret_version,
+                                                load_as_rick=load_as_rick,
+                                                deep=deep,
+                                                load_lambda=load_lambda))
 
         else:
             result = self._add_secret(secret_id=secret_id,
@@ -1881,7 +2503,7 @@ class Rickle(BaseRickle):
                                               deep=deep,
                                               load_lambda=load_lambda)
 
-            self.__dict__.update({name: result})
+            self._add_member(name, result)
 
         self._meta_info[name] = {'type': 'secret',
                                  'secret_id': secret_id,
@@ -1914,6 +2536,13 @@ class UnsafeRickle(Rickle):
     """
 
     def _iternalize(self, obj: dict, deep: bool, **init_args):
+        if getattr(_prefetched_secrets, 'secrets', None) is None:
+            # Only at the root, nested nodes are created while the secrets are set
+            _prefetched_secrets.secrets = self._prefetch_secrets(obj, deep=deep)
+            try:
+                return self._iternalize(obj, deep=deep, **init_args)
+            finally:
+                _prefetched_secrets.secrets = None
         if isinstance(obj, dict):
             for k, v in obj.items():
                 k = self._check_kw(k)
@@ -1943,7 +2572,11 @@ class UnsafeRickle(Rickle):
                                               file_path_or_str=v['file_path'],
                                               fieldnames=v.get('fieldnames', None),
                                               load_as_rick=v.get('load_as_rick', False),
-                                              encoding=v.get('encoding', 'utf-8'))
+                                              encoding=v.get('encoding', 'utf-8'),
+                                              columnar=v.get('columnar', False),
+                                              key_column=v.get('key_column', None),
+                                              stream=v.get('stream', False),
+                                              dtypes=v.get('dtypes', None))
                             continue
                         if v['type'] == 'api':
                             self.add_api(name=k,
@@ -2089,7 +2722,7 @@ class UnsafeRickle(Rickle):
                 raise TypeError(
                     f'{exc} occurred. The node in the path {path} is of type {type(current_node)} or does not match the query')
 
-        if inspect.isfunction(current_node):
+        if isinstance(current_node, (types.FunctionType, HotLoad)):
             try:
                 return current_node(**kwargs)
             except Exception as exc:
@@ -2099,52 +2732,35 @@ class UnsafeRickle(Rickle):
         else:
             return current_node
 
-    def dict(self, serialised: bool = False):
+    def _items(self, serialised: bool = False):
         """
-        Deconstructs the whole object into a Python dictionary.
-
-        Args:
-            serialised (bool): Give a Python dictionary in serialised (True) form or deserialised (default = False).
+        Yields the members of this node as they are given by ``dict``, without deconstructing nested nodes.
 
         Notes:
-            Functions and lambdas are always given in serialised form.
-
-        Returns:
-            dict: of object.
+            In serialised form, members with meta information are given as such. Otherwise, members that are only
+            available in serialised form or are hot loaded are skipped.
         """
-        d = dict()
         for key, value in self.__dict__.items():
-            actual_key = key
-            if key in self._keys_map.keys():
-                actual_key = self._keys_map[key]
             if self._eval_name(key):
                 continue
+            actual_key = self._keys_map.get(key, key)
             if serialised and key in self._meta_info.keys():
-                d[actual_key] = self._meta_info[key]
+                yield actual_key, self._meta_info[key]
             # Revisit this at some later point
             elif key in self._meta_info.keys() and \
                     self._meta_info[key]['type'] in ['function', 'class_definition', 'module_import',
                                                      'base64']:
-                # d[actual_key] = self._meta_info[key]
                 continue
             elif key in self._meta_info.keys() and \
                     self._meta_info[key]['type'] in ['file', 'html_page', 'api_json'] and \
                     self._meta_info[key]['hot_load']:
-                # d[actual_key] = self._meta_info[key]
                 continue
-            elif isinstance(value, BaseRickle):
-                d[actual_key] = value.dict(serialised=serialised)
-            elif isinstance(value, list):
-                new_list = list()
-                for element in value:
-                    if isinstance(element, BaseRickle):
-                        new_list.append(element.dict(serialised=serialised))
-                    else:
-                        new_list.append(element)
-                d[actual_key] = new_list
+            elif isinstance(value, ColumnarTable):
+                yield actual_key, value.dict()
+            elif isinstance(value, (CSVRowStream, HotLoad)):
+                continue
             else:
-                d[actual_key] = value
-        return d
+                yield actual_key, value
 
     def add_python(self, name, load, args: dict = None, imports: list = None,
                      return_function: bool = False,
@@ -2187,6 +2803,8 @@ class UnsafeRickle(Rickle):
                     exec(i, globals())
                 else:
                     exec('import {}'.format(i), globals())
+        import uuid
+
         suffix = str(uuid.uuid4().hex)
 
         _load = load.replace(f'def {name}(', f'def {name}{suffix}(')
@@ -2218,7 +2836,7 @@ class UnsafeRickle(Rickle):
 
         if return_function:
             return eval(func_string)
-        self.__dict__.update({name: eval(func_string)})
+        self._add_member(name, eval(func_string))
 
         self._meta_info[name] = {'type': 'add_python', 'name': name, 'args': args, 'import': imports,
                                  'load': load, 'is_method': is_method}
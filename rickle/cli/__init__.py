@@ -2,31 +2,58 @@
 # https://patorjk.com/software/taag/
 # Large heading using "Shaded Blocky" font
 # Sub headings using "Small" font
-import importlib.util
+import importlib
+import os
 import sys
 
 import rickle.__version__ as ver
 import argparse
 from rickle.tools import cli_bcolors
 from rickle.tools import CLIError
-
-from rickle.cli.schema import gen, check
-from rickle.cli.conv import conv
-from rickle.cli.serve import serve
-from rickle.cli.obj import obj_get, obj_set, obj_put, obj_rm, obj_search, obj_type, obj_python_func, obj_find
+from rickle.tools import is_available
 
 GITHUB_DOCS_URL = "https://github.com/zipfian-sh/rickle/blob/master/docs/source/cli_tools.rst#cli-tools"
 
-def main():
+def _handler(module_name: str, function_name: str):
+    """
+    Sub command handlers are imported only when the sub command runs, so every invocation only imports what it uses.
+    """
+    def run(args):
+        module = importlib.import_module(module_name)
+        return getattr(module, function_name)(args)
+    return run
+
+gen = _handler('rickle.cli.schema', 'gen')
+check = _handler('rickle.cli.schema', 'check')
+conv = _handler('rickle.cli.conv', 'conv')
+serve = _handler('rickle.cli.serve', 'serve')
+obj_get = _handler('rickle.cli.obj', 'obj_get')
+obj_set = _handler('rickle.cli.obj', 'obj_set')
+obj_put = _handler('rickle.cli.obj', 'obj_put')
+obj_rm = _handler('rickle.cli.obj', 'obj_rm')
+obj_search = _handler('rickle.cli.obj', 'obj_search')
+obj_type = _handler('rickle.cli.obj', 'obj_type')
+obj_python_func = _handler('rickle.cli.obj', 'obj_python_func')
+obj_find = _handler('rickle.cli.obj', 'obj_find')
+obj_batch = _handler('rickle.cli.obj', 'obj_batch')
+daemon_cli = _handler('rickle.cli.daemon', 'daemon_cli')
+
+def build_parser():
+    """
+    Build the argument parser of the ``rickle`` command.
+
+    Returns:
+        tuple: The parser, and a dictionary of sub command parsers by ``CLIError.CLITool`` for printing help.
+    """
     supported_list = f"""
 - {cli_bcolors.OKBLUE}YAML (r/w){cli_bcolors.ENDC}
 - {cli_bcolors.OKBLUE}JSON (r/w){cli_bcolors.ENDC}
 - {cli_bcolors.OKBLUE}TOML (r/w){cli_bcolors.ENDC}
 - {cli_bcolors.OKBLUE}INI (r/w){cli_bcolors.ENDC}"""
 
-    if importlib.util.find_spec('dotenv'):
+    if is_available('dotenv'):
         supported_list = f"{supported_list}\n- {cli_bcolors.OKBLUE}ENV (r){cli_bcolors.ENDC}"
-    if importlib.util.find_spec('xmltodict'):
+    if is_available('xmltodict'):
         supported_list = f"{supported_list}\n- {cli_bcolors.OKBLUE}XML (r/w){cli_bcolors.ENDC}"
 
     parser = argparse.ArgumentParser(
@@ -93,6 +120,15 @@ Examples:
 When no output type is defined, the file extension (suffix) is used to infer the output type.    
 
     $ rickle conv --input conf1.yaml --output config.toml
+
+Large piped JSONL or multi-document YAML input is converted document by document in constant memory:
+
+    $ cat events.jsonl | rickle --output-type YAML conv --stream --input-type JSONL
+    $ cat events.jsonl | rickle --output-type CSV conv --input-type JSONL
+
+Whole directory trees can be converted in parallel processes, skipping files already converted since last changed:
+
+    $ rickle --output-type JSON conv --input-directory ./configs --recursive --exclude "*/drafts/*" --jobs 8 --skip-up-to-date
     """)
 
     parser_conv.add_argument('--input',
@@ -126,6 +162,39 @@ When no output type is defined, the file extension (suffix) is used to infer the
                              dest='VERBOSE',
                              action='store_true',
                              help=f"{cli_bcolors.OKBLUE}verbose{cli_bcolors.ENDC} output", )
+    parser_conv.add_argument('--stream',
+                             dest='STREAM',
+                             action='store_true',
+                             help=f"convert piped input as a {cli_bcolors.OKBLUE}stream{cli_bcolors.ENDC} of documents (JSONL, YAML)", )
+    parser_conv.add_argument('--recursive',
+                             '-r',
+                             dest='RECURSIVE',
+                             action='store_true',
+                             help=f"include {cli_bcolors.OKBLUE}sub directories{cli_bcolors.ENDC} of the input directory", )
+    parser_conv.add_argument('--include',
+                             dest='INCLUDE',
+                             type=str,
+                             metavar='',
+                             help=f"{cli_bcolors.OKBLUE}glob patterns{cli_bcolors.ENDC} of files to include (default = known extensions)",
+                             nargs='+',
+                             default=None)
+    parser_conv.add_argument('--exclude',
+                             dest='EXCLUDE',
+                             type=str,
+                             metavar='',
+                             help=f"{cli_bcolors.OKBLUE}glob patterns{cli_bcolors.ENDC} of files to exclude",
+                             nargs='+',
+                             default=None)
+    parser_conv.add_argument('--skip-up-to-date',
+                             dest='SKIP_UP_TO_DATE',
+                             action='store_true',
+                             help=f"skip files whose {cli_bcolors.OKBLUE}output is newer{cli_bcolors.ENDC} than the input", )
+    parser_conv.add_argument('--jobs',
+                             dest='JOBS',
+                             type=int,
+                             default=None,
+                             help=f"number of {cli_bcolors.OKBLUE}processes{cli_bcolors.ENDC} converting files in parallel",
+                             metavar='')
 
     parser_conv.set_defaults(func=conv)
 
@@ -415,6 +484,45 @@ being executed and then the later. Using --parent / -p will output the parent no
 
     find_obj_parser.set_defaults(func=obj_find)
 
+    #################### OBJ - BATCH #####################
+    #  ___   _ _____ ___ _  _
+    # | _ ) /_\_   _/ __| || |
+    # | _ \/ _ \| || (__| __ |
+    # |___/_/ \_\_| \___|_||_|
+
+    batch_obj_parser = subparsers_obj.add_parser('batch',
+                                                 formatter_class=argparse.RawTextHelpFormatter,
+                                                 help=f'applying a {cli_bcolors.OKBLUE}batch{cli_bcolors.ENDC} of operations to objects',
+                                                 description=f"""
+{cli_bcolors.HEADER}Tool for applying many operations to an object, loading and writing it once{cli_bcolors.ENDC}.
+
+Operations are read from a script file, one per line, or from stdin when --input is given:
+
+    get /path/to
+    set /path/to new_value
+    put /path/not/existing "value with spaces"
+    rm /path/to
+    search key
+
+Values are parsed as YAML, lines starting with # are ignored. Results of get and search are printed in order.
+If any set, put, or rm is applied, the object is written once at the end.
+
+Examples: 
+
+    $ rickle obj --input config.yaml --output config.yaml batch changes.txt
+    $ printf "set /version 2\\nrm /legacy" | rickle obj --input config.yaml batch
+
+""", )
+
+    batch_obj_parser.add_argument('script',
+                                  type=str,
+                                  help=f"{cli_bcolors.OKBLUE}script{cli_bcolors.ENDC} file of operations (default stdin)",
+                                  nargs='?',
+                                  default=None,
+                                  metavar='script')
+
+    batch_obj_parser.set_defaults(func=obj_batch)
+
 
     #################### OBJ - FUNC #####################
     #  ___ _   _ _  _  ___
@@ -477,7 +585,7 @@ This will infer input params.
     # ███████  █  ███████  ███  ████    ███  ███████
     # ██      ██        █  ████  ████  ████        █
 
-    if importlib.util.find_spec('twisted'):
+    if is_available('twisted'):
         parser_serve = subparsers.add_parser('serve',
                                              help=f'serving objects through {cli_bcolors.OKBLUE}http(s){cli_bcolors.ENDC}',
                                              formatter_class=argparse.RawTextHelpFormatter,
@@ -617,6 +725,10 @@ Which will print OK or FAIL depending on success. For more detailed output the -
 
 To silence the OK/FAIL output, --silence can be used. If input is piped and the check fails, exit code 1 is returned.
 
+Many files can be checked in parallel processes with --jobs, results are printed as files finish:
+
+    $ rickle schema check --schema config.schema.yaml --input-directory ./configs --jobs 8
+
 Can also be validated using {cli_bcolors.OKBLUE}jsonschema{cli_bcolors.ENDC} (if installed) by using --json-schema.
 See {cli_bcolors.UNDERLINE}https://python-jsonschema.readthedocs.io{cli_bcolors.ENDC} for more.
 """, )
@@ -662,6 +774,12 @@ See {cli_bcolors.UNDERLINE}https://python-jsonschema.readthedocs.io{cli_bcolors.
                                      dest='JSON_SCHEMA',
                                      action='store_true',
                                      help=f"validate as {cli_bcolors.OKBLUE}json schema{cli_bcolors.ENDC}", )
+    parser_schema_check.add_argument('--jobs',
+                                     dest='JOBS',
+                                     type=int,
+                                     default=None,
+                                     help=f"number of {cli_bcolors.OKBLUE}processes{cli_bcolors.ENDC} checking files in parallel",
+                                     metavar='')
 
     parser_schema_check.set_defaults(func=check)
 
@@ -711,44 +829,106 @@ If --input or --input-directory are passed the output will be to files. If piped
 
     parser_schema_gen.set_defaults(func=gen)
 
-    #################################################
+    #################### DAEMON #####################
+    # ░       ░░░      ░░        ░  ░░░░  ░░      ░░   ░░░  ░
+    # ▒  ▒▒▒▒  ▒  ▒▒▒▒  ▒  ▒▒▒▒▒▒▒   ▒▒   ▒  ▒▒▒▒  ▒    ▒▒  ▒
+    # ▓  ▓▓▓▓  ▓  ▓▓▓▓  ▓      ▓▓▓        ▓  ▓▓▓▓  ▓  ▓  ▓  ▓
+    # █  ████  █        █  ███████  █  █  █  ████  █  ██    █
+    # █       ██  ████  █        █  ████  ██      ██  ███   █
+
+    parser_daemon = subparsers.add_parser('daemon',
+                                          help=f'{cli_bcolors.OKBLUE}background process{cli_bcolors.ENDC} answering CLI calls',
+                                          formatter_class=argparse.RawTextHelpFormatter,
+                                          description=f"""
+{cli_bcolors.HEADER}Background process keeping parsed documents and schemas in memory{cli_bcolors.ENDC}.
+
+When the environment variable RICKLE_DAEMON_SOCKET is set, the rickle command forwards conv, obj get,
+obj search, obj find and schema check to the daemon listening on that socket, avoiding start-up and
+parsing time for repeated calls. If the daemon can not be reached, the command runs as usual.
+
+Examples:
+
+    $ export RICKLE_DAEMON_SOCKET=/tmp/rickle.sock
+    $ rickle daemon start &
+    $ rickle obj --input config.yaml get /path/to/value
+    $ rickle daemon stop
+
+Documents are cached by path and modification time, changed files are parsed again. Documents with
+env, file, csv, api, secret or random members are loaded again for every request.
+""", )
+
+    parser_daemon.add_argument('ACTION',
+                               choices=['start', 'stop', 'status'],
+                               help=f"{cli_bcolors.OKBLUE}start{cli_bcolors.ENDC} (in the foreground), "
+                                    f"{cli_bcolors.OKBLUE}stop{cli_bcolors.ENDC} or "
+                                    f"{cli_bcolors.OKBLUE}status{cli_bcolors.ENDC} of the daemon")
+    parser_daemon.add_argument('--socket',
+                               dest='SOCKET',
+                               type=str,
+                               help=f"{cli_bcolors.OKBLUE}socket path{cli_bcolors.ENDC} (default = RICKLE_DAEMON_SOCKET or temp directory)",
+                               default=None,
+                               metavar='')
+    parser_daemon.add_argument('--cache-size',
+                               dest='CACHE_SIZE',
+                               type=int,
+                               help=f"maximum number of {cli_bcolors.OKBLUE}cached documents{cli_bcolors.ENDC} (default = 64)",
+                               default=None,
+                               metavar='')
+
+    parser_daemon.set_defaults(func=daemon_cli)
+
+    help_parsers = {
+        CLIError.CLITool.CONV: parser_conv,
+        CLIError.CLITool.OBJ: parser_obj,
+        CLIError.CLITool.SCHEMA: parser_schema,
+        CLIError.CLITool.OBJ_GET: get_obj_parser,
+        CLIError.CLITool.OBJ_SET: set_obj_parser,
+        CLIError.CLITool.OBJ_PUT: put_obj_parser,
+        CLIError.CLITool.OBJ_DEL: rm_obj_parser,
+        CLIError.CLITool.OBJ_TYPE: type_obj_parser,
+        CLIError.CLITool.OBJ_SEARCH: search_obj_parser,
+        CLIError.CLITool.OBJ_FIND: find_obj_parser,
+        CLIError.CLITool.OBJ_FUNC: func_obj_parser,
+        CLIError.CLITool.OBJ_BATCH: batch_obj_parser,
+        CLIError.CLITool.SCHEMA_CHECK: parser_schema_check,
+        CLIError.CLITool.SCHEMA_GEN: parser_schema_gen,
+        CLIError.CLITool.DAEMON: parser_daemon,
+    }
+    if is_available('twisted'):
+        help_parsers[CLIError.CLITool.SERVE] = parser_serve
+
+    return parser, help_parsers
+
+def run(parser, help_parsers: dict, argv: list = None):
+    """
+    Parse the arguments and run the sub command, printing the relevant help on errors.
+    """
     # Making a bit more friendly for debugging
     try:
-        args = parser.parse_args()
+        args = parser.parse_args(argv)
         args.func(args)
     except AttributeError:
         parser.print_help(sys.stderr)
         sys.exit(2)
     except CLIError as cli_exc:
         sys.stderr.write(f'\n{cli_bcolors.FAIL}error: {cli_exc.message}{cli_bcolors.ENDC}\n\n')
-        if cli_exc.cli_tool == CLIError.CLITool.CONV:
-            parser_conv.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ:
-            parser_obj.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.SERVE:
-            parser_serve.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.SCHEMA:
-            parser_schema.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ_GET:
-            get_obj_parser.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ_SET:
-            set_obj_parser.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ_DEL:
-            rm_obj_parser.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ_TYPE:
-            type_obj_parser.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ_SEARCH:
-            search_obj_parser.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.OBJ_FUNC:
-            func_obj_parser.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.SCHEMA_CHECK:
-            parser_schema_check.print_help(sys.stderr)
-        elif cli_exc.cli_tool == CLIError.CLITool.SCHEMA_GEN:
-            parser_schema_gen.print_help(sys.stderr)
-        else:
-            parser.print_help(sys.stderr)
+        help_parsers.get(cli_exc.cli_tool, parser).print_help(sys.stderr)
         sys.exit(2)
 
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Thin client: forward to a running daemon, falling back to running locally
+    socket_path = os.getenv('RICKLE_DAEMON_SOCKET')
+    if socket_path:
+        from rickle.cli.daemon import forward
+        code = forward(socket_path, argv)
+        if code is not None:
+            sys.exit(code)
+
+    parser, help_parsers = build_parser()
+    run(parser, help_parsers, argv)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
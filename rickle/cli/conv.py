@@ -1,14 +1,152 @@
-import importlib
+import io
 import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from functools import partial
 from pathlib import Path
 
 import yaml
-import tomli_w as tomlw
 
 
-from rickle.tools import CLIError, convert_string, infer_read_file_type, unparse_ini, cli_bcolors, toml_null_stripper
+from rickle.tools import is_available, CLIError, convert_string, infer_read_file_type, unparse_ini, cli_bcolors, toml_null_stripper
+from rickle.tools import bounded_map, iter_chunks, convert_stream, detect_format
+
+# Types only converted as streams of documents
+_STREAM_TYPES = ['jsonl', 'ndjson', 'csv']
+
+
+def _known_extensions() -> list:
+    known_extensions = ['yaml', 'yml', 'json', 'toml', 'ini']
+    if is_available('xmltodict'):
+        known_extensions.append('xml')
+    if is_available('dotenv'):
+        known_extensions.append('env')
+    return known_extensions
+
+
+def _matches(path: Path, relative: str, patterns: list) -> bool:
+    return any(fnmatch(path.name, pattern) or fnmatch(relative, pattern) for pattern in patterns)
+
+
+def find_input_files(input_directory: str, recursive: bool = False, include: list = None, exclude: list = None) -> list:
+    """
+    List the files of a directory to convert.
+
+    Args:
+        input_directory (str): Directory to search.
+        recursive (bool): Also search sub directories (default = False).
+        include (list): Glob patterns of file names or relative paths to include (default = all known extensions).
+        exclude (list): Glob patterns of file names or relative paths to exclude (default = None).
+
+    Returns:
+        list: Sorted file paths.
+    """
+    dir_path = Path(input_directory)
+    include = include or [f"*.{ext}" for ext in _known_extensions()]
+    exclude = exclude or list()
+
+    input_files = list()
+    for path in (dir_path.rglob("*") if recursive else dir_path.glob("*")):
+        relative = path.relative_to(dir_path).as_posix()
+        if _matches(path, relative, include) and not _matches(path, relative, exclude) and path.is_file():
+            input_files.append(path)
+
+    return sorted(input_files)
+
+
+class _PrefixedStream(io.TextIOBase):
+    """
+    Text stream giving an already read prefix before the rest of the stream.
+    """
+
+    def __init__(self, prefix: str, stream):
+        self._prefix = io.StringIO(prefix)
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._prefix.read(size)
+        if size is None or size < 0:
+            return data + self._stream.read()
+        if len(data) < size:
+            data += self._stream.read(size - len(data))
+        return data
+
+    def readline(self, size=-1):
+        line = self._prefix.readline()
+        if line.endswith('\n'):
+            return line
+        return line + self._stream.readline()
+
+
+def detect_stream_type(stream, prefix_size: int = 4096) -> tuple:
+    """
+    Detect whether a stream of documents is JSONL or YAML from its first characters.
+
+    Args:
+        stream (io.TextIOBase): Input stream.
+        prefix_size (int): Number of characters inspected (default = 4096).
+
+    Returns:
+        tuple: Input type (``jsonl`` or ``yaml``) or None if neither, and a stream to read the documents from.
+    """
+    prefix = stream.read(prefix_size)
+    input_type = detect_format(prefix, prefix_size=prefix_size)
+    if input_type == 'json':
+        first = next((line for line in prefix.splitlines() if line.strip()), '')
+        try:
+            json.loads(first)
+            input_type = 'jsonl'
+        except ValueError:
+            # A single JSON document spread over lines, which YAML reads too
+            input_type = 'yaml'
+    elif input_type != 'yaml':
+        input_type = None
+    return input_type, _PrefixedStream(prefix, stream)
+
+
+def pair_output_files(input_files: list, output_type: str) -> tuple:
+    """
+    Pair the files of a directory with the files they are converted to.
+
+    Notes:
+        Input files that already have the output type are not converted. Input files whose output would overwrite
+        another input file, or the output of another input file, are left out and returned as conflicts instead.
+
+    Args:
+        input_files (list): Input file paths.
+        output_type (str): Output type.
+
+    Returns:
+        tuple: List of (input file, output file) pairs, and list of (input file, reason) conflicts.
+    """
+    output_suffixes = ['.yaml', '.yml'] if output_type in ['yaml', 'yml'] else [f".{output_type}"]
+    existing = set(input_files)
+
+    sources = dict()
+    for input_file in input_files:
+        if input_file.suffix.lower() in output_suffixes:
+            continue
+        sources.setdefault(input_file.with_suffix(f".{output_type}"), list()).append(input_file)
+
+    pairs = list()
+    conflicts = list()
+    for output_file, output_sources in sources.items():
+        if output_file in existing:
+            conflicts.extend((input_file, f"would overwrite input file {output_file}") for input_file in output_sources)
+        elif len(output_sources) > 1:
+            conflicts.extend((input_file, f"{output_file} is also converted from "
+                                          f"{', '.join(str(other) for other in output_sources if other != input_file)}")
+                             for input_file in output_sources)
+        else:
+            pairs.append((output_sources[0], output_file))
+
+    return pairs, conflicts
 
 
 def conv(args):
@@ -19,36 +157,41 @@ def conv(args):
             if args.OUTPUT:
                 if len(args.OUTPUT) != len(args.INPUT):
                     raise CLIError(f"Length mismatch input ({len(args.INPUT)}) and output ({len(args.OUTPUT)})!",
-                                   cli_tool=CLIError.CLITool.SCHEMA_GEN)
+                                   cli_tool=CLIError.CLITool.CONV)
                 zipped = zip(args.INPUT, args.OUTPUT)
             else:
                 output_files = list()
                 for input_file in args.INPUT:
-                    output_files.append(f"{os.path.splitext(input_file)[0]}.schema.{output_type}")
+                    output_files.append(f"{os.path.splitext(input_file)[0]}.{output_type}")
                 zipped = zip(args.INPUT, output_files)
 
-            convert_files(output_type, zipped, args.VERBOSE)
+            convert_files(output_type, zipped, args.VERBOSE,
+                          jobs=args.JOBS,
+                          skip_up_to_date=args.SKIP_UP_TO_DATE)
         elif args.INPUT_DIRECTORY:
 
-            input_files = list()
-
-            dir_path = Path(args.INPUT_DIRECTORY)
+            input_files = find_input_files(args.INPUT_DIRECTORY,
+                                           recursive=args.RECURSIVE,
+                                           include=args.INCLUDE,
+                                           exclude=args.EXCLUDE)
 
-            known_extensions = ['yaml', 'yml', 'json', 'toml', 'ini']
-            if importlib.util.find_spec('xmltodict'):
-                known_extensions.append('xml')
-            if importlib.util.find_spec('dotenv'):
-                known_extensions.append('env')
+            zipped, conflicts = pair_output_files(input_files, output_type)
+            for input_file, reason in conflicts:
+                sys.stderr.write(f"{cli_bcolors.OKBLUE}{input_file}{cli_bcolors.ENDC} -> "
+                                 f"{cli_bcolors.WARNING}not converted, {reason}{cli_bcolors.ENDC}\n")
 
-            for ext in known_extensions:
-                input_files.extend(list(dir_path.glob(f"*.{ext}")))
+            convert_files(output_type, zipped, args.VERBOSE,
+                          jobs=args.JOBS,
+                          skip_up_to_date=args.SKIP_UP_TO_DATE)
+        elif args.STREAM or output_type in _STREAM_TYPES or (args.INPUT_TYPE or '').lower() in _STREAM_TYPES:
+            input_type, stream = args.INPUT_TYPE, sys.stdin
+            if not input_type:
+                input_type, stream = detect_stream_type(sys.stdin)
+                if input_type is None:
+                    raise CLIError(f"Streamed input is neither JSONL nor YAML, --input-type is required for streamed "
+                                   f"{output_type.upper()} output", cli_tool=CLIError.CLITool.CONV)
 
-            output_files = list()
-            for input_file in args.INPUT:
-                output_files.append(f"{os.path.splitext(input_file)[0]}.schema.{output_type}")
-            zipped = zip(args.INPUT, output_files)
-
-            convert_files(output_type, zipped, args.VERBOSE)
+            convert_stream(stream, sys.stdout, output_type=output_type, input_type=input_type)
         else:
             data = sys.stdin.read()
 
@@ -58,48 +201,136 @@ def conv(args):
 
             print(converted)
 
+    except CLIError:
+        raise
     except Exception as exc:
         raise CLIError(message=str(exc), cli_tool=CLIError.CLITool.CONV)
 
 
-def convert_files(output_type, zipped, verbose):
-    for pair in zipped:
-        input_data = infer_read_file_type(pair[0])
-        output_file = Path(pair[1])
+def convert_file(input_file, output_file, output_type: str):
+    """
+    Convert a single file, the output type is inferred from the output file suffix if it has one.
+
+    Args:
+        input_file (str): Input file, the type is inferred from its suffix.
+        output_file (str): Output file to write.
+        output_type (str): Output type if the output file has no suffix.
+    """
+    input_data = infer_read_file_type(input_file)
+    output_file = Path(output_file)
+
+    suffix = output_file.suffix.lower() if output_file.suffix else f".{output_type}"
 
-        suffix = output_file.suffix.lower() if output_file.suffix else f".{output_type}"
+    if suffix in ['.yaml', '.yml']:
+        with output_file.open("w") as fout:
+            yaml.safe_dump(input_data, fout, sort_keys=False)
 
-        if suffix == '.yaml':
-            with output_file.open("w") as fout:
-                yaml.safe_dump(input_data, fout, sort_keys=False)
+    if suffix == '.json':
+        with output_file.open("w") as fout:
+            json.dump(input_data, fout)
 
-        if suffix == '.json':
-            with output_file.open("w") as fout:
-                json.dump(input_data, fout)
+    if suffix == '.toml':
+        import tomli_w as tomlw
+
+        with output_file.open("wb") as fout:
+            tomlw.dump(toml_null_stripper(input_data), fout)
+
+    if suffix == '.xml':
+        if is_available('xmltodict'):
+            import xmltodict
 
-        if suffix == '.toml':
             with output_file.open("wb") as fout:
-                tomlw.dump(toml_null_stripper(input_data), fout)
+                xmltodict.unparse(input_data, fout)
+        else:
+            raise ImportError("Missing 'xmltodict' dependency")
 
-        if suffix == '.xml':
-            if importlib.util.find_spec('xmltodict'):
-                import xmltodict
+    if suffix == '.ini':
+        path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
+        list_brackets = (
+            os.getenv("RICKLE_INI_OPENING_BRACES", "("), os.getenv("RICKLE_INI_CLOSING_BRACES", ")")
+        )
+        output_ini = unparse_ini(dictionary=input_data, path_sep=path_sep, list_brackets=list_brackets)
 
-                with output_file.open("wb") as fout:
-                    xmltodict.unparse(input_data, fout)
-            else:
-                raise ImportError("Missing 'xmltodict' dependency")
+        with output_file.open("w") as fout:
+            output_ini.write(fout)
+
+
+def _convert_pair(output_type: str, skip_up_to_date: bool, pair: tuple) -> tuple:
+    """
+    Returns (input file, output file, status, input size, error), status being ``converted``, ``skipped`` or ``failed``.
+    """
+    input_file, output_file = pair
+    try:
+        input_stat = os.stat(input_file)
+        if skip_up_to_date:
+            try:
+                if os.stat(output_file).st_mtime_ns >= input_stat.st_mtime_ns:
+                    return str(input_file), str(output_file), 'skipped', 0, None
+            except FileNotFoundError:
+                pass
+
+        convert_file(input_file, output_file, output_type)
+        return str(input_file), str(output_file), 'converted', input_stat.st_size, None
+    except Exception as exc:
+        return str(input_file), str(output_file), 'failed', 0, str(exc)
+
+
+def _convert_chunk(output_type: str, skip_up_to_date: bool, pairs: list) -> list:
+    return [_convert_pair(output_type, skip_up_to_date, pair) for pair in pairs]
+
+
+def convert_files(output_type, zipped, verbose, jobs: int = None, skip_up_to_date: bool = False):
+    """
+    Convert input/output file pairs and print a summary with throughput.
+
+    Args:
+        output_type (str): Output type for output files without suffix.
+        zipped (iterable): Pairs of input and output files.
+        verbose (bool): Print each conversion.
+        jobs (int): Number of worker processes, converts in this process if None or 1 (default = None).
+        skip_up_to_date (bool): Skip files whose output is at least as new as the input (default = False).
+
+    Returns:
+        dict: Number of ``converted``, ``skipped`` and ``failed`` files, and converted input ``bytes``.
+
+    Raises:
+        CLIError: If any of the files failed to convert, after converting the others.
+
+    Notes:
+        With several jobs, files are sent to workers in chunks and printed as chunks finish, not in input order.
+    """
+    summary = {'converted': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+
+    def handle(input_file, output_file, status, size, error):
+        summary[status] += 1
+        summary['bytes'] += size
+        if status == 'failed':
+            sys.stderr.write(f"{cli_bcolors.OKBLUE}{input_file}{cli_bcolors.ENDC} -> {cli_bcolors.FAIL}{error}{cli_bcolors.ENDC}\n")
+        elif verbose:
+            suffix = f" {cli_bcolors.WARNING}(up to date){cli_bcolors.ENDC}" if status == 'skipped' else ''
+            print(f"{cli_bcolors.OKBLUE}{input_file}{cli_bcolors.ENDC} -> {cli_bcolors.OKBLUE}{output_file}{cli_bcolors.ENDC}{suffix}")
+
+    start = time.perf_counter()
+    if jobs is not None and jobs > 1:
+        pairs = list(zipped)
+        chunk_size = max(1, min(64, len(pairs) // (jobs * 4)))
+        task = partial(_convert_chunk, output_type, skip_up_to_date)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for results in bounded_map(executor, task, iter_chunks(pairs, chunk_size), ordered=False):
+                for result in results:
+                    handle(*result)
+    else:
+        for pair in zipped:
+            handle(*_convert_pair(output_type, skip_up_to_date, pair))
+    elapsed = max(time.perf_counter() - start, 1e-9)
 
-        if suffix == '.ini':
-            path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
-            list_brackets = (
-                os.getenv("RICKLE_INI_OPENING_BRACES", "("), os.getenv("RICKLE_INI_CLOSING_BRACES", ")")
-            )
-            output_ini = unparse_ini(dictionary=input_data, path_sep=path_sep, list_brackets=list_brackets)
+    print(f"{cli_bcolors.OKGREEN}{summary['converted']} converted{cli_bcolors.ENDC}, "
+          f"{summary['skipped']} skipped, "
+          f"{(cli_bcolors.FAIL if summary['failed'] else '')}{summary['failed']} failed{cli_bcolors.ENDC} "
+          f"in {elapsed:.2f} s ({summary['converted'] / elapsed:.1f} files/s, "
+          f"{summary['bytes'] / elapsed / 1_000_000:.2f} MB/s)")
 
-            with output_file.open("w") as fout:
-                output_ini.write(fout)
+    if summary['failed']:
+        raise CLIError(f"{summary['failed']} file(s) failed to convert", cli_tool=CLIError.CLITool.CONV)
 
-        if verbose:
-            print(f"{cli_bcolors.OKBLUE}{pair[0]}{cli_bcolors.ENDC} -> {cli_bcolors.OKBLUE}{pair[1]}{cli_bcolors.ENDC}")
-        continue
+    return summary
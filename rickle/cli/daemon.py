@@ -0,0 +1,262 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+from collections import OrderedDict
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from rickle.tools import CLIError, cli_bcolors
+
+# Commands that only read their input (besides writing requested output files) and can be run by the daemon
+_FORWARDED_COMMANDS = [['conv'], ['obj', 'get'], ['obj', 'search'], ['obj', 'find'], ['schema', 'check']]
+# Options before the sub command that take a value
+_VALUE_OPTIONS = ['--output-type', '--input', '--output']
+
+_document_cache = None
+_document_cache_size = 64
+# Members that do not depend on the environment, other files, the network or chance
+_STATIC_MEMBER_TYPES = ['attribute', 'base64']
+
+def default_socket_path() -> str:
+    """
+    Socket path from ``RICKLE_DAEMON_SOCKET``, otherwise a per user path in the temporary directory.
+    """
+    return os.getenv('RICKLE_DAEMON_SOCKET') or os.path.join(tempfile.gettempdir(),
+                                                              f"rickle-{getattr(os, 'getuid', lambda: 0)()}.sock")
+
+def _is_static(document) -> bool:
+    # Documents with env, file, csv, api, secret or random members are loaded again for every request
+    from rickle import BaseRickle
+
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BaseRickle):
+            if any(meta.get('type') not in _STATIC_MEMBER_TYPES for meta in node._meta_info.values()):
+                return False
+            stack.extend(node.__list__ if node._input_type == 'array' else node.__dict__.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return True
+
+def load_cached(path, loader, *key):
+    """
+    Load a document through ``loader`` and, while running in the daemon, cache it by path, modification time and size.
+    Outside the daemon, or for input that is not a file, ``loader`` is simply called. Documents with members that
+    depend on anything but the file itself (environment variables, other files, APIs, secrets, random values) are
+    not cached.
+
+    Args:
+        path (str): File path (or document string) being loaded.
+        loader (callable): Function without arguments returning the loaded document.
+        *key: Further values the loaded document depends on, for example load options.
+
+    Returns:
+        Loaded document, shared between calls; it must not be modified.
+    """
+    if _document_cache is None or not isinstance(path, str) or not os.path.isfile(path):
+        return loader()
+
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size) + key
+    try:
+        document = _document_cache[cache_key]
+        _document_cache.move_to_end(cache_key)
+        return document
+    except KeyError:
+        pass
+
+    document = loader()
+    if not _is_static(document):
+        return document
+    _document_cache[cache_key] = document
+    while len(_document_cache) > _document_cache_size:
+        _document_cache.popitem(last=False)
+    return document
+
+def is_forwarded(argv: list) -> bool:
+    """
+    Whether the command line is one the daemon runs: ``conv``, ``obj get``, ``obj search``, ``obj find`` and
+    ``schema check``.
+    """
+    words = list()
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg.startswith('-'):
+            skip = arg in _VALUE_OPTIONS
+            continue
+        words.append(arg)
+        if len(words) == 2:
+            break
+    return any(words[:len(command)] == command for command in _FORWARDED_COMMANDS)
+
+def _send(connection, message: dict):
+    data = json.dumps(message).encode('utf-8')
+    connection.sendall(struct.pack('!I', len(data)) + data)
+
+def _receive(connection) -> dict:
+    def read(size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('Connection closed')
+            data.extend(chunk)
+        return bytes(data)
+
+    size, = struct.unpack('!I', read(4))
+    return json.loads(read(size).decode('utf-8'))
+
+def _request(socket_path: str, message: dict) -> dict:
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        _send(connection, message)
+        return _receive(connection)
+
+def forward(socket_path: str, argv: list):
+    """
+    Run a command line in the daemon, passing on the working directory, environment variables and piped input, and
+    write its output.
+
+    Args:
+        socket_path (str): Daemon socket.
+        argv (list): Command line arguments, without the program name.
+
+    Returns:
+        int: Exit code, or None if the command is not forwarded or the daemon can not be reached.
+    """
+    if not is_forwarded(argv):
+        return None
+
+    import socket
+
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socket_path)
+    except (OSError, AttributeError):
+        return None
+
+    with connection:
+        reads_stdin = not any(arg.startswith('--input') for arg in argv)
+        _send(connection, {
+            'command': 'run',
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'env': {k: v for k, v in os.environ.items() if k != 'RICKLE_DAEMON_SOCKET'},
+            'stdin': sys.stdin.read() if reads_stdin else None,
+        })
+        response = _receive(connection)
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['code']
+
+def _execute(parser, help_parsers, request: dict) -> dict:
+    from rickle.cli import run
+
+    stdout = StringIO()
+    stderr = StringIO()
+    code = 0
+
+    cwd = os.getcwd()
+    stdin = sys.stdin
+    own_env = dict(os.environ)
+    try:
+        os.chdir(request['cwd'])
+        # Commands see the environment of the client, as when run locally
+        os.environ.clear()
+        os.environ.update(request.get('env', dict()))
+        sys.stdin = StringIO(request.get('stdin') or '')
+
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                run(parser, help_parsers, request['argv'])
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+            except Exception as exc:
+                stderr.write(f"{cli_bcolors.FAIL}error: {exc}{cli_bcolors.ENDC}\n")
+                code = 1
+    finally:
+        os.chdir(cwd)
+        sys.stdin = stdin
+        os.environ.clear()
+        os.environ.update(own_env)
+
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'code': code}
+
+def serve_daemon(socket_path: str, cache_size: int = 64):
+    """
+    Run the daemon in the foreground until stopped. Requests are handled one at a time by the same argument
+    parser, and parsed documents and schemas are cached by path and modification time.
+
+    Args:
+        socket_path (str): Unix socket to listen on, only accessible to the current user.
+        cache_size (int): Maximum number of cached documents (default = 64).
+    """
+    global _document_cache, _document_cache_size
+    import socketserver
+    import threading
+    from rickle.cli import build_parser
+
+    parser, help_parsers = build_parser()
+    _document_cache = OrderedDict()
+    _document_cache_size = cache_size
+    stats = {'pid': os.getpid(), 'requests': 0}
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            request = _receive(self.request)
+            if request.get('command') == 'stop':
+                _send(self.request, {'stopped': True})
+                threading.Thread(target=self.server.shutdown).start()
+            elif request.get('command') == 'status':
+                _send(self.request, dict(stats, cached=len(_document_cache), socket=socket_path))
+            else:
+                stats['requests'] += 1
+                _send(self.request, _execute(parser, help_parsers, request))
+
+    if os.path.exists(socket_path):
+        try:
+            _request(socket_path, {'command': 'status'})
+            raise CLIError(f"Daemon already running on {socket_path}", cli_tool=CLIError.CLITool.DAEMON)
+        except OSError:
+            os.unlink(socket_path)
+
+    umask = os.umask(0o077)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(umask)
+
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _document_cache = None
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def daemon_cli(args):
+    socket_path = args.SOCKET or default_socket_path()
+
+    if args.ACTION == 'start':
+        cache_size = args.CACHE_SIZE or int(os.getenv('RICKLE_DAEMON_CACHE_SIZE', 64))
+        print(f"{cli_bcolors.OKGREEN}Listening on {socket_path}{cli_bcolors.ENDC}", flush=True)
+        serve_daemon(socket_path, cache_size=cache_size)
+        return
+
+    try:
+        status = _request(socket_path, {'command': 'stop' if args.ACTION == 'stop' else 'status'})
+    except OSError as exc:
+        raise CLIError(message=f"Daemon not running on {socket_path} ({exc})", cli_tool=CLIError.CLITool.DAEMON)
+    if args.ACTION == 'status':
+        print(json.dumps(status))
@@ -1,18 +1,45 @@
-import importlib.util
 import os
 import sys
 from io import StringIO
 
-from rickle.tools import unparse_ini, CLIError, get_native_type_name
+from rickle.tools import is_available, unparse_ini, CLIError, get_native_type_name
 from rickle.tools import toml_null_stripper
 
 from rickle import Rickle, UnsafeRickle
+from rickle.cli.daemon import load_cached
 import re
 import json
 import yaml
 import ast
-
-import tomli_w as tomlw
+import shlex
+
+def _dump_rickle(r, dump_type: str, output: str, cli_tool):
+    if output:
+        if dump_type in ['yaml', 'object', 'array']:
+            r.to_yaml(output=output)
+        elif dump_type in ['json', 'url']:
+            r.to_json(output=output)
+        elif dump_type == 'toml':
+            r.to_toml(output=output)
+        elif dump_type == 'xml':
+            r.to_xml(output=output)
+        elif dump_type == 'ini':
+            r.to_ini(output=output)
+        else:
+            raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=cli_tool)
+    else:
+        if dump_type in ['yaml', 'object', 'array']:
+            print(r.to_yaml())
+        elif dump_type in ['json', 'url']:
+            print(r.to_json())
+        elif dump_type == 'toml':
+            print(r.to_toml())
+        elif dump_type == 'xml':
+            print(r.to_xml())
+        elif dump_type == 'ini':
+            print(r.to_ini())
+        else:
+            raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=cli_tool)
 
 def obj_get(args):
     try:
@@ -22,7 +49,7 @@ def obj_get(args):
             else:
                 _input = sys.stdin.read()
 
-            r = Rickle(_input, load_lambda=args.LOAD_LAMBDA)
+            r = load_cached(_input, lambda: Rickle(_input, load_lambda=args.LOAD_LAMBDA), args.LOAD_LAMBDA)
 
             dump_type = args.OUTPUT_TYPE.lower() if args.OUTPUT_TYPE else r._input_type
 
@@ -43,10 +70,12 @@ def obj_get(args):
                     with open(args.OUTPUT, 'w') as fp:
                         json.dump(v, fp)
                 elif dump_type == 'toml':
+                    import tomli_w as tomlw
+
                     with open(args.OUTPUT, 'wb') as fp:
                         tomlw.dump(toml_null_stripper(v), fp)
                 elif dump_type == 'xml':
-                    if importlib.util.find_spec('xmltodict'):
+                    if is_available('xmltodict'):
                         import xmltodict
                         with open(args.OUTPUT, 'wb') as fp:
                             xmltodict.unparse(v, fp)
@@ -75,9 +104,11 @@ def obj_get(args):
                 elif dump_type in ['json', 'url']:
                     print(json.dumps(v))
                 elif dump_type == 'toml':
+                    import tomli_w as tomlw
+
                     print(tomlw.dumps(toml_null_stripper(v)))
                 elif dump_type == 'xml':
-                    if importlib.util.find_spec('xmltodict'):
+                    if is_available('xmltodict'):
                         import xmltodict
 
                         print(xmltodict.unparse(v, pretty=True))
@@ -120,33 +151,7 @@ def obj_set(args):
             v = yaml.safe_load(args.value.strip())
             r.set(args.key, v)
 
-            if args.OUTPUT:
-                if dump_type in ['yaml', 'object', 'array']:
-                    r.to_yaml(output=args.OUTPUT)
-                if dump_type in ['json', 'url']:
-                    r.to_json(output=args.OUTPUT)
-                elif dump_type == 'toml':
-                    r.to_toml(output=args.OUTPUT)
-                elif dump_type == 'xml':
-                    r.to_xml(output=args.OUTPUT)
-                elif dump_type == 'ini':
-                    r.to_ini(output=args.OUTPUT)
-                else:
-                    raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=CLIError.CLITool.OBJ_SET)
-
-            else:
-                if dump_type in ['yaml', 'object', 'array']:
-                    print(r.to_yaml())
-                elif dump_type in ['json', 'url']:
-                    print(r.to_json())
-                elif dump_type == 'toml':
-                    print(r.to_toml())
-                elif dump_type == 'xml':
-                    print(r.to_xml())
-                elif dump_type == 'ini':
-                    print(r.to_ini())
-                else:
-                    raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=CLIError.CLITool.OBJ_SET)
+            _dump_rickle(r, dump_type, args.OUTPUT, CLIError.CLITool.OBJ_SET)
 
     except Exception as exc:
         raise CLIError(message=str(exc), cli_tool=CLIError.CLITool.OBJ_SET)
@@ -165,33 +170,7 @@ def obj_put(args):
             v = yaml.safe_load(args.value.strip())
             r.put(args.key, v)
 
-            if args.OUTPUT:
-                if dump_type in ['yaml', 'object', 'array']:
-                    r.to_yaml(output=args.OUTPUT)
-                elif dump_type in ['json', 'url']:
-                    r.to_json(output=args.OUTPUT)
-                elif dump_type == 'toml':
-                    r.to_toml(output=args.OUTPUT)
-                elif dump_type == 'xml':
-                    r.to_xml(output=args.OUTPUT)
-                elif dump_type == 'ini':
-                    r.to_ini(output=args.OUTPUT)
-                else:
-                    raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=CLIError.CLITool.OBJ_PUT)
-
-            else:
-                if dump_type in ['yaml', 'object', 'array']:
-                    print(r.to_yaml())
-                elif dump_type in ['json', 'url']:
-                    print(r.to_json())
-                elif dump_type == 'toml':
-                    print(r.to_toml())
-                elif dump_type == 'xml':
-                    print(r.to_xml())
-                elif dump_type == 'ini':
-                    print(r.to_ini())
-                else:
-                    raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=CLIError.CLITool.OBJ_PUT)
+            _dump_rickle(r, dump_type, args.OUTPUT, CLIError.CLITool.OBJ_PUT)
 
     except Exception as exc:
         raise CLIError(message=str(exc), cli_tool=CLIError.CLITool.OBJ_PUT)
@@ -209,32 +188,7 @@ def obj_rm(args):
 
             r.remove(args.key)
 
-            if args.OUTPUT:
-                if dump_type in ['yaml', 'object', 'array']:
-                    r.to_yaml(output=args.OUTPUT)
-                elif dump_type in ['json', 'url']:
-                    r.to_json(output=args.OUTPUT)
-                elif dump_type == 'toml':
-                    r.to_toml(output=args.OUTPUT)
-                elif dump_type == 'xml':
-                    r.to_xml(output=args.OUTPUT)
-                elif dump_type == 'ini':
-                    r.to_ini(output=args.OUTPUT)
-                else:
-                    raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=CLIError.CLITool.OBJ_DEL)
-            else:
-                if dump_type in ['yaml', 'object', 'array']:
-                    print(r.to_yaml())
-                elif dump_type in ['json', 'url']:
-                    print(r.to_json())
-                elif dump_type == 'toml':
-                    print(r.to_toml())
-                elif dump_type == 'xml':
-                    print(r.to_xml())
-                elif dump_type == 'ini':
-                    print(r.to_ini())
-                else:
-                    raise CLIError(f"Unsupported dump type {dump_type}", cli_tool=CLIError.CLITool.OBJ_DEL)
+            _dump_rickle(r, dump_type, args.OUTPUT, CLIError.CLITool.OBJ_DEL)
 
     except Exception as exc:
         raise CLIError(message=str(exc), cli_tool=CLIError.CLITool.OBJ_DEL)
@@ -267,7 +221,7 @@ def obj_search(args):
                 _input = args.INPUT
             else:
                 _input = sys.stdin.read()
-            r = Rickle(_input, load_lambda=args.LOAD_LAMBDA)
+            r = load_cached(_input, lambda: Rickle(_input, load_lambda=args.LOAD_LAMBDA), args.LOAD_LAMBDA)
 
             paths = r.search_path(args.key, report_parent=args.PARENT_ONLY)
 
@@ -302,7 +256,9 @@ def obj_find(args):
                 _input = args.INPUT
             else:
                 _input = sys.stdin.read()
-            r = Rickle(_input, load_lambda=args.LOAD_LAMBDA, RICKLE_PATH_SEP=path_sep)
+            r = load_cached(_input,
+                            lambda: Rickle(_input, load_lambda=args.LOAD_LAMBDA, RICKLE_PATH_SEP=path_sep),
+                            args.LOAD_LAMBDA, path_sep)
 
             if args.key:
                 m = pattern.fullmatch(args.key)
@@ -445,11 +401,13 @@ def obj_python_func(args):
                     elif dump_type in ['json', 'url']:
                         print(json.dumps(v))
                     elif dump_type == 'toml':
+                        import tomli_w as tomlw
+
                         print(tomlw.dumps(v))
                     elif dump_type == 'ini':
                         print(Rickle(v).to_ini())
                     elif dump_type == 'xml':
-                        if importlib.util.find_spec('xmltodict'):
+                        if is_available('xmltodict'):
                             import xmltodict
                             print(xmltodict.unparse(input_dict=v, pretty=True))
                     else:
@@ -458,3 +416,89 @@ def obj_python_func(args):
                     print(v)
     except Exception as exc:
         raise CLIError(message=str(exc), cli_tool=CLIError.CLITool.OBJ_FUNC)
+
+def _split_batch_line(line: str):
+    """
+    Split a batch line into the operation and its operands. The value of ``set`` and ``put`` is the raw rest of the
+    line, so that it is parsed as YAML with its quotes (``put /x "123"`` puts a string).
+    """
+    lexer = shlex.shlex(line, posix=True)
+    lexer.whitespace_split = True
+    operation = lexer.get_token()
+    if operation is None:
+        return None, list()
+    operation = operation.lower()
+    if operation not in ['set', 'put']:
+        return operation, list(lexer)
+
+    operands = list()
+    path = lexer.get_token()
+    if path is not None:
+        operands.append(path)
+        value = lexer.instream.read().strip()
+        if value:
+            operands.append(value)
+    return operation, operands
+
+def obj_batch(args):
+    dump_type = None
+    try:
+        if args:
+            if args.script and args.script != '-':
+                with open(args.script, 'r') as fs:
+                    lines = fs.readlines()
+            elif args.INPUT:
+                lines = sys.stdin.readlines()
+            else:
+                raise CLIError("Batch operations can only be read from stdin when --input is given",
+                               cli_tool=CLIError.CLITool.OBJ_BATCH)
+
+            if args.INPUT:
+                _input = args.INPUT
+            else:
+                _input = sys.stdin.read()
+            r = Rickle(_input, load_lambda=args.LOAD_LAMBDA)
+
+            dump_type = args.OUTPUT_TYPE.lower() if args.OUTPUT_TYPE else r._input_type
+
+            modified = False
+            for line_number, line in enumerate(lines, start=1):
+                operation, operands = _split_batch_line(line)
+                if operation is None:
+                    continue
+                expected = 2 if operation in ['set', 'put'] else 1
+                if len(operands) != expected:
+                    raise CLIError(f"Line {line_number}: '{operation}' expects {expected} argument(s), got {len(operands)}",
+                                   cli_tool=CLIError.CLITool.OBJ_BATCH)
+
+                if operation == 'get':
+                    v = r.get(operands[0])
+                    if isinstance(v, Rickle):
+                        v = v.dict()
+                    if dump_type in ['json', 'url']:
+                        print(json.dumps(v))
+                    elif isinstance(v, (dict, list)):
+                        print(yaml.safe_dump(v, sort_keys=False))
+                    else:
+                        print('' if v is None else v)
+                elif operation == 'set':
+                    r.set(operands[0], yaml.safe_load(operands[1].strip()))
+                    modified = True
+                elif operation == 'put':
+                    r.put(operands[0], yaml.safe_load(operands[1].strip()))
+                    modified = True
+                elif operation in ['rm', 'del']:
+                    r.remove(operands[0])
+                    modified = True
+                elif operation == 'search':
+                    for p in r.search_path(operands[0]):
+                        print(p)
+                else:
+                    raise CLIError(f"Line {line_number}: unknown operation '{operation}', use get, set, put, rm, or search",
+                                   cli_tool=CLIError.CLITool.OBJ_BATCH)
+
+            if modified or args.OUTPUT:
+                _dump_rickle(r, dump_type, args.OUTPUT, CLIError.CLITool.OBJ_BATCH)
+
+    except Exception as exc:
+        raise CLIError(message=str(exc), cli_tool=CLIError.CLITool.OBJ_BATCH)
@@ -1,22 +1,26 @@
-import importlib.util
 import os
 import sys
 from pathlib import Path
 
-from rickle.tools import cli_bcolors, CLIError, infer_read_file_type
+from rickle.tools import is_available, cli_bcolors, CLIError, infer_read_file_type
 
 from rickle.schema import Schema, validate_files
+from rickle.cli.daemon import load_cached
 
 def check(args):
     try:
+        # Kept with its compiled validator when running in the daemon
+        schema = load_cached(args.SCHEMA, lambda: Schema(args.SCHEMA), os.getenv("RICKLE_PATH_SEP", "/"))
+
         if args.INPUT:
 
-            validate_files(Schema(args.SCHEMA),
+            validate_files(schema,
                            output_dir=args.FAIL_DIRECTORY,
                            input_files=args.INPUT,
                            use_json_schema=args.JSON_SCHEMA,
                            verbose_print=args.VERBOSE,
-                           silent=args.SILENT)
+                           silent=args.SILENT,
+                           jobs=args.JOBS)
         elif args.INPUT_DIRECTORY:
             input_files = list()
 
@@ -27,17 +31,17 @@ def check(args):
             input_files.extend(list(dir_path.glob("*.toml")))
             input_files.extend(list(dir_path.glob("*.xml")))
 
-            validate_files(Schema(args.SCHEMA),
+            validate_files(schema,
                            output_dir=args.FAIL_DIRECTORY,
                            input_files=input_files,
                            use_json_schema=args.JSON_SCHEMA,
                            verbose_print=args.VERBOSE,
-                           silent=args.SILENT)
+                           silent=args.SILENT,
+                           jobs=args.JOBS)
 
         else:
             data = sys.stdin.read()
 
-            schema = Schema(args.SCHEMA)
             passed = schema.validate(obj=data, use_json_schema=args.JSON_SCHEMA, verbose_print=args.VERBOSE)
 
             if not args.SILENT:
@@ -85,7 +89,7 @@ def gen(args):
                 elif suffix == '.toml':
                     schema.to_toml(str(output_file))
                 elif suffix == '.xml':
-                    if importlib.util.find_spec('xmltodict'):
+                    if is_available('xmltodict'):
                         schema.to_xml(str(output_file))
                     else:
                         raise ModuleNotFoundError("Missing 'xmltodict' package!")
@@ -108,7 +112,7 @@ def gen(args):
             elif output_type == 'toml':
                 print(schema.to_toml())
             elif output_type == 'xml':
-                if importlib.util.find_spec('xmltodict'):
+                if is_available('xmltodict'):
                     print(schema.to_xml())
                 else:
                     raise CLIError(message='Missing dependency "xmltodict" for type xml',
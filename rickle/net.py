@@ -1,4 +1,3 @@
-import importlib.util
 import sys
 import traceback
 import warnings
@@ -8,7 +7,7 @@ import yaml
 import tomli_w as tomlw
 
 from rickle import BaseRickle, toml_null_stripper, __version__ as rickle_version
-from rickle.tools import infer_read_string_type
+from rickle.tools import infer_read_string_type, is_available
 
 try:
     from twisted.web import server, resource
@@ -98,7 +97,7 @@ class HttpResource(resource.Resource):
                 elif output_type == 'toml':
                     request.setHeader(b"content-type", b"application/toml")
                     response = content.to_toml(serialised=self.serialised)
-                elif output_type == 'xml' and importlib.util.find_spec('xmltodict'):
+                elif output_type == 'xml' and is_available('xmltodict'):
                     request.setHeader(b"content-type", b"text/xml")
                     response = content.to_xml(serialised=self.serialised)
                 else:
@@ -114,7 +113,7 @@ class HttpResource(resource.Resource):
                         content = toml_null_stripper(content)
                     response = tomlw.dumps(content)
                 elif output_type == 'xml':
-                    if importlib.util.find_spec('xmltodict'):
+                    if is_available('xmltodict'):
                         import xmltodict
                         request.setHeader(b"content-type", b"text/xml")
                         if isinstance(content, list):
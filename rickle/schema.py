@@ -1,16 +1,19 @@
-import importlib
+import functools
 import json
 import os
 import re
-from io import TextIOWrapper, BytesIO
+import sys
+from contextlib import redirect_stdout
+from io import TextIOWrapper, BytesIO, StringIO
 from pathlib import Path
+from collections import namedtuple, Counter
+from concurrent.futures import ProcessPoolExecutor
 from typing import Union
 
 import yaml
-import tomli_w as tomlw
 
-from rickle.tools import infer_read_file_type, infer_read_string_type, cli_bcolors, get_native_type_name, \
-    toml_null_stripper
+from rickle.tools import is_available, optional_import, infer_read_file_type, infer_read_string_type, cli_bcolors, get_native_type_name, \
+    toml_null_stripper, bounded_map, iter_chunks
 
 JSON_SCHEMA_STRING = "string"
 JSON_SCHEMA_INTEGER = "integer"
@@ -88,42 +91,536 @@ def data_types_to_schema(value: Union[list, dict, str, int, float, bool, None],
                                                         include_extended_properties=include_extended_properties))
         return named_schema
 
-def validate_files(schema, input_files, output_dir, use_json_schema, verbose_print, silent=False):
+def _print_violation(violation, message):
+    print(message)
+
+def _load_validation_input(obj):
+    if isinstance(obj, str):
+        if Path(obj).is_file():
+            return infer_read_file_type(obj)
+        return infer_read_string_type(obj)
+    return obj
+
+_worker_schema = None
+
+def _init_validation_worker(schema: dict):
+    global _worker_schema
+    _worker_schema = Schema(schema)
+    _worker_schema.compile()
+
+def _validate_chunk(chunk: list, fail_fast: bool):
+    return [_worker_schema._violations(_load_validation_input(obj), fail_fast=fail_fast) for obj in chunk]
+
+def _check_file(schema, file, use_json_schema: bool, verbose_print: bool):
+    try:
+        return schema.validate(obj=str(file), use_json_schema=use_json_schema, verbose_print=verbose_print), None
+    except Exception as exc:
+        return None, str(exc)
+
+def _check_file_in_worker(file, use_json_schema: bool, verbose_print: bool):
+    output = StringIO()
+    with redirect_stdout(output):
+        passed, error = _check_file(_worker_schema, file, use_json_schema, verbose_print)
+    return file, passed, error, output.getvalue()
+
+def validate_files(schema, input_files, output_dir, use_json_schema, verbose_print, silent=False, jobs=None):
     """
     Validates input files against schema definition.
 
+    Args:
+        schema (Schema): Schema to validate against.
+        input_files (iterable): File paths.
+        output_dir (str): Directory to move files that fail validation to, or None.
+        use_json_schema (bool): Use JSON Schema to validate.
+        verbose_print (bool): Print errors to stdout.
+        silent (bool): Do not print OK / FAIL per file (default = False).
+        jobs (int): Number of worker processes, validates in this process if None or 1 (default = None).
+
     Returns:
         list: List of files that did not pass validation.
+
+    Notes:
+        With several jobs each worker loads the schema once and results are printed as files finish, not in input
+        order. Failed files are only moved by this process, once their worker is done with them.
     """
     failed_validation = list()
 
-    for file in input_files:
-        try:
-            passed = schema.validate(obj=file, use_json_schema=use_json_schema, verbose_print=verbose_print)
-
-            if not passed:
-                failed_validation.append(file)
+    outdir = None
+    if output_dir:
+        outdir = Path(output_dir)
+        outdir.mkdir(parents=True, exist_ok=True)
 
-            if not silent:
-                result = f"{cli_bcolors.OKGREEN}OK{cli_bcolors.ENDC}" if passed else f"{cli_bcolors.FAIL}FAIL{cli_bcolors.ENDC}"
-                print(f"{cli_bcolors.OKBLUE}{file}{cli_bcolors.ENDC} -> {result}")
-            continue
-        except Exception as exc:
+    def handle(file, passed, error, output):
+        if output:
+            sys.stdout.write(output)
+        if error is not None:
             if verbose_print:
-                print(f"{cli_bcolors.FAIL}{str(exc)}{cli_bcolors.ENDC}")
-            continue
+                print(f"{cli_bcolors.FAIL}{error}{cli_bcolors.ENDC}")
+            return
+
+        if not passed:
+            failed_validation.append(file)
+            if outdir:
+                f_path = Path(file)
+                f_path.rename(outdir / f_path.name)
+
+        if not silent:
+            result = f"{cli_bcolors.OKGREEN}OK{cli_bcolors.ENDC}" if passed else f"{cli_bcolors.FAIL}FAIL{cli_bcolors.ENDC}"
+            print(f"{cli_bcolors.OKBLUE}{file}{cli_bcolors.ENDC} -> {result}")
+
+    if jobs is not None and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_validation_worker, initargs=(schema.schema, )) as executor:
+            task = functools.partial(_check_file_in_worker, use_json_schema=use_json_schema, verbose_print=verbose_print)
+            for result in bounded_map(executor, task, input_files, ordered=False):
+                handle(*result)
+    else:
+        for file in input_files:
+            handle(file, *_check_file(schema, file, use_json_schema, verbose_print), None)
 
-    if output_dir:
-        outdir = Path(output_dir)
-        if not outdir.is_dir():
-            outdir.mkdir()
+    return failed_validation
+
+_PYTHON_TYPE_NAMES = ['str', 'int', 'float', 'bool', 'list', 'ndarray', 'array', 'dict', 'Rickle', 'UnsafeRickle',
+                      'BaseRickle', 'NoneType']
+
+# JSON type name -> Python type names that are of that type, e.g. 'object' -> {'dict', 'Rickle', ...}
+_JSON_TYPE_NAMES = {json_type: frozenset(p for p in _PYTHON_TYPE_NAMES
+                                         if get_native_type_name(p, 'json') == json_type)
+                    for json_type in JSON_SCHEMA_TYPES}
+
+# Element type of typed containers: NumPy dtype kinds and array.array type codes
+_DTYPE_KIND_TYPES = {'i': JSON_SCHEMA_INTEGER, 'u': JSON_SCHEMA_INTEGER, 'f': JSON_SCHEMA_NUMBER,
+                     'b': JSON_SCHEMA_BOOLEAN, 'U': JSON_SCHEMA_STRING}
+_TYPECODE_TYPES = {**{c: JSON_SCHEMA_INTEGER for c in 'bBhHiIlLqQ'}, 'f': JSON_SCHEMA_NUMBER, 'd': JSON_SCHEMA_NUMBER,
+                   'u': JSON_SCHEMA_STRING, 'w': JSON_SCHEMA_STRING}
+
+def _typed_element_type(obj):
+    dtype = getattr(obj, 'dtype', None)
+    if dtype is not None:
+        return _DTYPE_KIND_TYPES.get(dtype.kind)
+    typecode = getattr(obj, 'typecode', None)
+    if typecode is not None:
+        return _TYPECODE_TYPES.get(typecode)
+    return None
+
+def _regex_check(pattern: str):
+    match = re.compile(pattern).match
+    return lambda value: match(value) is not None
+
+def _locale_check(pyvalidator, schema_info):
+    from pyvalidator.is_mobile_number import mobile_number_patterns
+
+    locales = mobile_number_patterns.keys()
+    return lambda value: value in locales
+
+# Type name -> factory (pyvalidator, schema_info) -> predicate, options are read once when compiling
+_PYVALIDATOR_CHECKS = {
+    'regex-pattern': lambda pv, info: pv.is_regex,
+    'ip-address': lambda pv, info: functools.partial(pv.is_ip, version=info.get('version', None)),
+    'port-number': lambda pv, info: pv.is_port,
+    'fqdn': lambda pv, info: functools.partial(pv.is_fqdn, options={
+        'require_tld': info.get('require_tld', True),
+        'allow_underscores': info.get('allow_underscores', False),
+        'allow_trailing_dot': info.get('allow_trailing_dot', False),
+        'allow_numeric_tld': info.get('allow_numeric_tld', False),
+        'allow_wildcard': info.get('allow_wildcard', False),
+    }),
+    'url': lambda pv, info: functools.partial(pv.is_url, options={
+        'no_scheme': info.get('no_scheme', False),
+        'with_no_path': info.get('with_no_path', False),
+        'insensitive': info.get('insensitive', True),
+        'top_level_domains': info.get('top_level_domains', list()),
+        'allow_wildcard': info.get('allow_wildcard', list()),
+    }),
+    'mac-address': lambda pv, info: functools.partial(pv.is_mac_address, options={
+        'no_separators': info.get('no_separators', False),
+        'eui': info.get('eui', None),
+    }),
+    'pyval-number': lambda pv, info: pv.is_number,
+    'prime-number': lambda pv, info: pv.is_prime,
+    'hex': lambda pv, info: pv.is_hexadecimal,
+    'base64': lambda pv, info: functools.partial(pv.is_base64, options={
+        'url_safe': info.get('url_safe', False),
+    }),
+    'ean': lambda pv, info: pv.is_ean,
+    'colour-hex': lambda pv, info: _regex_check(r'^#(?:[0-9a-fA-F]{3,4}){1,2}$'),
+    'colour-rgb': lambda pv, info: functools.partial(pv.is_rgb_color,
+                                                     include_percent_values=info.get('include_percent_values', True)),
+    'email': lambda pv, info: functools.partial(pv.is_email, options={
+        'allow_display_name': info.get('allow_display_name', False),
+        'require_display_name': info.get('require_display_name', False),
+        'allow_utf8_local_part': info.get('allow_utf8_local_part', True),
+        'require_tld': info.get('require_tld', True),
+        'allow_ip_domain': info.get('allow_ip_domain', False),
+        'domain_specific_validation': info.get('domain_specific_validation', False),
+        'ignore_max_length': info.get('ignore_max_length', False),
+        'blacklisted_chars': info.get('blacklisted_chars', ''),
+        'host_blacklist': info.get('host_blacklist', list()),
+    }),
+    'phone': lambda pv, info: functools.partial(pv.is_mobile_number, locale=info.get('locale', 'any'), options={
+        'strict_mode': info.get('strict_mode', True),
+    }),
+    'iso-6391': lambda pv, info: pv.is_iso6391,
+    'iso-lang': lambda pv, info: pv.is_iso6391,
+    'iso-31661': lambda pv, info: pv.is_ISO31661_alpha2,
+    'iso-country': lambda pv, info: pv.is_ISO31661_alpha2,
+    'locale': _locale_check,
+    'lat-long': lambda pv, info: functools.partial(pv.is_lat_long, options={
+        'check_dms': info.get('check_dms', False),
+    }),
+    'date': lambda pv, info: functools.partial(pv.is_date, options={
+        'format': info.get('format', 'YYYY/MM/DD'),
+        'strict_mode': info.get('strict_mode', False),
+        'delimiters': info.get('delimiters', ['/', '-']),
+    }),
+    'uuid': lambda pv, info: functools.partial(pv.is_uuid, version=info.get('version', 'all')),
+    'sem-ver': lambda pv, info: pv.is_semantic_version,
+    'mime-type': lambda pv, info: pv.is_mime_type,
+    'cloud-aws-region': lambda pv, info: _regex_check(
+        r'^(af|il|ap|ca|eu|me|sa|us|cn|us-gov|us-iso|us-isob)-(central|north|(north(?:east|west))|south|south(?:east|west)|east|west)-\d{1}$'),
+    'cloud-aws-arn': lambda pv, info: functools.partial(pv.is_aws_arn, resource=info.get('resource', 'any')),
+    'bic': lambda pv, info: pv.is_bic,
+    'swift': lambda pv, info: pv.is_bic,
+    'credit-card': lambda pv, info: pv.is_credit_card,
+    'iban': lambda pv, info: functools.partial(pv.is_iban, country_code=info.get('country_code', None), options={
+        'insensitive': info.get('insensitive', False),
+    }),
+    'ethereum-address': lambda pv, info: pv.is_ethereum_address,
+    'eth-address': lambda pv, info: pv.is_ethereum_address,
+    'bitcoin-address': lambda pv, info: pv.is_btc_address,
+    'btc-address': lambda pv, info: pv.is_btc_address,
+    'magnet-uri': lambda pv, info: pv.is_magnet_uri,
+    'hash': lambda pv, info: functools.partial(pv.is_hash, algorithm=info.get('algorithm', None)),
+}
+
+def _compile_type_check(schema_info: dict, pyvalidator):
+    """
+    Build the predicate for a single property type, or None when any value is accepted ('any').
+    """
+    if not 'type' in schema_info.keys():
+        raise ValueError(f'No type defined in {str(schema_info)}!')
+    schema_type = schema_info['type'].lower().strip()
+
+    if schema_type == 'any':
+        return None
+    if schema_type == 'regex':
+        matches = _regex_check(schema_info['pattern'])
+    elif schema_type in JSON_SCHEMA_TYPES:
+        names = _JSON_TYPE_NAMES[schema_type]
+        if schema_type == JSON_SCHEMA_NUMBER:
+            names = names | _JSON_TYPE_NAMES[JSON_SCHEMA_INTEGER]
+        matches = lambda value: type(value).__name__ in names
+    elif pyvalidator is not None and schema_type in _PYVALIDATOR_CHECKS:
+        matches = _PYVALIDATOR_CHECKS[schema_type](pyvalidator, schema_info)
+    else:
+        matches = lambda value: False
 
-        for f in failed_validation:
-            f_path = Path(f)
-            f_path.rename(outdir / f_path.name)
+    if schema_info.get('nullable', False):
+        return lambda value: value is None or matches(value)
+    return matches
 
+SchemaViolation = namedtuple('SchemaViolation', ['path', 'expected', 'actual'])
 
-    return failed_validation
+def _compile_node(schema: dict, pyvalidator, path_sep: str):
+    """
+    Build the checker ``check(obj, path, report, collect) -> bool`` for an object or array schema. Paths are only
+    formatted when reporting a failure or when descending into nested objects and arrays. Failures are passed to
+    ``report(violation, message)`` if given; checking stops at the first failure unless ``collect`` is True.
+    """
+    if schema['type'] == JSON_SCHEMA_OBJECT:
+        properties = list()
+        for k, v in schema['properties'].items():
+            child = _compile_node(v, pyvalidator, path_sep) if v['type'] in [JSON_SCHEMA_OBJECT, JSON_SCHEMA_ARRAY] else None
+            properties.append((k, v, v.get('required', False), _compile_type_check(v, pyvalidator), child))
+
+        def check_object(obj, path, report, collect):
+            passed = True
+            keys = obj.keys()
+            for k, v, required, accepts, child in properties:
+                if not k in keys:
+                    if required:
+                        if report is not None:
+                            report(SchemaViolation(f"{path}{path_sep}{k}", 'required', 'missing'),
+                                   f"Required {cli_bcolors.FAIL}'{k}'{cli_bcolors.ENDC} (per schema {v}),\n In {obj},\n Path {cli_bcolors.WARNING}{path}{path_sep}{k}{cli_bcolors.ENDC}")
+                        if not collect:
+                            return False
+                        passed = False
+                    continue
+                value = obj[k]
+                if accepts is not None and not accepts(value):
+                    if report is not None:
+                        actual = get_native_type_name(type(value).__name__, 'json')
+                        expected = v['type'].lower().strip()
+                        report(SchemaViolation(f"{path}{path_sep}{k}", expected, actual),
+                               f"Type '{k}' == {cli_bcolors.FAIL}'{actual}'{cli_bcolors.ENDC},\n Required type {cli_bcolors.OKBLUE}'{expected}'{cli_bcolors.ENDC} (per schema {v}),\n In {obj},\n Path {cli_bcolors.WARNING}{path}{path_sep}{k}{cli_bcolors.ENDC}")
+                    if not collect:
+                        return False
+                    passed = False
+                    continue
+                if child is not None and value is not None and not child(value, f"{path}{path_sep}{k}", report, collect):
+                    if not collect:
+                        return False
+                    passed = False
+            return passed
+
+        return check_object
+
+    if schema['type'] == JSON_SCHEMA_ARRAY:
+        nullable = schema.get('nullable', False)
+        length = schema.get('length', -1)
+        min_ = schema.get('min', -1)
+        max_ = schema.get('max', -1)
+        items = schema.get('items', list())
+        single_type = items[0] if len(items) > 0 else None
+        if single_type is not None:
+            element_type = single_type['type']
+            element_names = None if element_type == 'any' else _JSON_TYPE_NAMES.get(element_type, frozenset())
+            child = _compile_node(single_type, pyvalidator, path_sep) if element_type in [JSON_SCHEMA_OBJECT, JSON_SCHEMA_ARRAY] else None
+
+        def report_length(obj, path, report, requirement, bound, expected):
+            if report is not None:
+                report(SchemaViolation(path, expected, f'length == {len(obj)}'),
+                       f"Length '{obj}' == {cli_bcolors.FAIL}{len(obj)}{cli_bcolors.ENDC},\n {requirement} {cli_bcolors.OKBLUE}{bound}{cli_bcolors.ENDC} (per schema {items}),\n In {obj},\n Path {cli_bcolors.WARNING}{path}{cli_bcolors.ENDC}")
+
+        def check_array(obj, path, report, collect):
+            if nullable and obj is None:
+                return True
+
+            passed = True
+            obj_length = len(obj)
+            if length > -1 and obj_length != length:
+                report_length(obj, path, report, 'Required length', length, f'length == {length}')
+                if not collect:
+                    return False
+                passed = False
+            if min_ > -1 and obj_length < min_:
+                report_length(obj, path, report, 'Required minimum length', min_, f'length >= {min_}')
+                if not collect:
+                    return False
+                passed = False
+            if max_ > -1 and obj_length > max_:
+                report_length(obj, path, report, 'Required maximum length', max_, f'length <= {max_}')
+                if not collect:
+                    return False
+                passed = False
+
+            if single_type is None:
+                return passed
+            if child is None:
+                # Scalar elements: one check for the whole array, elements are only visited to report failures
+                if element_names is None:
+                    return passed
+                if not isinstance(obj, list):
+                    typed_element_type = _typed_element_type(obj)
+                    if typed_element_type is not None and typed_element_type == element_type:
+                        return passed
+                    if hasattr(obj, 'tolist'):
+                        obj = obj.tolist()
+                if all(t.__name__ in element_names for t in set(map(type, obj))):
+                    return passed
+            for i, o in enumerate(obj):
+                if element_names is not None and type(o).__name__ not in element_names:
+                    if report is not None:
+                        actual = get_native_type_name(type(o).__name__, 'json')
+                        report(SchemaViolation(f"{path}{path_sep}[{i}]", element_type, actual),
+                               f"Type '{o}' == {cli_bcolors.FAIL}'{actual}'{cli_bcolors.ENDC},\n Required type {cli_bcolors.OKBLUE}'{element_type}'{cli_bcolors.ENDC} (per schema {single_type}),\n In {o},\n Path {cli_bcolors.WARNING}{path}{path_sep}[{i}]{cli_bcolors.ENDC}")
+                    if not collect:
+                        return False
+                    passed = False
+                    continue
+                if child is not None and not child(o, f"{path}{path_sep}[{i}]", report, collect):
+                    if not collect:
+                        return False
+                    passed = False
+            return passed
+
+        return check_array
+
+    return lambda obj, path, report, collect: False
+
+_json_type_names = dict()
+
+def _json_type_name(value_type: type) -> str:
+    name = _json_type_names.get(value_type)
+    if name is None:
+        name = _json_type_names[value_type] = get_native_type_name(value_type.__name__, 'json', default='any')
+    return name
+
+def _new_observation() -> dict:
+    return {'count': 0, 'nulls': 0, 'types': dict()}
+
+class SchemaInferrer:
+    """
+    Infers a schema incrementally from many sample documents. Only a summary of what was observed is kept: the
+    types, nulls and presence of every key, and the lengths and element types of arrays, so memory depends on the
+    shape of the documents and not on how many were seen. Inferrers fed by different processes can be merged.
+
+    Args:
+        include_extended_properties (bool): Whether to include "required", "nullable", etc. (default = True).
+        max_properties (int): Maximum number of keys tracked per object, further new keys are ignored (default = 1000).
+
+    """
+
+    def __init__(self, include_extended_properties: bool = True, max_properties: int = 1000):
+        self.include_extended_properties = include_extended_properties
+        self.max_properties = max_properties
+        self.root = _new_observation()
+
+    @property
+    def count(self) -> int:
+        """
+        Number of documents observed.
+        """
+        return self.root['count']
+
+    def update(self, obj):
+        """
+        Observe one document.
+
+        Args:
+            obj: Dict like object, string or file path.
+
+        Returns:
+            SchemaInferrer: self.
+        """
+        self._observe(self.root, _load_validation_input(obj))
+        return self
+
+    def update_many(self, objects):
+        """
+        Observe many documents.
+
+        Args:
+            objects (iterable): Dict like objects, strings or file paths.
+
+        Returns:
+            SchemaInferrer: self.
+        """
+        for obj in objects:
+            self._observe(self.root, _load_validation_input(obj))
+        return self
+
+    def merge(self, other: 'SchemaInferrer'):
+        """
+        Merge what another inferrer observed, for example one that ran in a worker process.
+
+        Args:
+            other (SchemaInferrer): Inferrer to merge.
+
+        Returns:
+            SchemaInferrer: self.
+        """
+        self._merge(self.root, other.root)
+        return self
+
+    def schema(self):
+        """
+        Build the schema of everything observed so far.
+
+        Returns:
+            Schema: Schema with inferred definition.
+        """
+        return Schema(self._to_schema(self.root, required=False))
+
+    def _observe(self, node: dict, value):
+        node['count'] += 1
+        if value is None:
+            node['nulls'] += 1
+            return
+        json_type = _json_type_name(type(value))
+        types = node['types']
+        types[json_type] = types.get(json_type, 0) + 1
+
+        if json_type == JSON_SCHEMA_OBJECT:
+            properties = node.setdefault('properties', dict())
+            for k, v in value.items():
+                child = properties.get(k)
+                if child is None:
+                    if len(properties) >= self.max_properties:
+                        continue
+                    child = properties[k] = _new_observation()
+                self._observe(child, v)
+        elif json_type == JSON_SCHEMA_ARRAY:
+            length = len(value)
+            node['min_length'] = min(node.get('min_length', length), length)
+            node['max_length'] = max(node.get('max_length', length), length)
+            if length == 0:
+                return
+            items = node.get('items')
+            if items is None:
+                items = node['items'] = _new_observation()
+
+            # Scalars are counted per type, only objects and arrays are visited one by one
+            nested = False
+            for value_type, count in Counter(map(type, value)).items():
+                element_type = _json_type_name(value_type)
+                if value_type is type(None):
+                    items['count'] += count
+                    items['nulls'] += count
+                elif element_type in [JSON_SCHEMA_OBJECT, JSON_SCHEMA_ARRAY]:
+                    nested = True
+                else:
+                    items['count'] += count
+                    items['types'][element_type] = items['types'].get(element_type, 0) + count
+            if nested:
+                for v in value:
+                    if _json_type_name(type(v)) in [JSON_SCHEMA_OBJECT, JSON_SCHEMA_ARRAY]:
+                        self._observe(items, v)
+
+    def _merge(self, node: dict, other: dict):
+        node['count'] += other['count']
+        node['nulls'] += other['nulls']
+        for json_type, count in other['types'].items():
+            node['types'][json_type] = node['types'].get(json_type, 0) + count
+        if 'min_length' in other:
+            node['min_length'] = min(node.get('min_length', other['min_length']), other['min_length'])
+            node['max_length'] = max(node.get('max_length', other['max_length']), other['max_length'])
+        if 'properties' in other:
+            properties = node.setdefault('properties', dict())
+            for k, child in other['properties'].items():
+                if k in properties:
+                    self._merge(properties[k], child)
+                elif len(properties) < self.max_properties:
+                    properties[k] = child
+        if 'items' in other:
+            if 'items' in node:
+                self._merge(node['items'], other['items'])
+            else:
+                node['items'] = other['items']
+
+    def _to_schema(self, node: dict, required: bool, array_item: bool = False) -> dict:
+        types = set(node['types'].keys())
+        # Integers pass as numbers, except as array items
+        if types == {JSON_SCHEMA_INTEGER, JSON_SCHEMA_NUMBER} and not array_item:
+            schema_type = JSON_SCHEMA_NUMBER
+        elif len(types) == 1:
+            schema_type = types.pop()
+        elif len(types) == 0:
+            schema_type = JSON_SCHEMA_NULL
+        else:
+            schema_type = 'any'
+
+        if self.include_extended_properties:
+            named_schema = dict({'type': schema_type, 'required': required, 'nullable': node['nulls'] > 0,
+                                 'description': None})
+        else:
+            named_schema = dict({'type': schema_type})
+
+        if schema_type == JSON_SCHEMA_OBJECT:
+            objects = node['types'][JSON_SCHEMA_OBJECT]
+            named_schema['properties'] = {k: self._to_schema(child, required=child['count'] == objects)
+                                          for k, child in node.get('properties', dict()).items()}
+        elif schema_type == JSON_SCHEMA_ARRAY:
+            if self.include_extended_properties:
+                named_schema['length'] = -1
+                named_schema['min'] = node['min_length']
+                named_schema['max'] = node['max_length']
+            named_schema['items'] = [self._to_schema(node['items'], required=False, array_item=True)] if 'items' in node else list()
+
+        return named_schema
+
+def _infer_chunk(chunk: list, include_extended_properties: bool, max_properties: int):
+    return SchemaInferrer(include_extended_properties=include_extended_properties,
+                          max_properties=max_properties).update_many(chunk)
 
 class Schema:
     """
@@ -199,6 +696,8 @@ class Schema:
         """
         schema = toml_null_stripper(self.schema)
 
+        import tomli_w as tomlw
+
         if output:
             if isinstance(output, BytesIO):
                 tomlw.dump(schema, output)
@@ -217,7 +716,7 @@ class Schema:
             encoding (str): Output stream encoding (default = 'utf-8').
 
         """
-        if importlib.util.find_spec('xmltodict'):
+        if is_available('xmltodict'):
             import xmltodict
 
             if len(self.schema.keys()) > 1:
@@ -258,6 +757,39 @@ class Schema:
 
         return cls(data_types_to_schema(rep, include_extended_properties=include_extended_properties))
 
+    @classmethod
+    def generate_from_stream(cls, objects, include_extended_properties: bool = True, jobs: int = None,
+                             chunk_size: int = 256, max_properties: int = 1000):
+        """
+        Generate a schema definition from many sample objects, see ``SchemaInferrer``.
+
+        Args:
+            objects (iterable): Dict like objects, strings or file paths, for example parsed JSONL records.
+            include_extended_properties (bool): Whether to include "required", "nullable", etc. (default = True).
+            jobs (int): Number of worker processes, infers in this process if None or 1 (default = None).
+            chunk_size (int): Number of objects sent to a worker process at a time (default = 256).
+            max_properties (int): Maximum number of keys tracked per object (default = 1000).
+
+        Returns:
+            Schema: Schema with generated definition.
+
+        Notes:
+            Unlike ``generate_from_obj``, "required" is only set for keys present in every sample, "nullable" only
+            for values that were null, and array "min" / "max" are the observed lengths.
+        """
+        inferrer = SchemaInferrer(include_extended_properties=include_extended_properties,
+                                  max_properties=max_properties)
+        if jobs is None or jobs <= 1:
+            return cls(inferrer.update_many(objects).schema().schema)
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            task = functools.partial(_infer_chunk, include_extended_properties=include_extended_properties,
+                                     max_properties=max_properties)
+            for partial in bounded_map(executor, task, iter_chunks(objects, chunk_size)):
+                inferrer.merge(partial)
+
+        return cls(inferrer.schema().schema)
+
     def validate(self, obj: Union[str, dict], use_json_schema: bool = False, verbose_print: bool = False):
         """
         Validate an object against this schema.
@@ -272,15 +804,10 @@ class Schema:
         """
         _path_sep = os.getenv("RICKLE_PATH_SEP", "/")
 
-        if isinstance(obj, str):
-            if Path(obj).is_file():
-                obj = infer_read_file_type(obj)
-            else:
-                obj = infer_read_string_type(obj)
-
+        obj = _load_validation_input(obj)
 
         if use_json_schema:
-            if importlib.util.find_spec('jsonschema'):
+            if is_available('jsonschema'):
                 from jsonschema import validate
                 from jsonschema.exceptions import ValidationError
 
@@ -295,295 +822,68 @@ class Schema:
             else:
                 raise ImportError('Could not find package "jsonschema"!')
 
-        def schema_validation(_obj, schema: dict, path: str = ''):
-
-            _path_sep = os.getenv("RICKLE_PATH_SEP", "/")
-
-            if not 'type' in schema.keys():
-                raise ValueError(f'No type defined in {str(schema)}!')
-
-            def _check_type(object_value, schema_info, is_nullable):
-
-                if not 'type' in schema_info.keys():
-                    raise ValueError(f'No type defined in {str(schema_info)}!')
-                schema_type = schema_info['type'].lower().strip()
-                object_type = type(object_value).__name__
-                object_type_matches = False
-
-                if schema_type == 'regex':
-                    pattern = schema_info['pattern']
-                    match = re.match(pattern=pattern, string=object_value)
-                    object_type_matches = match is not None
-                if importlib.util.find_spec('pyvalidator'):
-                    if schema_type == 'regex-pattern':
-                        from pyvalidator import is_regex
-
-                        object_type_matches = is_regex(object_value)
-                    if schema_type == 'ip-address':
-                        from pyvalidator import is_ip
-                        ver = schema_info.get('version', None)
-
-                        object_type_matches = is_ip(object_value, version=ver)
-                    if schema_type == 'port-number':
-                        from pyvalidator import is_port
-                        object_type_matches = is_port(object_value)
-                    if schema_type == 'fqdn':
-                        from pyvalidator import is_fqdn
-                        options = {
-                            'require_tld': schema_info.get('require_tld', True),
-                            'allow_underscores': schema_info.get('allow_underscores', False),
-                            'allow_trailing_dot': schema_info.get('allow_trailing_dot', False),
-                            'allow_numeric_tld': schema_info.get('allow_numeric_tld', False),
-                            'allow_wildcard': schema_info.get('allow_wildcard', False),
-                        }
-
-                        object_type_matches = is_fqdn(object_value, options=options)
-                    if schema_type == 'url':
-                        from pyvalidator import is_url
-                        options = {
-                            'no_scheme': schema_info.get('no_scheme', False),
-                            'with_no_path': schema_info.get('with_no_path', False),
-                            'insensitive': schema_info.get('insensitive', True),
-                            'top_level_domains': schema_info.get('top_level_domains', list()),
-                            'allow_wildcard': schema_info.get('allow_wildcard', list()),
-                        }
-
-                        object_type_matches = is_url(object_value, options=options)
-                    if schema_type == 'mac-address':
-                        from pyvalidator import is_mac_address
-                        options = {
-                            'no_separators': schema_info.get('no_separators', False),
-                            'eui': schema_info.get('eui', None),
-                        }
-
-                        object_type_matches = is_mac_address(object_value, options=options)
-                    if schema_type == 'pyval-number':
-                        from pyvalidator import is_number
-                        object_type_matches = is_number(object_value)
-                    if schema_type == 'prime-number':
-                        from pyvalidator import is_prime
-                        object_type_matches = is_prime(object_value)
-                    if schema_type == 'hex':
-                        from pyvalidator import is_hexadecimal
-                        object_type_matches = is_hexadecimal(object_value)
-                    if schema_type == 'base64':
-                        from pyvalidator import is_base64
-                        options = {
-                            'url_safe': schema_info.get('url_safe', False),
-                        }
-
-                        object_type_matches = is_base64(object_value, options=options)
-                    if schema_type == 'ean':
-                        from pyvalidator import is_ean
-                        object_type_matches = is_ean(object_value)
-                    if schema_type == 'colour-hex':
-                        match = re.match(pattern=r'^#(?:[0-9a-fA-F]{3,4}){1,2}$',
-                                         string=object_value)
-                        object_type_matches = match is not None
-                    if schema_type == 'colour-rgb':
-                        from pyvalidator import is_rgb_color
-
-                        object_type_matches = is_rgb_color(object_value,
-                                                           include_percent_values=schema_info.get(
-                                                               'include_percent_values',
-                                                               True))
-                    if schema_type == 'email':
-                        from pyvalidator import is_email
-                        options = {
-                            'allow_display_name': schema_info.get('allow_display_name', False),
-                            'require_display_name': schema_info.get('require_display_name', False),
-                            'allow_utf8_local_part': schema_info.get('allow_utf8_local_part', True),
-                            'require_tld': schema_info.get('require_tld', True),
-                            'allow_ip_domain': schema_info.get('allow_ip_domain', False),
-                            'domain_specific_validation': schema_info.get('domain_specific_validation', False),
-                            'ignore_max_length': schema_info.get('ignore_max_length', False),
-                            'blacklisted_chars': schema_info.get('blacklisted_chars', ''),
-                            'host_blacklist': schema_info.get('host_blacklist', list()),
-                        }
-
-                        object_type_matches = is_email(object_value, options=options)
-                    if schema_type == 'phone':
-                        from pyvalidator import is_mobile_number
-                        options = {
-                            'strict_mode': schema_info.get('strict_mode', True),
-                        }
-                        object_type_matches = is_mobile_number(object_value, locale=schema_info.get('locale', 'any'),
-                                                               options=options)
-                    if schema_type == 'iso-6391' or schema_type == 'iso-lang':
-                        from pyvalidator import is_iso6391
-
-                        object_type_matches = is_iso6391(object_value)
-                    if schema_type == 'iso-31661' or schema_type == 'iso-country':
-                        from pyvalidator import is_ISO31661_alpha2
-
-                        object_type_matches = is_ISO31661_alpha2(object_value)
-
-                    if schema_type == 'locale':
-                        from pyvalidator.is_mobile_number import mobile_number_patterns
-
-                        object_type_matches = object_value in mobile_number_patterns.keys()
-                    if schema_type == 'lat-long':
-                        from pyvalidator import is_lat_long
-                        options = {
-                            'check_dms': schema_info.get('check_dms', False),
-                        }
-
-                        object_type_matches = is_lat_long(object_value, options=options)
-                    if schema_type == 'date':
-                        from pyvalidator import is_date
-
-                    if schema_type == 'date':
-                        from pyvalidator import is_date
-                        options = {
-                            'format': schema_info.get('format', 'YYYY/MM/DD'),
-                            'strict_mode': schema_info.get('strict_mode', False),
-                            'delimiters': schema_info.get('delimiters', ['/', '-']),
-                        }
-
-                        object_type_matches = is_date(object_value, options=options)
-                    if schema_type == 'uuid':
-                        from pyvalidator import is_uuid
-                        object_type_matches = is_uuid(object_value, version=schema_info.get('version', 'all'))
-                    if schema_type == 'sem-ver':
-                        from pyvalidator import is_semantic_version
-                        object_type_matches = is_semantic_version(object_value)
-                    if schema_type == 'mime-type':
-                        from pyvalidator import is_mime_type
-                        object_type_matches = is_mime_type(object_value)
-                    if schema_type == 'cloud-aws-region':
-                        match = re.match(
-                            pattern=r'^(af|il|ap|ca|eu|me|sa|us|cn|us-gov|us-iso|us-isob)-(central|north|(north(?:east|west))|south|south(?:east|west)|east|west)-\d{1}$',
-                            string=object_value)
-                        object_type_matches = match is not None
-                    if schema_type == 'cloud-aws-arn':
-                        from pyvalidator import is_aws_arn
-                        object_type_matches = is_aws_arn(object_value, resource=schema_info.get('resource', 'any'))
-
-                    if schema_type == 'bic' or schema_type == 'swift':
-                        from pyvalidator import is_bic
-                        object_type_matches = is_bic(object_value)
-                    if schema_type == 'credit-card':
-                        from pyvalidator import is_credit_card
-                        object_type_matches = is_credit_card(object_value)
-                    if schema_type == 'iban':
-                        from pyvalidator import is_iban
-                        options = {
-                            'insensitive': schema_info.get('insensitive', False),
-                        }
-                        object_type_matches = is_iban(object_value, country_code=schema_info.get('country_code', None),
-                                                      options=options)
-                    if schema_type == 'ethereum-address' or schema_type == 'eth-address':
-                        from pyvalidator import is_ethereum_address
-
-                        object_type_matches = is_ethereum_address(object_value)
-                    if schema_type == 'bitcoin-address' or schema_type == 'btc-address':
-                        from pyvalidator import is_btc_address
-
-                        object_type_matches = is_btc_address(object_value)
-                    if schema_type == 'magnet-uri':
-                        from pyvalidator import is_magnet_uri
-
-                        object_type_matches = is_magnet_uri(object_value)
-                    if schema_type == 'hash':
-                        from pyvalidator import is_hash
-
-                        object_type_matches = is_hash(object_value, algorithm=schema_info.get('algorithm', None))
-
-                if schema_type in JSON_SCHEMA_TYPES:
-                    object_type_name = get_native_type_name(python_type_name=object_type, format_type='json')
-                    if object_type_name == "integer" and schema_type == "number":
-                        object_type_matches = True
-                    else:
-                        object_type_matches = object_type_name == schema_type
-
-                null_no_type = is_nullable & ((schema_type == 'any') | (object_type == 'NoneType'))
-                null_with_type = is_nullable & (schema_type != 'any') & object_type_matches
-                non_null = (is_nullable is False) & ((schema_type == 'any') | object_type_matches)
-
-                if not (null_no_type or null_with_type or non_null):
-                    if verbose_print:
-                        print(
-                            f"Type '{k}' == {cli_bcolors.FAIL}'{get_native_type_name(object_type, 'json')}'{cli_bcolors.ENDC},\n Required type {cli_bcolors.OKBLUE}'{schema_type}'{cli_bcolors.ENDC} (per schema {v}),\n In {_obj},\n Path {cli_bcolors.WARNING}{new_path}{cli_bcolors.ENDC}")
-                    return False
-
-                return True
+        return self._compiled_validator()(obj, verbose_print=verbose_print)
 
-            new_path = path
-            if schema['type'] == JSON_SCHEMA_OBJECT:
-                for k, v in schema['properties'].items():
-                    new_path = f"{new_path}{_path_sep}{k}"
-                    req = v.get('required', False)
-                    nullable = v.get('nullable', False)
-                    present = k in _obj.keys()
-                    if not present:
-                        if req:
-                            if verbose_print:
-                                print(
-                                    f"Required {cli_bcolors.FAIL}'{k}'{cli_bcolors.ENDC} (per schema {v}),\n In {_obj},\n Path {cli_bcolors.WARNING}{new_path}{cli_bcolors.ENDC}")
-                            return False
-                        else:
-                            new_path = path
-                            continue
-
-                    type_passed = _check_type(object_value=_obj[k], schema_info=v, is_nullable=nullable)
-                    if not type_passed:
-                        return False
-
-                    if v['type'] in [JSON_SCHEMA_OBJECT, JSON_SCHEMA_ARRAY]:
-                        if not schema_validation(_obj[k], v, path=new_path):
-                            return False
-                    new_path = path
-                return True
-            if schema['type'] == JSON_SCHEMA_ARRAY:
+    def validate_many(self, objects, fail_fast: bool = False, jobs: int = None, chunk_size: int = 256):
+        """
+        Validate a stream of objects, collecting violations instead of printing them.
 
-                nullable = schema.get('nullable', False)
+        Args:
+            objects (iterable): Objects, strings or file paths to validate.
+            fail_fast (bool): Only report the first violation of each object (default = False).
+            jobs (int): Number of worker processes, validates in this process if None or 1 (default = None).
+            chunk_size (int): Number of objects sent to a worker process at a time (default = 256).
 
-                if nullable and _obj is None:
-                    return True
+        Returns:
+            generator: A list of ``SchemaViolation(path, expected, actual)`` per object, in input order. An empty list
+            means the object is valid.
 
-                length = schema.get('length', -1)
-                min_ = schema.get('min', -1)
-                max_ = schema.get('max', -1)
-                obj_length = len(_obj)
+        Notes:
+            Each worker process compiles the schema once. Objects are read from ``objects`` as workers free up, so
+            long or unbounded iterables are not held in memory.
+        """
+        if jobs is None or jobs <= 1:
+            self._compiled_validator()
+            for obj in objects:
+                yield self._violations(_load_validation_input(obj), fail_fast=fail_fast)
+            return
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_validation_worker, initargs=(self.schema, )) as executor:
+            task = functools.partial(_validate_chunk, fail_fast=fail_fast)
+            for results in bounded_map(executor, task, iter_chunks(objects, chunk_size)):
+                yield from results
+
+    def _compiled_validator(self):
+        if getattr(self, '_compiled', None) is None or self._compiled_schema is not self.schema:
+            self.compile()
+        return self._compiled
+
+    def _violations(self, obj, fail_fast: bool = False) -> list:
+        violations = list()
+        self._check(obj, '', lambda violation, message: violations.append(violation), not fail_fast)
+        return violations
+
+    def compile(self):
+        """
+        Compile the schema into a tree of checker functions. Type names, patterns, options and validator functions
+        are resolved once here, so validating many objects does not re-interpret the schema for every value.
 
-                if length > -1 and obj_length != length:
-                    if verbose_print:
-                        print(
-                            f"Length '{_obj}' == {cli_bcolors.FAIL}{obj_length}{cli_bcolors.ENDC},\n Required length {cli_bcolors.OKBLUE}{length}{cli_bcolors.ENDC} (per schema {schema['items']}),\n In {_obj},\n Path {cli_bcolors.WARNING}{new_path}{cli_bcolors.ENDC}")
-                    return False
+        Returns:
+            function: ``validate(obj, verbose_print=False) -> bool``.
 
-                if min_ > -1 and obj_length < min_:
-                    if verbose_print:
-                        print(
-                            f"Length '{_obj}' == {cli_bcolors.FAIL}{obj_length}{cli_bcolors.ENDC},\n Required minimum length {cli_bcolors.OKBLUE}{min_}{cli_bcolors.ENDC} (per schema {schema['items']}),\n In {_obj},\n Path {cli_bcolors.WARNING}{new_path}{cli_bcolors.ENDC}")
-                    return False
+        Notes:
+            ``validate`` compiles on first use and whenever ``schema`` is replaced. Call ``compile`` again after
+            changing the schema in place. ``RICKLE_PATH_SEP`` is read when compiling.
+        """
+        if not 'type' in self.schema.keys():
+            raise ValueError(f'No type defined in {str(self.schema)}!')
 
-                if max_ > -1 and obj_length > max_:
-                    if verbose_print:
-                        print(
-                            f"Length '{_obj}' == {cli_bcolors.FAIL}{obj_length}{cli_bcolors.ENDC},\n Required maximum length {cli_bcolors.OKBLUE}{max_}{cli_bcolors.ENDC} (per schema {schema['items']}),\n In {_obj},\n Path {cli_bcolors.WARNING}{new_path}{cli_bcolors.ENDC}")
-                    return False
+        check = _compile_node(self.schema, optional_import('pyvalidator'), os.getenv("RICKLE_PATH_SEP", "/"))
 
-                if 'items' in schema.keys():
-                    schema_len = len(schema['items'])
-
-                    if schema_len > 0:
-                        single_type = schema['items'][0]
-
-                        for i in range(obj_length):
-                            new_path = f"{new_path}{_path_sep}[{i}]"
-                            o = _obj[i]
-                            elem_type = get_native_type_name(type(o).__name__, 'json')
-                            if (single_type['type'] != 'any' and elem_type != single_type['type']) or (
-                                    elem_type == 'integer' and single_type['type'] == 'number'):
-                                if verbose_print:
-                                    print(
-                                        f"Type '{o}' == {cli_bcolors.FAIL}'{elem_type}'{cli_bcolors.ENDC},\n Required type {cli_bcolors.OKBLUE}'{single_type['type']}'{cli_bcolors.ENDC} (per schema {single_type}),\n In {o},\n Path {cli_bcolors.WARNING}{new_path}{cli_bcolors.ENDC}")
-                                return False
-                            if single_type['type'] in [JSON_SCHEMA_OBJECT, JSON_SCHEMA_ARRAY]:
-                                if not schema_validation(o, single_type, path=new_path):
-                                    return False
-                            new_path = path
-                return True
+        def validate(obj, verbose_print: bool = False):
+            return check(obj, '', _print_violation if verbose_print else None, False)
 
-        return schema_validation(_obj=obj, schema=self.schema, path='')
+        self._compiled_schema = self.schema
+        self._compiled = validate
+        self._check = check
+        return validate
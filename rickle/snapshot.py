@@ -0,0 +1,801 @@
+import datetime
+import io
+import json
+import os
+import pickle
+import re
+import struct
+from pathlib import Path
+from typing import Union
+
+from rickle.__version__ import __version__
+
+SNAPSHOT_MAGIC = b'RICKLSNP'
+SNAPSHOT_FORMAT = 1
+
+# Magic, format version, header length
+_PREAMBLE = struct.Struct('<8sHI')
+
+# Globals an untrusted snapshot may refer to: the classes of a loaded (safe) Rickle, and plain data types
+_SAFE_GLOBALS = frozenset([
+    ('rickle', 'BaseRickle'),
+    ('rickle', 'Rickle'),
+    ('rickle', 'HotFile'),
+    ('rickle', 'HotAPI'),
+    ('rickle', 'HotSecret'),
+    ('rickle', 'HotRandomValue'),
+    ('rickle.tools', 'ColumnarTable'),
+    ('rickle.tools', 'CSVRowStream'),
+    ('builtins', 'object'),
+    ('builtins', 'set'),
+    ('builtins', 'frozenset'),
+    ('builtins', 'complex'),
+    ('builtins', 'bytearray'),
+    ('copyreg', '_reconstructor'),
+    ('collections', 'OrderedDict'),
+    ('datetime', 'date'),
+    ('datetime', 'time'),
+    ('datetime', 'datetime'),
+    ('datetime', 'timedelta'),
+    ('datetime', 'timezone'),
+    ('decimal', 'Decimal'),
+    ('re', '_compile'),
+    ('array', 'array'),
+    ('array', '_array_reconstructor'),
+    ('numpy', 'dtype'),
+    ('numpy', 'ndarray'),
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy.core.multiarray', 'scalar'),
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', 'scalar'),
+])
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """
+    Only finds the globals in ``_SAFE_GLOBALS``, or the given classes. Anything else, for example the functions of an
+    ``UnsafeRickle`` or arbitrary callables, raises ``pickle.UnpicklingError``.
+    """
+
+    def __init__(self, file, classes: tuple = ()):
+        super().__init__(file)
+        self.classes = {(c.__module__, c.__qualname__): c for c in classes}
+
+    def find_class(self, module, name):
+        if (module, name) in self.classes:
+            return self.classes[(module, name)]
+        if (module, name) in _SAFE_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Snapshot refers to '{module}.{name}', which is only loaded from trusted snapshots")
+
+
+def _source_stat(source: Union[str, Path, None]) -> dict:
+    if source is None:
+        return {'source': None, 'mtime_ns': None, 'size': None}
+    source = Path(source).resolve()
+    stat = source.stat()
+    return {'source': str(source), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+def _write_file(path: Union[str, Path], *chunks: bytes):
+    path = Path(path)
+    temp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temp_path, 'wb') as fs:
+            for chunk in chunks:
+                fs.write(chunk)
+        # Readers never see a partially written snapshot
+        os.replace(temp_path, path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+def write_snapshot(obj, path: Union[str, Path], source: Union[str, Path] = None):
+    """
+    Write a loaded object to a binary snapshot file.
+
+    Notes:
+        The file starts with a small header (format version, ``rickle`` version, and the modification time and size
+        of the source file), followed by the pickled object tree, including the meta info and keys map.
+
+    Args:
+        obj: The object (``BaseRickle`` or subclass).
+        path (str, Path): Snapshot file path.
+        source (str, Path): The file the object was loaded from, used to invalidate the snapshot (default = None).
+    """
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _source_stat(source)
+    header.update({'rickle_version': __version__, 'class': type(obj).__name__, 'payload_size': len(payload)})
+    header = json.dumps(header).encode('utf-8')
+    _write_file(path, _PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(header)), header, payload)
+
+def read_snapshot_header(path: Union[str, Path]) -> dict:
+    """
+    Read the header of a snapshot file.
+
+    Args:
+        path (str, Path): Snapshot file path.
+
+    Returns:
+        dict: Header, or None if the file is not a snapshot of this format.
+    """
+    with open(path, 'rb') as fs:
+        return _read_header(fs)
+
+def _read_header(fs) -> dict:
+    preamble = fs.read(_PREAMBLE.size)
+    if len(preamble) < _PREAMBLE.size:
+        return None
+    magic, snapshot_format, header_size = _PREAMBLE.unpack(preamble)
+    if magic != SNAPSHOT_MAGIC or snapshot_format != SNAPSHOT_FORMAT:
+        return None
+    try:
+        header = json.loads(fs.read(header_size).decode('utf-8'))
+    except ValueError:
+        # Also covers UnicodeDecodeError
+        return None
+    return header if isinstance(header, dict) else None
+
+def is_snapshot_current(header: dict, source: Union[str, Path] = None) -> bool:
+    """
+    Check if a snapshot is still valid: written by the same ``rickle`` version, and the source file is unchanged.
+
+    Args:
+        header (dict): Snapshot header.
+        source (str, Path): Source file, if None the source recorded in the header is checked (default = None).
+
+    Returns:
+        bool: True if current.
+    """
+    if header is None or header.get('rickle_version') != __version__:
+        return False
+    if source is None:
+        source = header.get('source')
+    if source is None:
+        return True
+    try:
+        stat = _source_stat(source)
+    except FileNotFoundError:
+        return False
+    return (stat['source'] == header.get('source') and stat['mtime_ns'] == header.get('mtime_ns')
+            and stat['size'] == header.get('size'))
+
+def read_snapshot(path: Union[str, Path], source: Union[str, Path] = None, trusted: bool = False,
+                  classes: tuple = ()):
+    """
+    Load an object from a snapshot file.
+
+    Notes:
+        Snapshots are pickles. Unless ``trusted``, only the classes of ``Rickle`` objects and plain data are
+        unpickled, anything else raises ``pickle.UnpicklingError``. Only pass ``trusted`` for snapshots written by
+        yourself, unpickling a trusted snapshot can run any code.
+
+    Args:
+        path (str, Path): Snapshot file path.
+        source (str, Path): Source file to check the snapshot against, if None the recorded source is used (default = None).
+        trusted (bool): Unpickle any object (default = False).
+        classes (tuple): Additional classes that may be unpickled, for example a subclass of ``Rickle`` (default = ()).
+
+    Returns:
+        object: The object, or None if the snapshot is missing, invalid, or out of date.
+    """
+    try:
+        with open(path, 'rb') as fs:
+            header = _read_header(fs)
+            if not is_snapshot_current(header, source=source):
+                return None
+            payload = fs.read()
+    except FileNotFoundError:
+        return None
+
+    if len(payload) != header.get('payload_size'):
+        return None
+    if trusted:
+        return pickle.loads(payload)
+    return _SnapshotUnpickler(io.BytesIO(payload), classes=classes).load()
+
+MAPPED_MAGIC = b'RICKLMAP'
+MAPPED_FORMAT = 1
+
+# Magic, format version, root offset, key index offset, header length
+_MAPPED_PREAMBLE = struct.Struct('<8sHQQI')
+# Key offset, key length, value offset
+_MAP_ENTRY = struct.Struct('<QIQ')
+# Key offset, key length, path offset, path length
+_INDEX_ENTRY = struct.Struct('<QIQI')
+_COUNT = struct.Struct('<I')
+_OFFSET = struct.Struct('<Q')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+
+class _MappedWriter:
+    """
+    Encodes a tree of dicts, lists, and scalars. Children are written before their parents, so that every container can
+    hold the offsets of its values: maps hold a table of (key, value offset) sorted by key, lists a table of offsets.
+    Other values are only pickled when allowed.
+    """
+
+    def __init__(self, path_sep: str, allow_pickle: bool = False):
+        self.path_sep = path_sep
+        self.allow_pickle = allow_pickle
+        self.data = bytearray()
+        self.index = list()
+
+    def _append(self, chunk: bytes) -> int:
+        offset = len(self.data)
+        self.data += chunk
+        return offset
+
+    def write(self, value, path: str = '', index_keys: bool = True) -> int:
+        if value is None:
+            return self._append(b'N')
+        if value is True:
+            return self._append(b'T')
+        if value is False:
+            return self._append(b'F')
+        if isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                return self._append(b'i' + _INT.pack(value))
+            encoded = str(value).encode('ascii')
+            return self._append(b'I' + _COUNT.pack(len(encoded)) + encoded)
+        if isinstance(value, float):
+            return self._append(b'd' + _FLOAT.pack(value))
+        if isinstance(value, str):
+            encoded = value.encode('utf-8')
+            return self._append(b's' + _COUNT.pack(len(encoded)) + encoded)
+        if isinstance(value, (bytes, bytearray)):
+            return self._append(b'b' + _COUNT.pack(len(value)) + bytes(value))
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            # Dates as loaded from YAML, datetime is a subclass of date
+            encoded = value.isoformat().encode('ascii')
+            tag = b'W' if isinstance(value, datetime.datetime) else b'D'
+            return self._append(tag + _COUNT.pack(len(encoded)) + encoded)
+        if isinstance(value, dict):
+            # Same search order as Rickle.search_path: keys of a node before the keys of its children
+            if index_keys:
+                for key in value.keys():
+                    self.index.append((str(key), f'{path}{self.path_sep}{key}'))
+            entries = list()
+            for key, v in value.items():
+                key = str(key)
+                entries.append((key.encode('utf-8'), self.write(v, f'{path}{self.path_sep}{key}')))
+            entries.sort(key=lambda entry: entry[0])
+            key_offsets = [self._append(key) for key, _ in entries]
+            offset = self._append(b'm' + _COUNT.pack(len(entries)))
+            for (key, value_offset), key_offset in zip(entries, key_offsets):
+                self.data += _MAP_ENTRY.pack(key_offset, len(key), value_offset)
+            return offset
+        if isinstance(value, (list, tuple)):
+            offsets = list()
+            for ix, v in enumerate(value):
+                offsets.append(self.write(v, f'{path}{self.path_sep}[{ix}]', index_keys=isinstance(v, dict)))
+            offset = self._append(b'l' + _COUNT.pack(len(offsets)))
+            for value_offset in offsets:
+                self.data += _OFFSET.pack(value_offset)
+            return offset
+
+        if not self.allow_pickle:
+            raise TypeError(f"Value of type {type(value).__name__} at '{path}' can only be stored pickled, "
+                            f"use allow_pickle=True")
+        encoded = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return self._append(b'p' + _COUNT.pack(len(encoded)) + encoded)
+
+    def write_index(self) -> int:
+        # Stable sort, paths of the same key stay in search order
+        self.index.sort(key=lambda entry: entry[0].encode('utf-8'))
+        entries = list()
+        for key, path in self.index:
+            key, path = key.encode('utf-8'), path.encode('utf-8')
+            entries.append((self._append(key), len(key), self._append(path), len(path)))
+        offset = self._append(_COUNT.pack(len(entries)))
+        for entry in entries:
+            self.data += _INDEX_ENTRY.pack(*entry)
+        return offset
+
+def encode_mapped(obj, source: Union[str, Path] = None, path_sep: str = None, allow_pickle: bool = False) -> bytes:
+    """
+    Encode an object into the indexed format read by ``MappedRickle``.
+
+    Notes:
+        Values other than None, booleans, numbers, strings, bytes, dates, dicts and lists can only be stored pickled,
+        and a pickled value can only be read back with ``allow_pickle`` by anyone trusting the writer.
+
+    Args:
+        obj (BaseRickle, dict, list): The object.
+        source (str, Path): The file the object was loaded from, used to invalidate the snapshot (default = None).
+        path_sep (str): Path separator used in the key index, defaults to that of the object, else '/' (default = None).
+        allow_pickle (bool): Pickle values that can not be stored otherwise, instead of raising TypeError (default = False).
+
+    Returns:
+        bytes: Encoded object.
+    """
+    if path_sep is None:
+        path_sep = getattr(obj, '_path_sep', os.getenv("RICKLE_PATH_SEP", "/"))
+    if hasattr(obj, '_input_type') and obj._input_type == 'array':
+        tree = obj.list()
+    elif hasattr(obj, 'dict'):
+        tree = obj.dict()
+    else:
+        tree = obj
+
+    writer = _MappedWriter(path_sep=path_sep, allow_pickle=allow_pickle)
+    root = writer.write(tree, index_keys=isinstance(tree, dict))
+    index = writer.write_index()
+
+    header = _source_stat(source)
+    header.update({'rickle_version': __version__, 'path_sep': path_sep})
+    header = json.dumps(header).encode('utf-8')
+
+    return _MAPPED_PREAMBLE.pack(MAPPED_MAGIC, MAPPED_FORMAT, root, index, len(header)) + header + writer.data
+
+def write_mapped_snapshot(obj, path: Union[str, Path], source: Union[str, Path] = None, allow_pickle: bool = False):
+    """
+    Write an object to an indexed snapshot file that can be opened with ``MappedRickle``.
+
+    Args:
+        obj (BaseRickle, dict, list): The object.
+        path (str, Path): Snapshot file path.
+        source (str, Path): The file the object was loaded from, used to invalidate the snapshot (default = None).
+        allow_pickle (bool): See ``encode_mapped`` (default = False).
+    """
+    _write_file(path, encode_mapped(obj, source=source, allow_pickle=allow_pickle))
+
+
+class _MappedSource:
+    __slots__ = ('buffer', 'mmap', 'file', 'shared_memory', 'allow_pickle', 'header', 'path_sep', 'root', 'index',
+                 'start')
+
+    def __init__(self, path_or_buffer, allow_pickle: bool = False, shared_memory=None):
+        self.mmap = None
+        self.file = None
+        self.shared_memory = shared_memory
+        self.allow_pickle = allow_pickle
+        if isinstance(path_or_buffer, (str, Path)):
+            import mmap
+
+            self.file = open(path_or_buffer, 'rb')
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = memoryview(self.mmap)
+        else:
+            self.buffer = memoryview(path_or_buffer)
+
+        if len(self.buffer) < _MAPPED_PREAMBLE.size:
+            self.close()
+            raise ValueError('Not a mapped rickle snapshot')
+        magic, mapped_format, root, index, header_size = _MAPPED_PREAMBLE.unpack_from(self.buffer, 0)
+        if magic != MAPPED_MAGIC or mapped_format != MAPPED_FORMAT:
+            self.close()
+            raise ValueError('Not a mapped rickle snapshot, or written by an unsupported version')
+
+        self.start = _MAPPED_PREAMBLE.size + header_size
+        self.header = json.loads(bytes(self.buffer[_MAPPED_PREAMBLE.size:self.start]).decode('utf-8'))
+        self.path_sep = self.header['path_sep']
+        self.root = self.start + root
+        self.index = self.start + index
+
+    def bytes(self, offset: int, length: int) -> bytes:
+        offset += self.start
+        return bytes(self.buffer[offset:offset + length])
+
+    def close(self):
+        self.buffer.release()
+        if self.mmap is not None:
+            self.mmap.close()
+        if self.file is not None:
+            self.file.close()
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+
+
+class MappedRickle:
+    """
+    A read-only ``Rickle`` on top of a snapshot written with ``write_mapped_snapshot`` (or ``save_snapshot(mapped=True)``).
+    The file is memory mapped, and values are only decoded when they are accessed, untouched parts of the tree never
+    become Python objects. Processes mapping the same file share its pages.
+
+    Notes:
+        Maps and lists are returned as ``MappedRickle`` nodes. Use ``dict``, ``list``, or ``to_rickle`` to decode
+        (part of) the tree. ``search_path`` uses a key index stored in the snapshot.
+
+    Args:
+        path_or_buffer (str, Path, bytes, memoryview): Snapshot file path, or a buffer (for example shared memory) holding an encoded snapshot.
+        allow_pickle (bool): Decode pickled values, only for snapshots from a trusted writer (default = False).
+    """
+
+    def __init__(self, path_or_buffer, allow_pickle: bool = False):
+        source = _MappedSource(path_or_buffer, allow_pickle=allow_pickle)
+        self._init_node(source, source.root, '')
+
+    @classmethod
+    def from_shared_memory(cls, name: str):
+        """
+        Attach to an object exported with ``to_shared_memory``. The block is read in place, every process attached
+        to it shares the one copy. Closing the object detaches from the block, but does not unlink it.
+
+        Args:
+            name (str): Name of the shared memory block.
+
+        Returns:
+            MappedRickle: The object.
+        """
+        from multiprocessing import shared_memory
+
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            # Before Python 3.13 attaching registers the block with the resource tracker, which would unlink it when
+            # this process exits, while it is owned by the process that created it
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+
+        node = object.__new__(cls)
+        try:
+            source = _MappedSource(shm.buf, shared_memory=shm)
+        except ValueError:
+            shm.close()
+            raise
+        node._init_node(source, source.root, '')
+        return node
+
+    def _init_node(self, source: _MappedSource, offset: int, path: str):
+        object.__setattr__(self, '_source', source)
+        object.__setattr__(self, '_offset', offset)
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_tag', bytes(source.buffer[offset:offset + 1]))
+
+    @classmethod
+    def load(cls, path: Union[str, Path], source: Union[str, Path] = None, **init_args):
+        """
+        Open a mapped snapshot. If the snapshot is missing or out of date it is rebuilt from the source first.
+
+        Args:
+            path (str, Path): Snapshot file path.
+            source (str, Path): Source file, if None the source recorded in the snapshot is used (default = None).
+            **init_args (kw_args): Arguments used when the source has to be loaded.
+
+        Returns:
+            MappedRickle: The object.
+        """
+        header = None
+        if Path(path).is_file():
+            try:
+                with cls(path) as existing:
+                    header = existing._source.header
+            except ValueError:
+                header = None
+        if is_snapshot_current(header, source=source):
+            return cls(path)
+
+        if source is None and header:
+            source = header.get('source')
+        if source is None:
+            raise ValueError(f"Snapshot '{path}' is missing or out of date, and no source to rebuild it from")
+
+        from rickle import Rickle
+
+        write_mapped_snapshot(Rickle(str(source), **init_args), path, source=source)
+        return cls(path)
+
+    def _child(self, offset: int, path: str):
+        node = object.__new__(MappedRickle)
+        node._init_node(self._source, offset, path)
+        return node
+
+    def _count(self, offset: int) -> int:
+        return _COUNT.unpack_from(self._source.buffer, offset + 1)[0]
+
+    def _map_entry(self, offset: int, ix: int) -> tuple:
+        return _MAP_ENTRY.unpack_from(self._source.buffer, offset + 5 + ix * _MAP_ENTRY.size)
+
+    def _list_offset(self, offset: int, ix: int) -> int:
+        count = self._count(offset)
+        if ix < 0:
+            ix += count
+        if not 0 <= ix < count:
+            raise IndexError(f'Index {ix} out of range')
+        return self._source.start + _OFFSET.unpack_from(self._source.buffer, offset + 5 + ix * _OFFSET.size)[0]
+
+    def _lookup(self, offset: int, key: str):
+        """
+        Binary search in the key table of a map, returns the absolute offset of the value or None.
+        """
+        key = key.encode('utf-8')
+        low, high = 0, self._count(offset)
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, value_offset = self._map_entry(offset, middle)
+            found = self._source.bytes(key_offset, key_length)
+            if found == key:
+                return self._source.start + value_offset
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _decode(self, offset: int, path: str):
+        buffer = self._source.buffer
+        tag = bytes(buffer[offset:offset + 1])
+        if tag in (b'm', b'l'):
+            return self._child(offset, path)
+        if tag == b'N':
+            return None
+        if tag == b'T':
+            return True
+        if tag == b'F':
+            return False
+        if tag == b'i':
+            return _INT.unpack_from(buffer, offset + 1)[0]
+        if tag == b'd':
+            return _FLOAT.unpack_from(buffer, offset + 1)[0]
+
+        length = _COUNT.unpack_from(buffer, offset + 1)[0]
+        chunk = bytes(buffer[offset + 5:offset + 5 + length])
+        if tag == b's':
+            return chunk.decode('utf-8')
+        if tag == b'b':
+            return chunk
+        if tag == b'I':
+            return int(chunk.decode('ascii'))
+        if tag == b'D':
+            return datetime.date.fromisoformat(chunk.decode('ascii'))
+        if tag == b'W':
+            return datetime.datetime.fromisoformat(chunk.decode('ascii'))
+        if tag == b'p':
+            if not self._source.allow_pickle:
+                raise ValueError(f"Pickled value at '{path}', only decoded with allow_pickle=True")
+            return pickle.loads(chunk)
+        raise ValueError(f'Unknown value tag {tag} at offset {offset}')
+
+    def _materialise(self, value):
+        if isinstance(value, MappedRickle):
+            return value.dict() if value._tag == b'm' else value.list()
+        return value
+
+    def _traverse(self, path: str):
+        path_sep = self._source.path_sep
+        if not path.startswith(path_sep):
+            raise KeyError(f'Missing root path {path_sep}')
+        offset, node_path = self._offset, self._path
+        for node_name in path.split(path_sep)[1:]:
+            tag = bytes(self._source.buffer[offset:offset + 1])
+            list_index_match = re.match(r'\[(-?\d+)\]$', node_name)
+            if tag == b'l' and list_index_match:
+                offset = self._list_offset(offset, int(list_index_match.group(1)))
+            elif tag == b'm':
+                offset = self._lookup(offset, node_name)
+            else:
+                offset = None
+            if offset is None:
+                raise NameError(f'The path {path} could not be traversed. Alternatively use "get"')
+            node_path = f'{node_path}{path_sep}{node_name}'
+        return offset, node_path
+
+    def __call__(self, path: str):
+        """
+        Get a node via a path string, only the last node in the path is decoded.
+
+        Args:
+            path (str): The path as a string, for example '/root/to/[0]/path'.
+
+        Returns:
+            Any: Value of node.
+        """
+        if path == self._source.path_sep:
+            return self
+        return self._decode(*self._traverse(path))
+
+    def get(self, key: str, default=None):
+        """
+        Acts as a regular get from a dictionary. Paths like '/root/to/path' can also be used.
+
+        Args:
+            key (str): Key or path.
+            default (any): Return value if nothing is found (default = None).
+
+        Returns:
+            obj: Value found, or default.
+        """
+        if self._source.path_sep in key:
+            try:
+                return self(key)
+            except (KeyError, NameError, IndexError):
+                return default
+        if self._tag != b'm':
+            return default
+        offset = self._lookup(self._offset, key)
+        if offset is None:
+            return default
+        return self._decode(offset, f'{self._path}{self._source.path_sep}{key}')
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._tag == b'm':
+            offset = self._lookup(self._offset, name)
+            if offset is not None:
+                return self._decode(offset, f'{self._path}{self._source.path_sep}{name}')
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __getitem__(self, key):
+        if isinstance(key, int) and self._tag == b'l':
+            return self._decode(self._list_offset(self._offset, key), f'{self._path}{self._source.path_sep}[{key}]')
+        if isinstance(key, str) and self._tag == b'm':
+            offset = self._lookup(self._offset, key)
+            if offset is None:
+                raise KeyError(key)
+            return self._decode(offset, f'{self._path}{self._source.path_sep}{key}')
+        raise TypeError("Key can only be a string for objects, or an integer index for arrays")
+
+    def __setattr__(self, key, value):
+        raise TypeError('MappedRickle is read-only')
+
+    def __setitem__(self, key, value):
+        raise TypeError('MappedRickle is read-only')
+
+    def __delitem__(self, key):
+        raise TypeError('MappedRickle is read-only')
+
+    def __len__(self):
+        return self._count(self._offset)
+
+    def __contains__(self, key):
+        return self._tag == b'm' and self._lookup(self._offset, key) is not None
+
+    def __iter__(self):
+        if self._tag == b'm':
+            yield from self.keys()
+        else:
+            for ix in range(len(self)):
+                yield self[ix]
+
+    def __repr__(self):
+        kind = 'object' if self._tag == b'm' else 'array'
+        return f"MappedRickle({kind}, path='{self._path or self._source.path_sep}', size={len(self)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map or shared memory block. Nodes of this snapshot can not be used afterwards.
+        """
+        self._source.close()
+
+    def keys(self):
+        """
+        Keys of an object node, in sorted order.
+
+        Returns:
+            list: Keys.
+        """
+        if self._tag != b'm':
+            return list()
+        keys = list()
+        for ix in range(self._count(self._offset)):
+            key_offset, key_length, _ = self._map_entry(self._offset, ix)
+            keys.append(self._source.bytes(key_offset, key_length).decode('utf-8'))
+        return keys
+
+    def values(self):
+        """
+        Values of an object node.
+
+        Returns:
+            list: Values (nested objects and arrays as ``MappedRickle`` nodes).
+        """
+        return [value for _, value in self.items()]
+
+    def items(self):
+        """
+        Iterate through all key value pairs of an object node.
+
+        Yields:
+            tuple: str, object.
+        """
+        if self._tag != b'm':
+            return
+        for ix in range(self._count(self._offset)):
+            key_offset, key_length, value_offset = self._map_entry(self._offset, ix)
+            key = self._source.bytes(key_offset, key_length).decode('utf-8')
+            yield key, self._decode(self._source.start + value_offset, f'{self._path}{self._source.path_sep}{key}')
+
+    def has(self, key: str, deep: bool = False) -> bool:
+        """
+        Check if the key exists, with ``deep`` anywhere below this node.
+
+        Args:
+            key (str): Key.
+            deep (bool): Search the whole tree below this node (default = False).
+
+        Returns:
+            bool: True if found.
+        """
+        if deep:
+            return len(self.search_path(key)) > 0
+        return key in self
+
+    def dict(self) -> dict:
+        """
+        Decode the node (and everything below it) into a Python dictionary.
+
+        Returns:
+            dict: The node.
+        """
+        if self._tag != b'm':
+            raise TypeError('Node is an array, use list')
+        return {key: self._materialise(value) for key, value in self.items()}
+
+    def list(self) -> list:
+        """
+        Decode an array node (and everything below it) into a Python list.
+
+        Returns:
+            list: The node.
+        """
+        if self._tag != b'l':
+            raise TypeError('Node is an object, use dict')
+        return [self._materialise(value) for value in self]
+
+    def to_rickle(self, **init_args):
+        """
+        Decode the node into a regular (writable) ``Rickle``.
+
+        Args:
+            **init_args (kw_args): Arguments passed to ``Rickle``.
+
+        Returns:
+            Rickle: The node.
+        """
+        from rickle import Rickle
+
+        return Rickle(self.dict() if self._tag == b'm' else self.list(), **init_args)
+
+    def search_path(self, key: str, report_parent: bool = False) -> list:
+        """
+        Search for all paths (below this node) that end in the key, using the key index in the snapshot.
+
+        Args:
+            key (str): The key to search.
+            report_parent (bool): Give the path of the parent instead (default = False).
+
+        Returns:
+            list: all paths found.
+        """
+        source = self._source
+        buffer = source.buffer
+        encoded = key.encode('utf-8')
+        count = _COUNT.unpack_from(buffer, source.index)[0]
+
+        def entry(ix):
+            return _INDEX_ENTRY.unpack_from(buffer, source.index + _COUNT.size + ix * _INDEX_ENTRY.size)
+
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, _, _ = entry(middle)
+            if source.bytes(key_offset, key_length) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+
+        paths = list()
+        prefix = f'{self._path}{source.path_sep}'
+        for ix in range(low, count):
+            key_offset, key_length, path_offset, path_length = entry(ix)
+            if source.bytes(key_offset, key_length) != encoded:
+                break
+            path = source.bytes(path_offset, path_length).decode('utf-8')
+            if self._path:
+                if not path.startswith(prefix):
+                    continue
+                path = path[len(self._path):]
+            if report_parent:
+                path = path[:-(len(source.path_sep) + len(key))]
+            paths.append(path)
+        return paths
@@ -1,9 +1,14 @@
+import array
 import base64
 import configparser
+import copy
+import functools
+import hashlib
+import importlib
 import importlib.util
-import inspect
 import random
 import string
+import time
 import types
 from enum import Enum
 from typing import List, Union
@@ -13,18 +18,109 @@ import json
 import os
 import sys
 import re
-from collections import OrderedDict, namedtuple, defaultdict
+from collections import OrderedDict, namedtuple, defaultdict, deque
+from concurrent.futures import wait as futures_wait, as_completed, FIRST_COMPLETED
 from io import StringIO
 
 # Add ordered dictionary to dumper
 yaml.add_representer(OrderedDict, lambda dumper, data: dumper.represent_mapping('tag:yaml.org,2002:map', data.items()))
 
-import tomli_w as tomlw
 if sys.version_info < (3, 11):
     import tomli as toml
 else:
     import tomllib as toml
 
+@functools.lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """
+    Whether an optional dependency is installed. Resolved once per module name and cached, so checks in hot paths
+    (per value, per request) do not walk ``sys.meta_path`` every time.
+
+    Args:
+        name (str): Module name, for example 'xmltodict'.
+
+    Returns:
+        bool: True if the module can be imported.
+    """
+    return importlib.util.find_spec(name) is not None
+
+@functools.lru_cache(maxsize=None)
+def optional_import(name: str):
+    """
+    Import an optional dependency on first use and cache the module.
+
+    Args:
+        name (str): Module name, for example 'xmltodict'.
+
+    Returns:
+        module: The imported module, or None if it is not installed.
+    """
+    if not is_available(name):
+        return None
+    return importlib.import_module(name)
+
+def iter_chunks(iterable, size: int):
+    """
+    Split any iterable into lists of at most ``size`` items, reading it lazily.
+
+    Args:
+        iterable (iterable): Items.
+        size (int): Maximum chunk size.
+
+    Returns:
+        generator: Lists of items.
+    """
+    chunk = list()
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = list()
+    if chunk:
+        yield chunk
+
+def bounded_map(executor, fn, iterable, max_pending: int = None, ordered: bool = True):
+    """
+    Like ``executor.map``, but tasks are submitted as results are consumed, keeping at most ``max_pending`` in flight.
+    Long or unbounded iterables are therefore not read into memory up front.
+
+    Args:
+        executor (concurrent.futures.Executor): Thread or process pool.
+        fn (callable): Function applied to each item.
+        iterable (iterable): Items.
+        max_pending (int): Maximum number of submitted, unconsumed tasks (default = twice the number of workers).
+        ordered (bool): Yield results in input order, otherwise as they finish (default = True).
+
+    Returns:
+        generator: Results.
+    """
+    if max_pending is None:
+        max_pending = 2 * (getattr(executor, '_max_workers', None) or os.cpu_count() or 1)
+    pending = deque() if ordered else set()
+    try:
+        for item in iterable:
+            future = executor.submit(fn, item)
+            if ordered:
+                pending.append(future)
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= max_pending:
+                    done, pending = futures_wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+        if ordered:
+            while pending:
+                yield pending.popleft().result()
+        else:
+            for future in as_completed(pending):
+                pending.discard(future)
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
 class CLIError(Exception):
 
     class CLITool(Enum):
@@ -42,6 +138,8 @@ class CLIError(Exception):
         OBJ_FUNC = 12
         SCHEMA_CHECK = 13
         SCHEMA_GEN = 14
+        OBJ_BATCH = 15
+        DAEMON = 16
 
     def __init__(self, message, cli_tool: CLITool):
         self.message = message
@@ -65,6 +163,8 @@ def object_to_dict(obj, include_imports: bool = False, include_class_source: boo
         dict: Deconstructed object in typical Rickle dictionary format.
     """
 
+    import inspect
+
     def _destruct(value, name=None):
         pat = re.compile(r'^( )*')
         if type(value) in (int, float, bool, str):
@@ -234,6 +334,8 @@ def get_native_type_name(python_type_name: str, format_type: str, default: str =
         'float': 'float',
         'bool': 'boolean',
         'list': 'seq',
+        'ndarray': 'seq',
+        'array': 'seq',
         'dict': 'map',
         'Rickle': 'map',
         'UnsafeRickle': 'map',
@@ -248,6 +350,8 @@ def get_native_type_name(python_type_name: str, format_type: str, default: str =
         'float': 'number',
         'bool': 'boolean',
         'list': 'array',
+        'ndarray': 'array',
+        'array': 'array',
         'dict': 'object',
         'Rickle': 'object',
         'UnsafeRickle': 'object',
@@ -312,6 +416,174 @@ def supported_encodings() -> list:
             supported.append(name.replace("_", "-").strip().lower())
     return supported
 
+_TOML_VALUE = re.compile(r"""^("|'|[+-]?\d|[+-]?(inf|nan)\b|true\b|false\b|\[|\{)""")
+_TABLE_HEADER = re.compile(r"""^\[\[?\s*[\w\-."' ]+\s*\]\]?\s*([#;].*)?$""")
+_KEY_VALUE = re.compile(r"""^([\w\-."' ]+?)\s*([=:])\s*(.*)$""")
+_ENV_LINE = re.compile(r'^(export\s+)?[A-Za-z_][A-Za-z0-9_]*=')
+_YAML_LINE = re.compile(r'^(-(\s|$)|[^\s#:=\[\]{}][^=]*?:(\s|$))')
+
+def detect_format(data, prefix_size: int = 4096):
+    """
+    Detect the format of a document from (only) the first lines, without parsing it.
+
+    Args:
+        data (str, bytes): Document, or its first bytes.
+        prefix_size (int): Number of characters inspected (default = 4096).
+
+    Returns:
+        str: One of "json", "yaml", "toml", "xml", "ini", "env", or None if the format is not recognised.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data[:prefix_size]).decode('utf-8', errors='ignore')
+    prefix = data[:prefix_size].lstrip('\ufeff')
+    lines = prefix.splitlines()
+    if len(data) > prefix_size and len(lines) > 1:
+        # Last line may be incomplete
+        lines = lines[:-1]
+
+    lines = [line.strip() for line in lines]
+    lines = [line for line in lines if line and not line.startswith('#')]
+    if not lines:
+        return None
+
+    first = lines[0]
+    if first.startswith('<'):
+        return 'xml'
+    if first.startswith('{'):
+        return 'json'
+    if first.startswith('---') or first.startswith('%YAML'):
+        return 'yaml'
+    if first.startswith(';'):
+        return 'ini'
+    if first.startswith('['):
+        if not _TABLE_HEADER.match(first):
+            return 'json'
+        key_values = [_KEY_VALUE.match(line) for line in lines[1:] if not _TABLE_HEADER.match(line)]
+        key_values = [kv for kv in key_values if kv]
+        if not key_values:
+            # Arrays of one value, such as ["a"] or [1], look like table headers
+            try:
+                json.loads(first)
+                return 'json'
+            except ValueError:
+                pass
+        if not key_values and len(lines) == 1:
+            return None
+        if all(kv.group(2) == '=' and _TOML_VALUE.match(kv.group(3)) for kv in key_values):
+            return 'toml'
+        return 'ini'
+    if _ENV_LINE.match(first):
+        return 'env'
+    if _YAML_LINE.match(first):
+        return 'yaml'
+    key_value = _KEY_VALUE.match(first)
+    if key_value and key_value.group(2) == '=':
+        return 'toml' if _TOML_VALUE.match(key_value.group(3)) else 'env'
+
+    return None
+
+def _read_ini_string(string: str):
+    config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+    config.read_string(string)
+    path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
+    list_brackets = (os.getenv("RICKLE_INI_OPENING_BRACES", "("), os.getenv("RICKLE_INI_CLOSING_BRACES", ")"))
+
+    return parse_ini(config=config, path_sep=path_sep, list_brackets=list_brackets)
+
+def _read_xml_string(string: str):
+    import xmltodict
+
+    return xmltodict.parse(string, process_namespaces=True)
+
+def _read_env_string(string: str):
+    from dotenv import dotenv_values
+
+    return dotenv_values(stream=StringIO(string))
+
+# Type, reader, optional dependency
+_STRING_READERS = {
+    'json': (json.loads, None),
+    'yaml': (yaml.safe_load, None),
+    'toml': (lambda string: toml.loads(string), None),
+    'xml': (_read_xml_string, 'xmltodict'),
+    'ini': (_read_ini_string, None),
+    'env': (_read_env_string, 'dotenv'),
+}
+
+def read_string_type(string: str, input_type: str):
+    """
+    Load a string of a known type.
+
+    Args:
+        string (str): Input.
+        input_type (str): Either ['yaml', 'json', 'toml', 'xml', 'ini', 'env'].
+
+    Returns:
+        dict: Loaded.
+    """
+    input_type = input_type.strip().lower()
+    try:
+        reader, dependency = _STRING_READERS[input_type]
+    except KeyError:
+        raise ValueError("Input type must be string of value YAML, JSON, TOML, XML, INI, ENV")
+    if dependency is not None and not is_available(dependency):
+        raise ValueError(f"Cannot parse {input_type.upper()} without required package {dependency}")
+    return reader(string)
+
+def _read_json_file(input_file: Path):
+    with input_file.open("r") as fin:
+        return json.load(fin)
+
+def _read_yaml_file(input_file: Path):
+    with input_file.open("r") as fin:
+        return yaml.safe_load(fin)
+
+def _read_toml_file(input_file: Path):
+    with input_file.open("rb") as fin:
+        return toml.load(fin)
+
+def _read_ini_file(input_file: Path):
+    with input_file.open("r") as fin:
+        return _read_ini_string(fin.read())
+
+def _read_xml_file(input_file: Path):
+    import xmltodict
+
+    with input_file.open("rb") as fin:
+        return xmltodict.parse(fin, process_namespaces=True)
+
+def _read_env_file(input_file: Path):
+    from dotenv import dotenv_values
+
+    return dotenv_values(dotenv_path=str(input_file.absolute()))
+
+# Extension, reader, optional dependency
+_FILE_READERS = {
+    '.json': (_read_json_file, None),
+    '.yaml': (_read_yaml_file, None),
+    '.yml': (_read_yaml_file, None),
+    '.toml': (_read_toml_file, None),
+    '.ini': (_read_ini_file, None),
+    '.xml': (_read_xml_file, 'xmltodict'),
+    '.env': (_read_env_file, 'dotenv'),
+}
+
+@functools.lru_cache(maxsize=None)
+def file_type_reader(suffix: str):
+    """
+    Reader for files with the given extension, resolved once per extension.
+
+    Args:
+        suffix (str): File extension including the dot, for example '.yaml'.
+
+    Returns:
+        callable: Function loading a ``Path``, or None if the extension is unknown (or its dependency missing).
+    """
+    reader, dependency = _FILE_READERS.get(suffix.lower(), (None, None))
+    if reader is None or (dependency is not None and not is_available(dependency)):
+        return None
+    return reader
+
 def classify_string(input_string: str):
     """
     Try to classify the type from a string. This is done by attempting to load the string as each type.
@@ -322,7 +594,17 @@ def classify_string(input_string: str):
 
     Returns:
         str: The classified type ("json", "yaml", "toml", "xml", "ini", "env", "unknown")
+
+    Notes:
+        The type detected by ``detect_format`` is tried first, the others only if that fails.
     """
+    detected = detect_format(input_string)
+    if detected is not None:
+        try:
+            read_string_type(input_string, detected)
+            return detected
+        except Exception:
+            pass
 
     try:
         json.loads(input_string)
@@ -342,12 +624,12 @@ def classify_string(input_string: str):
     except toml.TOMLDecodeError:
         pass
 
-    if importlib.util.find_spec('xmltodict'):
+    if is_available('xmltodict'):
         import xmltodict
         try:
             xmltodict.parse(input_string, process_namespaces=True)
             return "xml"
-        except xmltodict.ParsingInterrupted:
+        except Exception:
             pass
     elif input_string.startswith("<") and input_string.endswith(">"):
         if re.match(r'<\?xml\s+version\s*=\s*["\']1\.\d["\']', input_string) or re.match(r'<[a-zA-Z]', input_string):
@@ -361,7 +643,7 @@ def classify_string(input_string: str):
         except configparser.Error:
             pass
 
-    if importlib.util.find_spec('dotenv'):
+    if is_available('dotenv'):
         try:
             from dotenv import dotenv_values
             dotenv_values(stream=StringIO(input_string))
@@ -413,8 +695,8 @@ def toml_null_stripper(input: Union[dict, list]):
 def infer_read_file_type(file_path: str):
     """
     Infer the file type and return loaded contents. By default, the type is inferred from the suffix of the
-    file path. Thus, `file.yaml` will be read as a YAML file. If the file extension is not known, the file will be
-    read and tried to be loaded as both types.
+    file path. Thus, `file.yaml` will be read as a YAML file. If the file extension is not known, the file is read once
+    and its type detected from the content (see ``infer_read_string_type``).
 
     Raises:
          ValueError: If the type could not be inferred.
@@ -428,95 +710,21 @@ def infer_read_file_type(file_path: str):
 
     input_file = Path(file_path)
 
-    suffix = input_file.suffix.lower() if input_file.suffix else None
-
-    if suffix == '.json':
-        with input_file.open("r") as fin:
-            return json.load(fin)
-
-    if suffix in ['.yaml', '.yml']:
-        with input_file.open("r") as fin:
-            return yaml.safe_load(fin)
-
-    if suffix == '.toml':
-        with input_file.open("rb") as fin:
-            return toml.load(fin)
-
-    if suffix == '.ini':
-        config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
-        with input_file.open("r") as fin:
-            config.read_file(fin)
-
-        path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
-        list_brackets = (os.getenv("RICKLE_INI_OPENING_BRACES", "("), os.getenv("RICKLE_INI_CLOSING_BRACES", ")"))
-
-        return parse_ini(config=config, path_sep=path_sep, list_brackets=list_brackets)
-
-
-    if suffix == '.xml':
-        if importlib.util.find_spec('xmltodict'):
-            import xmltodict
-
-            with input_file.open("rb") as fin:
-                return xmltodict.parse(fin, process_namespaces=True)
-
-    if input_file.stem.lower() == '.env' or suffix == '.env':
-        if importlib.util.find_spec('dotenv'):
-            from dotenv import dotenv_values
-
-            return dotenv_values(dotenv_path=str(input_file.absolute()))
+    suffix = '.env' if input_file.name.lower() == '.env' else input_file.suffix
+    reader = file_type_reader(suffix)
+    if reader is not None:
+        return reader(input_file)
 
     try:
         with input_file.open("r") as fin:
-            return json.load(fin)
-    except:
-        pass
-
-    try:
-        with input_file.open("r") as fin:
-            return yaml.safe_load(fin)
-    except:
-        pass
-
-    try:
-        with input_file.open("rb") as fin:
-            return toml.load(fin)
-    except:
-        pass
-
-    try:
-        if importlib.util.find_spec('xmltodict'):
-            import xmltodict
-
-            with input_file.open("rb") as fin:
-                return xmltodict.parse(fin, process_namespaces=True)
-    except:
-        pass
-
-    try:
-        config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
-        with input_file.open("r") as fin:
-            config.read_file(fin)
-        path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
-        list_brackets = (os.getenv("RICKLE_INI_OPENING_BRACES", "("), os.getenv("RICKLE_INI_CLOSING_BRACES", ")"))
-
-        return parse_ini(config=config, path_sep=path_sep, list_brackets=list_brackets)
-    except:
-        pass
-
-    try:
-        if importlib.util.find_spec('dotenv'):
-            from dotenv import dotenv_values
-
-            return dotenv_values(dotenv_path=str(input_file.absolute()))
-    except:
-        pass
-
-    raise ValueError(f"Input file {input_file.name} could not be inferred")
+            return infer_read_string_type(fin.read())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Input file {input_file.name} could not be inferred")
 
 def infer_read_string_type(string: str):
     """
-    Brute force try every possible loading.
+    Load a string of unknown type. The type detected by ``detect_format`` is tried first, if that fails (or the type
+    is not detected) every possible loading is tried.
 
     Args:
         string (str): Input.
@@ -524,6 +732,13 @@ def infer_read_string_type(string: str):
     Returns:
         dict: Loaded.
     """
+    detected = detect_format(string)
+    if detected is not None:
+        try:
+            return read_string_type(string, detected)
+        except Exception:
+            pass
+
     try:
         return json.loads(string)
     except:
@@ -540,7 +755,7 @@ def infer_read_string_type(string: str):
         pass
 
     try:
-        if importlib.util.find_spec('xmltodict'):
+        if is_available('xmltodict'):
             import xmltodict
 
             return xmltodict.parse(string, process_namespaces=True)
@@ -558,7 +773,7 @@ def infer_read_string_type(string: str):
         pass
 
     try:
-        if importlib.util.find_spec('dotenv'):
+        if is_available('dotenv'):
             from dotenv import dotenv_values
 
             return dotenv_values(stream=StringIO(string))
@@ -622,120 +837,178 @@ def unparse_ini(dictionary: dict, path_sep: str = None, list_brackets: tuple = N
 
     return output_ini
 
+def _flat_frame(node, prefix: str):
+    if isinstance(node, dict):
+        return iter(node.items()), prefix, False
+    return enumerate(node), prefix, True
+
+def iter_flatten(dictionary, path_sep: str = None, list_brackets: tuple = ('(', ')')):
+    """
+    Lazily yield the ``(path, value)`` leaves of a deep structure, in the order of ``flatten_dict``.
+
+    Args:
+        dictionary (dict, list): Input dictionary (or list).
+        path_sep (str): Path separator (default = RICKLE_INI_PATH_SEP or '.').
+        list_brackets (tuple): Tuple of strings for list index values (default = ('(', ')')).
+
+    Returns:
+        generator: Tuples of flat path and value.
+    """
+    if path_sep is None:
+        path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
+    if not isinstance(dictionary, (dict, list)):
+        return
+
+    opening, closing = list_brackets
+    stack = [_flat_frame(dictionary, '')]
+    while stack:
+        items, prefix, is_list = stack[-1]
+        for k, value in items:
+            path = f'{prefix}{opening}{k}{closing}' if is_list else f'{prefix}{k}'
+            if isinstance(value, (dict, list)):
+                stack.append(_flat_frame(value, f'{path}{path_sep}'))
+                break
+            yield path, value
+        else:
+            stack.pop()
+
 def flatten_dict(dictionary, path_sep: str = None, list_brackets: tuple = ('(', ')')):
     """
     Flattens a deepl structure python dictionary into a shallow (or 'thin') dictionary of depth 1.
 
     Notes:
         Dictionary can only contain types str, bool, int, float, dict, list. Any other types won't be expanded upon.
+        Empty dictionaries and lists have no leaves, and are left out.
 
     Args:
         dictionary (dict): Input dictionary.
-        path_sep (str): Path separator.
+        path_sep (str): Path separator (default = RICKLE_INI_PATH_SEP or '.').
         list_brackets (tuple): Tuple of strings for list index values (default = ('(', ')')).
 
     Returns:
         dict: Flattened to depth 1.
     """
-    def __flatten_dict(d, parent_path: str = None, sep: str = None):
-
-        values = list()
-        if isinstance(d, dict):
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    value = __flatten_dict(d=v, parent_path=f'{parent_path}{sep}{k}', sep=sep)
-                    values.extend(value)
-                elif isinstance(v, list):
-                    value = __flatten_dict(d=v, parent_path=f'{parent_path}{sep}{k}', sep=sep)
-                    values.extend(value)
-                else:
-                    values.append({f'{parent_path}{sep}{k}': v})
-        if isinstance(d, list):
-            for i, val in enumerate(d):
-                if isinstance(val, dict):
-                    value = __flatten_dict(d=val, parent_path=f'{parent_path}{sep}{list_brackets[0]}{i}{list_brackets[1]}', sep=sep)
-                    values.extend(value)
-                elif isinstance(val, list):
-                    value = __flatten_dict(d=val, parent_path=f'{parent_path}{sep}{list_brackets[0]}{i}{list_brackets[1]}', sep=sep)
-                    values.extend(value)
-                else:
-                    values.append({f'{parent_path}{sep}{list_brackets[0]}{i}{list_brackets[1]}': val})
-        return values
-
-    list_dicts = __flatten_dict(d=dictionary, parent_path='', sep=path_sep)
+    if path_sep is None:
+        path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
     flattened_dict = dict()
-    for d in list_dicts:
-        for k, v in d.items():
-            flattened_dict[k.lstrip(path_sep)] = v
+    if not isinstance(dictionary, (dict, list)):
+        return flattened_dict
+
+    # Same walk as iter_flatten, writing leaves straight into the result
+    opening, closing = list_brackets
+    stack = [_flat_frame(dictionary, '')]
+    while stack:
+        items, prefix, is_list = stack[-1]
+        for k, value in items:
+            path = f'{prefix}{opening}{k}{closing}' if is_list else f'{prefix}{k}'
+            if isinstance(value, (dict, list)):
+                stack.append(_flat_frame(value, f'{path}{path_sep}'))
+                break
+            flattened_dict[path] = value
+        else:
+            stack.pop()
     return flattened_dict
 
 
+@functools.lru_cache(maxsize=None)
+def _index_pattern(opening: str, closing: str):
+    return re.compile(f'{re.escape(opening)}(\\d+){re.escape(closing)}')
+
+# Distinguishes missing children from None values while inflating
+_MISSING = object()
+
+class _IndexedItems(dict):
+    """
+    List being inflated, as a dictionary of index to value.
+    """
+    mixed = False
+
 def inflate_dict(flat_dict: dict, path_sep: str = None, list_brackets: tuple = ('(', ')')):
     """
     Does reverse operation of ``flatten_dict`` and inflates a shallow dictionary.
 
+    Notes:
+        Keys are split once and inserted into the result like a trie, lists are collected by index and created at
+        their final size. Indices therefore do not need to be in order; missing indices are filled with None.
+        Instead of a dictionary, any iterable of ``(key, value)`` pairs can be given, which is consumed lazily.
+
     Args:
-        flat_dict (dict): Input dictionary, can be any dict (won't have an effect).
-        path_sep (str): Path separator.
+        flat_dict (dict): Input dictionary (or iterable of pairs), can be any dict (won't have an effect).
+        path_sep (str): Path separator (default = RICKLE_INI_PATH_SEP or '.').
         list_brackets (tuple): Tuple of strings for list index values (default = ('(', ')')).
 
     Returns:
         dict: Inflated dictionary.
     """
-    Node = namedtuple('Node', ['key', 'struc_type'])
-
-    def unravel(key, path_sep: str = None, list_brackets: tuple = ('(', ')')):
-
-        if key.startswith(path_sep):
-            key = key[1:]
-        keys = key.split(path_sep)
+    if path_sep is None:
+        path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
+    opening, closing = list_brackets
+    index_pattern = _index_pattern(opening, closing)
 
-        _list = list()
-        for k in keys:
-            pat = f'\\{list_brackets[0]}(\\d+)\\{list_brackets[1]}'
+    # Segment to list index (int) or key, segments repeat a lot
+    tokens = dict()
 
-            m = re.match(pat, k)
-            if m:
-                _list.append(Node(key=int(m.group(1)), struc_type='list'))
-            else:
-                _list.append(Node(key=k, struc_type='dict'))
+    def tokenize(segment: str):
+        m = index_pattern.fullmatch(segment) if segment.startswith(opening) else None
+        token = tokens[segment] = int(m.group(1)) if m else segment
+        return token
 
-        return _list
+    def place(d, segment: str, token):
+        # Key of a segment in container d
+        if d.__class__ is _IndexedItems:
+            if token.__class__ is not int:
+                d.mixed = True
+            return token
+        return segment
 
     main_d = dict()
-    lists = dict()
-    dicts = dict()
-
-    for key, value in flat_dict.items():
-        d = main_d
+    pending_lists = list()
+    # Containers created while inflating, other values can not have keys below them (or be replaced by them)
+    branches = set()
 
-        keys = unravel(key, path_sep=path_sep, list_brackets=list_brackets)
-
-        for i, k in enumerate(keys[:-1]):
-            if k.struc_type == 'dict':
-                if k.key not in d:
-                    d[k.key] = list() if keys[i + 1].struc_type == 'list' else dict()
-                d = d[k.key]
-            if k.struc_type == 'list':
+    for key, value in (flat_dict.items() if isinstance(flat_dict, dict) else flat_dict):
+        if key.startswith(path_sep):
+            key = key[len(path_sep):]
+        segments = key.split(path_sep)
 
-                f = '/'.join([str(p.key) for p in keys[:i + 1]])
-                if f in lists:
-                    _ = lists[f]
-                elif f in dicts:
-                    _ = dicts[f]
+        d = main_d
+        token = tokens.get(segments[0])
+        if token is None:
+            token = tokenize(segments[0])
+        for i in range(1, len(segments)):
+            k = place(d, segments[i - 1], token)
+            next_token = tokens.get(segments[i])
+            if next_token is None:
+                next_token = tokenize(segments[i])
+            child = d.get(k, _MISSING)
+            if child is _MISSING:
+                if next_token.__class__ is int:
+                    child = _IndexedItems()
+                    pending_lists.append((d, k, child))
                 else:
-                    _ = list() if keys[i + 1].struc_type == 'list' else dict()
-                    if isinstance(_, list):
-                        lists[f] = _
-                    else:
-                        dicts[f] = _
-                    d.insert(k.key, _)
-                d = _
-
-        if isinstance(d, dict):
-            d[keys[-1].key] = value
-        if isinstance(d, list):
-            d.insert(keys[-1].key, value)
+                    child = dict()
+                branches.add(id(child))
+                d[k] = child
+            elif id(child) not in branches:
+                raise ValueError(f"Can not inflate '{key}', a value is already set at "
+                                 f"'{path_sep.join(segments[:i])}'")
+            d = child
+            token = next_token
+
+        k = place(d, segments[-1], token)
+        if k in d and id(d[k]) in branches:
+            raise ValueError(f"Can not inflate '{key}', keys below it are already set")
+        d[k] = value
+
+    # Children were created after their parents, convert in reverse so parents get the converted children
+    for parent, k, d in reversed(pending_lists):
+        if d.mixed:
+            parent[k] = {(f'{opening}{kk}{closing}' if kk.__class__ is int else kk): v for kk, v in d.items()}
+        else:
+            _list = [None] * (max(d) + 1)
+            for i, v in d.items():
+                _list[i] = v
+            parent[k] = _list
 
     return main_d
 
@@ -767,42 +1040,18 @@ def convert_string(input_string: str, output_type: str, input_type: str = None):
     if input_type is None:
         d = infer_read_string_type(input_string)
     else:
-        input_type = input_type.strip().lower()
-        if input_type == 'yaml':
-            d = yaml.safe_load(input_string)
-        elif input_type == 'json':
-            d = json.loads(input_string)
-        elif input_type == 'toml':
-            d = toml.loads(input_string)
-        elif input_type == 'xml':
-            if importlib.util.find_spec('xmltodict'):
-                import xmltodict
-                d = xmltodict.parse(input_string, process_namespaces=True)
-            else:
-                raise ValueError('Cannot parse XML without required package xmltodict')
-        elif input_type == 'ini':
-            config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
-            config.read_string(input_string)
-
-            d = parse_ini(config=config, path_sep=path_sep, list_brackets=list_brackets)
-        elif input_type == 'env':
-            if importlib.util.find_spec('dotenv'):
-                from dotenv import dotenv_values
-
-                d = dotenv_values(stream=StringIO(input_string))
-            else:
-                raise ValueError('Cannot parse .ENV without required package dotenv')
-        else:
-            raise ValueError(f"Input type must be string of value YAML, JSON, TOML, XML, INI, ENV")
+        d = read_string_type(input_string, input_type)
 
     if output_type == 'yaml':
         return yaml.safe_dump(d, sort_keys=False)
     elif output_type == 'json':
         return json.dumps(d)
     elif output_type == 'toml':
+        import tomli_w as tomlw
+
         return tomlw.dumps(toml_null_stripper(d))
     elif output_type == 'xml':
-        if importlib.util.find_spec('xmltodict'):
+        if is_available('xmltodict'):
             import xmltodict
             return xmltodict.unparse(d)
         else:
@@ -821,6 +1070,847 @@ def convert_string(input_string: str, output_type: str, input_type: str = None):
     else:
         raise ValueError(f"Output type must be string of value {','.join(Converter.supported_output)}")
 
+def iter_documents(stream, input_type: str = 'jsonl'):
+    """
+    Lazily read documents from a text stream, one at a time.
+
+    Args:
+        stream (io.TextIOBase): Input stream, for example ``sys.stdin``.
+        input_type (str): Either JSONL (one JSON value per line) or YAML (documents separated by ``---``)
+            (default = 'jsonl').
+
+    Returns:
+        generator: Loaded documents.
+    """
+    input_type = input_type.strip().lower()
+    if input_type in ['jsonl', 'ndjson']:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    elif input_type in ['yaml', 'yml']:
+        yield from yaml.safe_load_all(stream)
+    else:
+        raise ValueError("Streamed input type must be string of value JSONL, YAML")
+
+def write_documents(documents, stream, output_type: str = 'jsonl', buffer_size: int = 65536) -> int:
+    """
+    Write documents to a text stream as they are read, buffering output up to ``buffer_size`` characters.
+
+    Notes:
+        JSON output is a single array. CSV output has a column for each flattened path (for example ``a.b.(0)``) of
+        the first document. Fields of later documents that are not in the header are dropped, with a warning on
+        stderr naming the document.
+
+    Args:
+        documents (iterable): Documents to write.
+        stream (io.TextIOBase): Output stream, for example ``sys.stdout``.
+        output_type (str): Either JSONL, YAML, JSON or CSV (default = 'jsonl').
+        buffer_size (int): Characters written per batch, flushing the stream after each (default = 65536).
+
+    Returns:
+        int: Number of documents written.
+    """
+    output_type = output_type.strip().lower()
+    if output_type not in ['jsonl', 'ndjson', 'yaml', 'yml', 'json', 'csv']:
+        raise ValueError("Streamed output type must be string of value JSONL, YAML, JSON, CSV")
+
+    path_sep = os.getenv("RICKLE_INI_PATH_SEP", ".")
+    list_brackets = (os.getenv("RICKLE_INI_OPENING_BRACES", "("), os.getenv("RICKLE_INI_CLOSING_BRACES", ")"))
+
+    buffer = StringIO()
+
+    def flush():
+        stream.write(buffer.getvalue())
+        stream.flush()
+        buffer.seek(0)
+        buffer.truncate()
+
+    csv_writer = None
+    count = 0
+    if output_type == 'json':
+        buffer.write('[')
+    for document in documents:
+        if output_type in ['jsonl', 'ndjson']:
+            buffer.write(json.dumps(document))
+            buffer.write('\n')
+        elif output_type in ['yaml', 'yml']:
+            yaml.safe_dump(document, buffer, sort_keys=False, explicit_start=True)
+        elif output_type == 'json':
+            if count:
+                buffer.write(', ')
+            buffer.write(json.dumps(document))
+        else:
+            row = flatten_dict(document, path_sep=path_sep, list_brackets=list_brackets) \
+                if isinstance(document, (dict, list)) else {'value': document}
+            if csv_writer is None:
+                import csv
+                csv_writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), lineterminator='\n',
+                                            extrasaction='ignore')
+                csv_writer.writeheader()
+                csv_fields = set(csv_writer.fieldnames)
+            dropped = [field for field in row if field not in csv_fields]
+            if dropped:
+                sys.stderr.write(f"Document {count + 1}: fields not in the CSV header are dropped: {', '.join(dropped)}\n")
+            csv_writer.writerow(row)
+        count += 1
+
+        if buffer.tell() >= buffer_size:
+            flush()
+
+    if output_type == 'json':
+        buffer.write(']\n')
+    flush()
+    return count
+
+def convert_stream(input_stream, output_stream, output_type: str, input_type: str = 'jsonl', buffer_size: int = 65536) -> int:
+    """
+    Convert a stream of documents in constant memory, see ``iter_documents`` and ``write_documents``.
+
+    Args:
+        input_stream (io.TextIOBase): Input stream.
+        output_stream (io.TextIOBase): Output stream.
+        output_type (str): Either JSONL, YAML, JSON or CSV.
+        input_type (str): Either JSONL or YAML (default = 'jsonl').
+        buffer_size (int): Characters written per batch (default = 65536).
+
+    Returns:
+        int: Number of documents converted.
+    """
+    return write_documents(iter_documents(input_stream, input_type=input_type), output_stream,
+                           output_type=output_type, buffer_size=buffer_size)
+
+# Only strings that are given back unchanged by str(int(v)) are integers, so IDs like '00501' stay strings
+_INTEGER_STRING = re.compile(r'0|-?[1-9][0-9]*')
+_NUMBER_STRING = re.compile(r'-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+
+def _is_missing(value) -> bool:
+    return value is None or value == ''
+
+def _infer_dtype(values: list) -> str:
+    """
+    Infer 'integer', 'number' or 'string' for a column, ignoring missing (empty) cells.
+    """
+    dtype = None
+    for v in values:
+        if _is_missing(v):
+            continue
+        if isinstance(v, str):
+            if dtype != 'number' and _INTEGER_STRING.fullmatch(v):
+                dtype = 'integer'
+                continue
+            if _NUMBER_STRING.fullmatch(v):
+                dtype = 'number'
+                continue
+        elif isinstance(v, int) and not isinstance(v, bool):
+            dtype = dtype or 'integer'
+            continue
+        elif isinstance(v, float):
+            dtype = 'number'
+            continue
+        return 'string'
+    return dtype or 'string'
+
+def _infer_column(name: str, values: list, dtype: str = None, np=None) -> tuple:
+    """
+    Store a column as compactly as possible: integers in an int64 array, numbers in a float64 array, anything else as a
+    list. NumPy arrays are used when given. Missing cells of numeric columns are kept as positions.
+
+    Returns:
+        tuple: Type name, column, set of positions of missing values.
+    """
+    dtype = dtype or _infer_dtype(values)
+    if dtype == 'string':
+        return dtype, list(values), set()
+    if dtype not in ('integer', 'number'):
+        raise ValueError(f"Unknown type '{dtype}' for column '{name}', use 'integer', 'number' or 'string'")
+
+    cast, typecode, placeholder = (int, 'q', 0) if dtype == 'integer' else (float, 'd', float('nan'))
+    missing = set()
+    typed = list()
+    for i, v in enumerate(values):
+        if _is_missing(v):
+            missing.add(i)
+            typed.append(placeholder)
+        else:
+            try:
+                typed.append(cast(v))
+            except ValueError:
+                raise ValueError(f"Value {v!r} in row {i + 1} of column '{name}' is not of type '{dtype}'")
+    try:
+        if np is not None:
+            return dtype, np.array(typed, dtype=np.int64 if typecode == 'q' else np.float64), missing
+        return dtype, array.array(typecode, typed), missing
+    except OverflowError:
+        # Larger than int64
+        return dtype, typed, missing
+
+class ColumnarTable:
+    """
+    Read-only table stored per column. Numeric columns are kept as typed arrays, which is a fraction of the memory of
+    a list of rows (or list of Rickle nodes).
+
+    Notes:
+        Columns are integers when every value is written as Python writes an integer, so values with leading zeros
+        (IDs, zip codes) or underscores stay strings. Empty cells of numeric columns are missing values, given as None.
+
+    Args:
+        columns (dict): Column name to list of values (as read from CSV).
+        key_column (str): Build a hash index on this column for ``lookup`` (default = None).
+        dtypes (dict): Column name to 'integer', 'number' or 'string', instead of inferring the type (default = None).
+    """
+
+    def __init__(self, columns: dict, key_column: str = None, dtypes: dict = None):
+        np = optional_import('numpy')
+        dtypes = dtypes or dict()
+        self.fieldnames = list(columns.keys())
+        self.key_column = key_column
+        self._dtypes = dict()
+        self._columns = dict()
+        self._missing = dict()
+        for name, values in columns.items():
+            self._dtypes[name], self._columns[name], self._missing[name] = _infer_column(name, values,
+                                                                                        dtypes.get(name), np)
+        self._length = len(next(iter(columns.values()))) if len(columns) > 0 else 0
+        self._index = None
+
+        if key_column is not None:
+            if key_column not in self._columns:
+                raise KeyError(f"Key column '{key_column}' not in {self.fieldnames}")
+            self._index = dict()
+            for i, key in enumerate(self.column(key_column)):
+                self._index.setdefault(key, i)
+
+    @classmethod
+    def from_rows(cls, rows, fieldnames: list = None, key_column: str = None, dtypes: dict = None):
+        """
+        Create a table from an iterable of rows (lists). If no fieldnames are given the first row is the header.
+        Short rows are padded with missing values.
+
+        Args:
+            rows (iterable): Rows of values.
+            fieldnames (list): Column headers (default = None).
+            key_column (str): See ``ColumnarTable`` (default = None).
+            dtypes (dict): See ``ColumnarTable`` (default = None).
+
+        Raises:
+            ValueError: If a row has more values than there are columns.
+
+        Returns:
+            ColumnarTable: Table.
+        """
+        rows = iter(rows)
+        if fieldnames is None:
+            fieldnames = next(rows, list())
+        columns = [list() for _ in fieldnames]
+        for n, row in enumerate(rows, start=1):
+            if len(row) > len(columns):
+                raise ValueError(f"Row {n} has {len(row)} values, more than the {len(columns)} columns {fieldnames}")
+            for i, column in enumerate(columns):
+                column.append(row[i] if i < len(row) else '')
+        return cls(dict(zip(fieldnames, columns)), key_column=key_column, dtypes=dtypes)
+
+    def __len__(self):
+        return self._length
+
+    def column(self, name: str) -> list:
+        """
+        Get a column as a list of native Python values.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            list: Values.
+        """
+        column = self._columns[name]
+        values = list(column) if isinstance(column, list) else column.tolist()
+        for i in self._missing[name]:
+            values[i] = None
+        return values
+
+    def dtype(self, name: str) -> str:
+        """
+        Get the inferred type of a column.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            str: Either 'integer', 'number', or 'string'.
+        """
+        return self._dtypes[name]
+
+    def row(self, index: int) -> dict:
+        """
+        Get a row by position.
+
+        Args:
+            index (int): Row index.
+
+        Returns:
+            dict: Column name to value.
+        """
+        if index < 0:
+            index += self._length
+        return {name: None if index in self._missing[name] else _native_scalar(column[index])
+                for name, column in self._columns.items()}
+
+    def lookup(self, key, default=None):
+        """
+        Get a row by value of the key column.
+
+        Args:
+            key: Key value. Strings are cast to the type of a numeric key column.
+            default: Value to return if the key is not found (default = None).
+
+        Returns:
+            dict: Row.
+        """
+        if self._index is None:
+            raise ValueError('No key column was given for this table')
+        index = self._index.get(key)
+        if index is None and isinstance(key, str):
+            kind = self.dtype(self.key_column)
+            if kind == 'integer' and _INTEGER_STRING.fullmatch(key):
+                index = self._index.get(int(key))
+            elif kind == 'number' and _NUMBER_STRING.fullmatch(key):
+                index = self._index.get(float(key))
+        if index is None:
+            return default
+        return self.row(index)
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.column(item)
+        return self.row(item)
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self.row(i)
+
+    def __repr__(self):
+        return f"ColumnarTable(columns={self.fieldnames}, rows={self._length})"
+
+    def dict(self) -> dict:
+        """
+        Columns as lists.
+
+        Returns:
+            dict: Column name to values.
+        """
+        return {name: self.column(name) for name in self.fieldnames}
+
+def _native_scalar(value):
+    return value.item() if hasattr(value, 'item') else value
+
+class CSVRowStream:
+    """
+    Lazily read CSV rows. The source is only opened when iterated over, and can be iterated over any number of times.
+
+    Args:
+        file_path_or_str (str): File path to read from, or CSV string.
+        fieldnames (list): Column headers, if given rows are dicts (default = None).
+        as_dict (bool): Give rows as dicts, using the first row as header if no fieldnames are given (default = False).
+        encoding (str): File encoding (default = 'utf-8').
+        chunk_size (int): Number of bytes read from the file at a time, also used for sniffing the dialect (default = 65536).
+    """
+
+    def __init__(self, file_path_or_str: str, fieldnames: list = None, as_dict: bool = False,
+                 encoding: str = 'utf-8', chunk_size: int = 65536):
+        self.file_path_or_str = file_path_or_str
+        self.fieldnames = fieldnames
+        self.as_dict = as_dict or fieldnames is not None
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self._is_file = Path(file_path_or_str).exists()
+        self._dialect = None
+
+    def _open(self):
+        if self._is_file:
+            return Path(self.file_path_or_str).open(encoding=self.encoding, newline='', buffering=self.chunk_size)
+        return StringIO(self.file_path_or_str)
+
+    @property
+    def dialect(self):
+        """
+        The sniffed CSV dialect.
+        """
+        if self._dialect is None:
+            import csv
+            with self._open() as stream:
+                self._dialect = csv.Sniffer().sniff(stream.read(min(self.chunk_size, 1024)))
+        return self._dialect
+
+    def __iter__(self):
+        import csv
+        dialect = self.dialect
+        with self._open() as stream:
+            if self.as_dict:
+                for row in csv.DictReader(stream, fieldnames=self.fieldnames, dialect=dialect):
+                    yield dict(row)
+            else:
+                yield from csv.reader(stream, dialect=dialect)
+
+    def chunks(self, size: int = 1000):
+        """
+        Iterate over rows in lists of (at most) ``size`` rows.
+
+        Args:
+            size (int): Number of rows per chunk (default = 1000).
+
+        Returns:
+            generator: Lists of rows.
+        """
+        chunk = list()
+        for row in self:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = list()
+        if len(chunk) > 0:
+            yield chunk
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # Sniffed dialects are generated classes, sniff again after unpickling
+        state['_dialect'] = None
+        return state
+
+    def __repr__(self):
+        source = self.file_path_or_str if self._is_file else '<string>'
+        return f"CSVRowStream({source})"
+
+_http_sessions = dict()
+_http_conditional_cache = OrderedDict()
+
+def get_http_session(pool_size: int = None, max_retries: int = None, backoff_factor: float = None):
+    """
+    Get a shared ``requests.Session`` with connection pooling (keep-alive) and retries. One session is created per
+    process for every distinct configuration and reused for all subsequent calls.
+
+    Notes:
+        If not given, the values are read from the ENV variables ``RICKLE_HTTP_POOL_SIZE`` (default = 10),
+        ``RICKLE_HTTP_RETRIES`` (default = 0), and ``RICKLE_HTTP_BACKOFF`` (default = 0).
+
+    Args:
+        pool_size (int): Number of connections kept alive per host (default = None).
+        max_retries (int): Number of retries for failed connections and 429/5xx responses (default = None).
+        backoff_factor (float): Backoff factor between retries in seconds (default = None).
+
+    Returns:
+        Session: Shared session.
+    """
+    pool_size = int(pool_size if pool_size is not None else os.getenv("RICKLE_HTTP_POOL_SIZE", 10))
+    max_retries = int(max_retries if max_retries is not None else os.getenv("RICKLE_HTTP_RETRIES", 0))
+    backoff_factor = float(backoff_factor if backoff_factor is not None else os.getenv("RICKLE_HTTP_BACKOFF", 0))
+
+    key = (pool_size, max_retries, backoff_factor)
+    if key in _http_sessions:
+        return _http_sessions[key]
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    retries = Retry(total=max_retries,
+                    backoff_factor=backoff_factor,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    _http_sessions[key] = session
+    return session
+
+def http_fetch(url: str,
+               http_verb: str = 'GET',
+               headers: dict = None,
+               params: dict = None,
+               body: dict = None,
+               as_json: bool = None,
+               timeout: float = None,
+               conditional: bool = True,
+               pool_size: int = None,
+               max_retries: int = None,
+               backoff_factor: float = None):
+    """
+    Do an HTTP request through the shared session (see ``get_http_session``) and decode the response.
+
+    Notes:
+        For GET requests the ``ETag`` and ``Last-Modified`` of a previous response are sent back as ``If-None-Match``
+        and ``If-Modified-Since``. If the server answers with 304 (Not Modified), the previously decoded payload is
+        returned, i.e. the payload is neither downloaded nor parsed again. Only successful (2xx) responses are cached.
+        The number of cached responses is limited by ``RICKLE_HTTP_CACHE_SIZE`` (default = 128).
+        If no timeout is given, ``RICKLE_HTTP_TIMEOUT`` is used (default = None, no timeout).
+
+    Args:
+        url (str): URL.
+        http_verb (str): Either 'GET' or 'POST' (default = 'GET').
+        headers (dict): Key-value pair for headers (default = None).
+        params (dict): Key-value pair for parameters (default = None).
+        body (dict): Key-value pair for data, only for POST (default = None).
+        as_json (bool): Decode as JSON, as text, or if None infer from the content type (default = None).
+        timeout (float): Request timeout in seconds (default = None).
+        conditional (bool): Use conditional requests for GET (default = True).
+        pool_size (int): See ``get_http_session`` (default = None).
+        max_retries (int): See ``get_http_session`` (default = None).
+        backoff_factor (float): See ``get_http_session`` (default = None).
+
+    Returns:
+        tuple: HTTP status code and decoded payload.
+    """
+    session = get_http_session(pool_size=pool_size, max_retries=max_retries, backoff_factor=backoff_factor)
+
+    if timeout is None and os.getenv("RICKLE_HTTP_TIMEOUT"):
+        timeout = float(os.getenv("RICKLE_HTTP_TIMEOUT"))
+
+    if http_verb.strip().lower() == 'post':
+        r = session.post(url=url, data=body, headers=headers, timeout=timeout)
+        return r.status_code, _decode_response(r, as_json)
+
+    cache_key = None
+    request_headers = dict(headers) if headers else dict()
+    if conditional:
+        cache_key = json.dumps([url, params, headers, as_json], sort_keys=True, default=str)
+        cached = _http_conditional_cache.get(cache_key)
+        if cached:
+            if cached['etag']:
+                request_headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+    r = session.get(url=url, params=params, headers=request_headers, timeout=timeout)
+
+    if r.status_code == 304 and cache_key in _http_conditional_cache:
+        _http_conditional_cache.move_to_end(cache_key)
+        cached = _http_conditional_cache[cache_key]
+        return cached['status_code'], copy.deepcopy(cached['payload'])
+
+    payload = _decode_response(r, as_json)
+
+    etag = r.headers.get('ETag')
+    last_modified = r.headers.get('Last-Modified')
+    # Error responses are not replayed for a later 304
+    if cache_key and (etag or last_modified) and 200 <= r.status_code < 300:
+        _http_conditional_cache[cache_key] = {'status_code': r.status_code,
+                                              'etag': etag,
+                                              'last_modified': last_modified,
+                                              'payload': copy.deepcopy(payload)}
+        _http_conditional_cache.move_to_end(cache_key)
+        while len(_http_conditional_cache) > int(os.getenv("RICKLE_HTTP_CACHE_SIZE", 128)):
+            _http_conditional_cache.popitem(last=False)
+
+    return r.status_code, payload
+
+def _decode_response(response, as_json: bool = None):
+    if as_json is None:
+        as_json = response.headers.get('content-type', '').lower() == 'application/json'
+    if as_json:
+        return response.json()
+    return response.text
+
+SecretProvider = namedtuple('SecretProvider', ['create_client', 'get_secret', 'get_secrets'])
+
+_secret_providers = dict()
+_secret_clients = dict()
+
+def register_secret_provider(name: str, create_client, get_secret, get_secrets=None):
+    """
+    Register (or replace) a secret provider.
+
+    Notes:
+        - ``create_client(provider_access_key)`` returns a client, clients are cached and reused.
+        - ``get_secret(client, secret_id, secret_version, provider_access_key)`` returns the secret.
+        - ``get_secrets(client, secret_ids, provider_access_key)`` returns a dict of secret ID to secret,
+          for providers that support fetching many secrets in one call.
+
+    Args:
+        name (str): Provider name as used in ``provider``.
+        create_client (callable): Creates a client from the access key.
+        get_secret (callable): Fetches a single secret.
+        get_secrets (callable): Fetches many secrets at once (default = None).
+    """
+    _secret_providers[name.strip().lower()] = SecretProvider(create_client=create_client,
+                                                             get_secret=get_secret,
+                                                             get_secrets=get_secrets)
+
+def access_key_fingerprint(provider_access_key) -> str:
+    """
+    Stable fingerprint of an access key, used to key client caches without holding on to the key itself.
+
+    Args:
+        provider_access_key (dict, str): Access key.
+
+    Returns:
+        str: Hex digest.
+    """
+    dumped = json.dumps(provider_access_key, sort_keys=True, default=str)
+    return hashlib.sha256(dumped.encode('utf-8')).hexdigest()
+
+def get_secret_client(provider: str, provider_access_key: dict):
+    """
+    Get a client for the secret provider. Clients are created once per provider and access key, and reused.
+
+    Args:
+        provider (str): Provider name.
+        provider_access_key (dict): Access key.
+
+    Returns:
+        object: Provider client.
+    """
+    provider = provider.strip().lower()
+    if provider not in _secret_providers:
+        raise ValueError(f"Provider name '{provider}' not supported")
+
+    key = (provider, access_key_fingerprint(provider_access_key))
+    if key not in _secret_clients:
+        _secret_clients[key] = _secret_providers[provider].create_client(provider_access_key)
+    return _secret_clients[key]
+
+def fetch_secret(provider: str, provider_access_key: dict, secret_id: str, secret_version: str = None,
+                 ttl: float = 0):
+    """
+    Fetch a secret using a cached provider client.
+
+    Args:
+        provider (str): Provider name.
+        provider_access_key (dict): Access key.
+        secret_id (str): The ID or name of the secret.
+        secret_version (str): Version ID of the secret (default = None).
+        ttl (float): Keep the secret in the in-memory secret cache (``secret_cache``) for this many seconds (default = 0).
+
+    Returns:
+        object: The secret.
+    """
+    provider = provider.strip().lower()
+    cache_key = (provider, access_key_fingerprint(provider_access_key), secret_id, secret_version)
+
+    if ttl > 0:
+        found, secret = secret_cache.get(cache_key)
+        if found:
+            return secret
+
+    client = get_secret_client(provider, provider_access_key)
+    secret = _secret_providers[provider].get_secret(client, secret_id, secret_version, provider_access_key)
+
+    if ttl > 0:
+        secret_cache.put(cache_key, secret, ttl=ttl)
+    return secret
+
+def fetch_secrets(provider: str, provider_access_key: dict, secret_ids: list, ttl: float = 0) -> dict:
+    """
+    Fetch many (latest version) secrets of the same provider and access key. Where the provider supports it, all secrets
+    are retrieved in batches instead of one call per secret.
+
+    Args:
+        provider (str): Provider name.
+        provider_access_key (dict): Access key.
+        secret_ids (list): IDs or names of the secrets.
+        ttl (float): See ``fetch_secret`` (default = 0).
+
+    Returns:
+        dict: Secret ID to secret.
+    """
+    provider = provider.strip().lower()
+    fingerprint = access_key_fingerprint(provider_access_key)
+
+    secrets = dict()
+    missing = list()
+    for secret_id in dict.fromkeys(secret_ids):
+        if ttl > 0:
+            found, secret = secret_cache.get((provider, fingerprint, secret_id, None))
+            if found:
+                secrets[secret_id] = secret
+                continue
+        missing.append(secret_id)
+
+    if len(missing) == 0:
+        return secrets
+
+    client = get_secret_client(provider, provider_access_key)
+    get_secrets = _secret_providers[provider].get_secrets
+
+    if get_secrets and len(missing) > 1:
+        fetched = get_secrets(client, missing, provider_access_key)
+    else:
+        fetched = dict()
+
+    for secret_id in missing:
+        if secret_id in fetched:
+            secret = fetched[secret_id]
+        else:
+            secret = _secret_providers[provider].get_secret(client, secret_id, None, provider_access_key)
+        if ttl > 0:
+            secret_cache.put((provider, fingerprint, secret_id, None), secret, ttl=ttl)
+        secrets[secret_id] = secret
+
+    return secrets
+
+class SecretCache:
+    """
+    In-memory cache for secrets with a time to live, so that hot loaded secrets are not fetched from the provider on
+    every call. Entries are kept as they are, in the memory of the running process.
+
+    Args:
+        max_size (int): Maximum number of entries (default = 1024).
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def put(self, key, value, ttl: float):
+        """
+        Add a value.
+
+        Args:
+            key: Hashable cache key.
+            value: Any value.
+            ttl (float): Time to live in seconds.
+        """
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, key) -> tuple:
+        """
+        Get a value if present and not expired.
+
+        Args:
+            key: Hashable cache key.
+
+        Returns:
+            tuple: Whether the value was found and the value (or None).
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        self._entries.clear()
+
+secret_cache = SecretCache()
+
+def _aws_create_client(provider_access_key: dict):
+    import boto3
+
+    return boto3.session.Session(**provider_access_key).client('secretsmanager')
+
+def _aws_secret_value(secret: dict):
+    if 'SecretString' in secret:
+        return secret['SecretString']
+    return secret['SecretBinary']
+
+def _aws_get_secret(client, secret_id: str, secret_version: str, provider_access_key: dict):
+    from botocore.exceptions import ClientError
+
+    try:
+        args = {'SecretId': secret_id}
+        if secret_version:
+            args['VersionId'] = secret_version
+        secret = client.get_secret_value(**args)
+    except ClientError as e:
+        sys.stderr.write(f"Error while accessing secret {e.response['Error']['Code']}")
+        raise e
+    return _aws_secret_value(secret)
+
+def _aws_get_secrets(client, secret_ids: list, provider_access_key: dict):
+    secrets = dict()
+    # Secrets Manager allows at most 20 secret IDs per batch call
+    for i in range(0, len(secret_ids), 20):
+        batch = secret_ids[i:i + 20]
+        args = {'SecretIdList': batch}
+        while True:
+            response = client.batch_get_secret_value(**args)
+            for secret in response.get('SecretValues', list()):
+                for secret_id in batch:
+                    if secret_id in (secret.get('Name'), secret.get('ARN')):
+                        secrets[secret_id] = _aws_secret_value(secret)
+            if not response.get('NextToken'):
+                break
+            args['NextToken'] = response['NextToken']
+    # Secrets with errors are left out and fetched one by one, raising the error there
+    return secrets
+
+def _google_create_client(provider_access_key: dict):
+    from google.cloud import secretmanager
+    from google.oauth2 import service_account
+
+    credentials = service_account.Credentials.from_service_account_info(provider_access_key)
+    return secretmanager.SecretManagerServiceClient(credentials=credentials)
+
+def _google_get_secret(client, secret_id: str, secret_version: str, provider_access_key: dict):
+    _secret_version_id = secret_version if secret_version else 'latest'
+    name = f"projects/{provider_access_key['project_id']}/secrets/{secret_id}/versions/{_secret_version_id}"
+
+    response = client.access_secret_version(name=name)
+    return response.payload.data.decode('UTF-8')
+
+def _azure_create_client(provider_access_key: dict):
+    from azure.identity import ClientSecretCredential
+    from azure.keyvault.secrets import SecretClient
+
+    key_vault_uri = f"https://{provider_access_key['key_vault_name']}.vault.azure.net"
+
+    credential = ClientSecretCredential(
+        tenant_id=provider_access_key['tenant_id'],
+        client_id=provider_access_key['client_id'],
+        client_secret=provider_access_key['client_secret']
+    )
+    return SecretClient(vault_url=key_vault_uri, credential=credential)
+
+def _azure_get_secret(client, secret_id: str, secret_version: str, provider_access_key: dict):
+    return client.get_secret(name=secret_id, version=secret_version).value
+
+def _hashicorp_create_client(provider_access_key: dict):
+    import hvac
+
+    return hvac.Client(**provider_access_key)
+
+def _hashicorp_get_secret(client, secret_id: str, secret_version: str, provider_access_key: dict):
+    read_response = client.secrets.kv.read_secret_version(path=secret_id)
+    return read_response['data']['data']
+
+def _oracle_create_client(provider_access_key: dict):
+    import oci
+
+    return oci.vault.VaultsClient(provider_access_key)
+
+def _oracle_get_secret(client, secret_id: str, secret_version: str, provider_access_key: dict):
+    return client.get_secret(secret_id=secret_id).data
+
+def _ibm_create_client(provider_access_key: dict):
+    from ibm_cloud_sdk_core.authenticators.iam_authenticator import IAMAuthenticator
+    from ibm_secrets_manager_sdk.secrets_manager_v2 import SecretsManagerV2
+
+    secrets_manager = SecretsManagerV2(
+        authenticator=IAMAuthenticator(provider_access_key['apikey'])
+    )
+    secrets_manager.set_service_url(provider_access_key['service_url'])
+    return secrets_manager
+
+def _ibm_get_secret(client, secret_id: str, secret_version: str, provider_access_key: dict):
+    return client.get_secret(id=secret_id).result['payload']
+
+register_secret_provider('aws', _aws_create_client, _aws_get_secret, _aws_get_secrets)
+register_secret_provider('google', _google_create_client, _google_get_secret)
+register_secret_provider('azure', _azure_create_client, _azure_get_secret)
+register_secret_provider('hashicorp', _hashicorp_create_client, _hashicorp_get_secret)
+register_secret_provider('oracle', _oracle_create_client, _oracle_get_secret)
+register_secret_provider('ibm', _ibm_create_client, _ibm_get_secret)
+
 
 class cli_bcolors:
     HEADER = '\033[95m'
@@ -1,6 +1,8 @@
 import unittest
 import subprocess
 import sys
+import time
+import tempfile
 from rickle.tools import classify_string
 import os
 from pathlib import Path
@@ -93,6 +95,192 @@ class TestCLITool(unittest.TestCase):
         self.assertEqual(result.stdout, '\x1b[94mINPUT\x1b[0m -> \x1b[92mOK\x1b[0m\n', msg=f"Unexpected CLI output: {result.stdout}")
 
 
+    def test_cli_schema_check_jobs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_dir = Path(temp_dir, 'input')
+            fail_dir = Path(temp_dir, 'failed')
+            input_dir.mkdir()
+            for i in range(6):
+                data = self.sample_data if i % 2 == 0 else {'config': {'threshold': 'high'}}
+                with Path(input_dir, f'config_{i}.yaml').open('w') as yf:
+                    yaml.dump(data, yf)
+
+            command_rickle = f'{self.python_command} -m {self.rickled_command} schema check --schema "{str(self.json_schema_file)}" --input-directory "{input_dir}" --fail-directory "{fail_dir}" --jobs 2'
+
+            result = subprocess.run(command_rickle,
+                                    shell=True,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    text=True)
+
+            self.assertEqual(result.returncode, 0, msg=result.stderr)
+            self.assertEqual(result.stdout.count('OK'), 3)
+            self.assertEqual(result.stdout.count('FAIL'), 3)
+            self.assertListEqual(sorted(f.name for f in fail_dir.iterdir()), ['config_1.yaml', 'config_3.yaml', 'config_5.yaml'])
+            self.assertListEqual(sorted(f.name for f in input_dir.iterdir()), ['config_0.yaml', 'config_2.yaml', 'config_4.yaml'])
+
+    def test_cli_obj_batch(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            script_file = Path(temp_dir, 'changes.txt')
+            output_file = Path(temp_dir, 'output.yaml')
+            script_file.write_text('# Bump version\n'
+                                   'get /config/name\n'
+                                   'set /config/threshold 0.5\n'
+                                   'put /config/owner "team rickle"\n'
+                                   'put /config/build "123"  # Stays a string\n'
+                                   'rm /config/version\n')
+
+            command_rickle = f'{self.python_command} -m {self.rickled_command} obj --input "{str(self.yaml_file)}" --output "{str(output_file)}" batch "{str(script_file)}"'
+
+            result = subprocess.run(command_rickle,
+                                    shell=True,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    text=True)
+
+            self.assertEqual(result.returncode, 0, msg=result.stderr)
+            self.assertEqual(result.stdout, 'rickle_unittest\n')
+            with output_file.open() as yf:
+                self.assertDictEqual(yaml.safe_load(yf), {'config': {'name': 'rickle_unittest',
+                                                                     'threshold': 0.5,
+                                                                     'owner': 'team rickle',
+                                                                     'build': '123'}})
+
+    def test_cli_conv_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for sub_dir in ['', 'nested', 'drafts']:
+                Path(temp_dir, sub_dir).mkdir(exist_ok=True)
+                with Path(temp_dir, sub_dir, 'config.yaml').open('w') as yf:
+                    yaml.dump(self.sample_data, yf)
+
+            command_rickle = f'{self.python_command} -m {self.rickled_command} --output-type JSON conv --input-directory "{temp_dir}" --recursive --include "*.yaml" --exclude "drafts/*" --jobs 2 --skip-up-to-date'
+
+            for converted, skipped in [(2, 0), (0, 2)]:
+                result = subprocess.run(command_rickle,
+                                        shell=True,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE,
+                                        text=True)
+
+                self.assertEqual(result.returncode, 0, msg=result.stderr)
+                self.assertIn(f'{converted} converted', result.stdout)
+                self.assertIn(f'{skipped} skipped', result.stdout)
+
+            with Path(temp_dir, 'nested', 'config.json').open() as jf:
+                self.assertDictEqual(json.load(jf), self.sample_data)
+            self.assertFalse(Path(temp_dir, 'drafts', 'config.json').exists())
+
+    def test_cli_conv_directory_conflicts(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            Path(temp_dir, 'a.yaml').write_text('source: yaml\n')
+            Path(temp_dir, 'a.json').write_text('{"source": "json"}')
+            Path(temp_dir, 'b.json').write_text('{"source": "json"}')
+            Path(temp_dir, 'b.toml').write_text('source = "toml"\n')
+            Path(temp_dir, 'c.json').write_text('{"source": "json"}')
+
+            command_rickle = f'{self.python_command} -m {self.rickled_command} --output-type yaml conv --input-directory "{temp_dir}"'
+
+            result = subprocess.run(command_rickle,
+                                    shell=True,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    text=True)
+
+            self.assertEqual(result.returncode, 0, msg=result.stderr)
+            self.assertIn('1 converted', result.stdout)
+            self.assertEqual(result.stderr.count('not converted'), 3)
+            self.assertEqual(Path(temp_dir, 'a.yaml').read_text(), 'source: yaml\n')
+            self.assertFalse(Path(temp_dir, 'b.yaml').exists())
+            with Path(temp_dir, 'c.yaml').open() as yf:
+                self.assertDictEqual(yaml.safe_load(yf), {'source': 'json'})
+
+    def test_cli_conv_stream(self):
+        records = [{'id': i, 'config': {'name': f'n{i}', 'ports': [80, 443]}} for i in range(3)]
+        jsonl = ''.join(json.dumps(record) + '\n' for record in records)
+
+        command_rickle = f'{self.python_command} -m {self.rickled_command} --output-type YAML conv --stream --input-type JSONL'
+        result = subprocess.run(command_rickle, shell=True, input=jsonl, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertListEqual(list(yaml.safe_load_all(result.stdout)), records)
+
+        command_rickle = f'{self.python_command} -m {self.rickled_command} --output-type JSONL conv'
+        result = subprocess.run(command_rickle, shell=True, input=result.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertEqual(result.stdout, jsonl)
+
+        command_rickle = f'{self.python_command} -m {self.rickled_command} --output-type CSV conv --input-type JSONL'
+        result = subprocess.run(command_rickle, shell=True, input=jsonl, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertListEqual(result.stdout.splitlines(), ['id,config.name,config.ports.(0),config.ports.(1)',
+                                                          '0,n0,80,443', '1,n1,80,443', '2,n2,80,443'])
+
+        # Input type detected from the first characters
+        command_rickle = f'{self.python_command} -m {self.rickled_command} --output-type CSV conv'
+        result = subprocess.run(command_rickle, shell=True, input='name: Bob\nports: [80, 443]\n', stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertListEqual(result.stdout.splitlines(), ['name,ports.(0),ports.(1)', 'Bob,80,443'])
+        result = subprocess.run(command_rickle, shell=True, input=jsonl, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertEqual(len(result.stdout.splitlines()), 4)
+
+        # Fields not in the header of the first record are dropped with a warning
+        extra = jsonl + json.dumps({'id': 3, 'extra': True}) + '\n'
+        result = subprocess.run(command_rickle, shell=True, input=extra, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        self.assertEqual(result.stdout.splitlines()[-1], '3,,,')
+        self.assertIn('Document 4', result.stderr)
+        self.assertIn('extra', result.stderr)
+
+    @unittest.skipIf(sys.platform == 'win32', "Unix sockets")
+    def test_cli_daemon(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = Path(temp_dir, 'rickle.sock')
+            daemon = subprocess.Popen(f'{self.python_command} -m {self.rickled_command} daemon start --socket "{socket_path}"',
+                                      shell=True,
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE,
+                                      env=dict(os.environ, UNITTEST_RICKLE_VAR='daemon'))
+            try:
+                for _ in range(100):
+                    if socket_path.exists():
+                        break
+                    time.sleep(0.1)
+
+                command_rickle = f'{self.python_command} -m {self.rickled_command} obj --input "{str(self.yaml_file)}" get /config/name'
+                local = subprocess.run(command_rickle, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                env = dict(os.environ, RICKLE_DAEMON_SOCKET=str(socket_path))
+                for _ in range(2):
+                    forwarded = subprocess.run(command_rickle, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                               text=True, env=env)
+                    self.assertEqual(forwarded.returncode, 0, msg=forwarded.stderr)
+                    self.assertEqual(forwarded.stdout, local.stdout)
+
+                # Env members resolve against the client's environment, and are not cached
+                env_file = Path(temp_dir, 'env.yaml')
+                env_file.write_text('value:\n  type: env\n  load: UNITTEST_RICKLE_VAR\n')
+                command_rickle = f'{self.python_command} -m {self.rickled_command} obj --input "{str(env_file)}" get /value'
+                for value in ['client', 'changed']:
+                    local = subprocess.run(command_rickle, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                           text=True, env=dict(os.environ, UNITTEST_RICKLE_VAR=value))
+                    forwarded = subprocess.run(command_rickle, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                               text=True, env=dict(env, UNITTEST_RICKLE_VAR=value))
+                    self.assertEqual(forwarded.returncode, 0, msg=forwarded.stderr)
+                    self.assertIn(value, forwarded.stdout)
+                    self.assertEqual(forwarded.stdout, local.stdout)
+
+                command_rickle = f'{self.python_command} -m {self.rickled_command} daemon status --socket "{socket_path}"'
+                status = subprocess.run(command_rickle, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                status = json.loads(status.stdout)
+                self.assertEqual(status['requests'], 4)
+                self.assertEqual(status['cached'], 1)
+            finally:
+                subprocess.run(f'{self.python_command} -m {self.rickled_command} daemon stop --socket "{socket_path}"',
+                               shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                daemon.wait(timeout=10)
+
+            self.assertFalse(socket_path.exists())
+
     def test_cli_schema_gen(self):
         command_cat = f'{self.cat_command} "{str(self.yaml_file)}"'
 
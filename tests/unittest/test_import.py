@@ -0,0 +1,39 @@
+import json
+import subprocess
+import sys
+import unittest
+
+from rickle.tools import is_available, optional_import
+
+
+class TestImport(unittest.TestCase):
+
+    @staticmethod
+    def _loaded_modules(statement):
+        code = f"{statement}\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))"
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        return set(json.loads(result.stdout))
+
+    def test_import_rickle(self):
+        modules = self._loaded_modules('import rickle')
+        for name in ['requests', 'tomli_w', 'inspect', 'rickle.schema', 'rickle.net']:
+            self.assertNotIn(name, modules)
+
+    def test_import_cli(self):
+        modules = self._loaded_modules('from rickle.cli import main')
+        for name in ['requests', 'tomli_w', 'rickle.cli.obj', 'rickle.cli.serve', 'rickle.schema', 'twisted']:
+            self.assertNotIn(name, modules)
+
+    def test_optional_import(self):
+        self.assertTrue(is_available('json'))
+        self.assertFalse(is_available('rickle_no_such_module'))
+        self.assertIsNone(optional_import('rickle_no_such_module'))
+        self.assertIs(optional_import('json'), json)
+
+        hits = is_available.cache_info().hits
+        is_available('rickle_no_such_module')
+        self.assertEqual(is_available.cache_info().hits, hits + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,16 @@
 import unittest
-from rickle import Rickle
+from rickle import Rickle, UnsafeRickle, HotLoad
+from rickle.tools import register_secret_provider, secret_cache, ColumnarTable, http_fetch
+from rickle.snapshot import MappedRickle
 import os
 import base64
+import datetime
+import copy
+import pickle
 import tempfile
 import json
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
 from io import StringIO
 
 class TestBaseRickle(unittest.TestCase):
@@ -88,12 +95,102 @@ class TestBaseRickle(unittest.TestCase):
 
         self.assertDictEqual(actual_data, expected_data)
 
+    def test_add_csv_columnar(self):
+        csv_content = "id,name,score\n1,Alice,0.5\n2,Bob,1.5\n3,Carol,2"
+
+        self.rickle.add_csv("table", file_path_or_str=csv_content, columnar=True, key_column='id')
+        table = self.rickle.table
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.dtype('id'), 'integer')
+        self.assertEqual(table.dtype('score'), 'number')
+        self.assertEqual(table.dtype('name'), 'string')
+        self.assertDictEqual(table[1], {'id': 2, 'name': 'Bob', 'score': 1.5})
+        self.assertDictEqual(table.lookup(3), {'id': 3, 'name': 'Carol', 'score': 2.0})
+        self.assertDictEqual(table.lookup('1'), {'id': 1, 'name': 'Alice', 'score': 0.5})
+        self.assertIsNone(table.lookup(4))
+        self.assertDictEqual(self.rickle.dict(), {'table': {'id': [1, 2, 3],
+                                                            'name': ['Alice', 'Bob', 'Carol'],
+                                                            'score': [0.5, 1.5, 2.0]}})
+
+        rickle = Rickle({'table': {'type': 'csv', 'file_path': './tests/placebos/test.csv', 'columnar': True}})
+        self.assertDictEqual(rickle.table[0], {"a": "j", "b": 1, "c": 0.2, "d": "o"})
+
+        # Leading zeros and underscores are not numbers, empty cells are missing
+        table = ColumnarTable({'zip': ['00501', '02134'], 'count': ['1_000', '2'], 'score': ['1', '', '2.5']})
+        self.assertListEqual(table.column('zip'), ['00501', '02134'])
+        self.assertEqual(table.dtype('count'), 'string')
+        self.assertEqual(table.dtype('score'), 'number')
+        self.assertListEqual(table.column('score'), [1.0, None, 2.5])
+        table = ColumnarTable.from_rows([['zip'], ['00501'], ['02134']], key_column='zip', dtypes={'zip': 'integer'})
+        self.assertDictEqual(table.lookup(501), {'zip': 501})
+        with self.assertRaises(ValueError):
+            ColumnarTable.from_rows([['id', 'name'], ['1', 'Alice', 'extra']])
+
+    def test_add_csv_stream(self):
+        rickle = Rickle({'rows': {'type': 'csv', 'file_path': './tests/placebos/test.csv', 'stream': True,
+                                  'load_as_rick': True}})
+
+        rows = rickle.rows
+        self.assertListEqual([row['a'] for row in rows], ['j', 'h', 'p'])
+        self.assertListEqual([row['a'] for row in rows], ['j', 'h', 'p'])
+        self.assertListEqual([len(chunk) for chunk in rows.chunks(2)], [2, 1])
+        self.assertDictEqual(rickle.dict(), dict())
+        self.assertTrue(rickle.dict(serialised=True)['rows']['stream'])
+
+        self.rickle.add_csv("raw", file_path_or_str="1,Alice\n2,Bob", stream=True)
+        self.assertListEqual(list(self.rickle.raw), [['1', 'Alice'], ['2', 'Bob']])
+
     def test_add_file(self):
 
         self.rickle.add_file("bowser", './tests/placebos/6D6172696F.txt')
         self.assertTrue(self.rickle.get("bowser").startswith("d061"))
 
 
+    def test_hot_load_members(self):
+        import pickle
+        rickle = Rickle(load_lambda=True)
+        rickle.add_file("text", file_path='./tests/placebos/test.csv', hot_load=True)
+        rickle.add_random_value("rnd", value_type='integer', value_properties={'min': 1, 'max': 1}, hot_load=True)
+
+        self.assertEqual(rickle.text.kwargs['file_path'], './tests/placebos/test.csv')
+        self.assertTrue(rickle.text().startswith('a,b,c,d'))
+        self.assertEqual(rickle('/rnd'), 1)
+        self.assertDictEqual(rickle.dict(), dict())
+
+        copied = pickle.loads(pickle.dumps(rickle.text))
+        self.assertEqual(copied(), rickle.text())
+        self.assertEqual(pickle.loads(pickle.dumps(rickle.rnd))(), 1)
+
+        with self.assertRaises(TypeError):
+            HotLoad()
+
+    def test_pickle(self):
+        import pickle
+        rickle = UnsafeRickle({'name': 'Bob', 'nested': {'items_list': [1, 2, 3]}}, load_lambda=True)
+        rickle.add_python('double', load="def double(x):\n    return x * 2", args={'x': 1})
+        rickle.add_random_value('rnd', value_type='integer', value_properties={'min': 2, 'max': 2}, hot_load=True)
+
+        copied = pickle.loads(pickle.dumps(rickle))
+        self.assertDictEqual(copied.dict(serialised=True), rickle.dict(serialised=True))
+        self.assertEqual(copied.double(x=21), 42)
+        self.assertEqual(copied.rnd(), 2)
+
+    def test_shared_memory(self):
+        rickle = Rickle({'name': 'Bob', 'born': datetime.date(1990, 1, 2), 'nested': {'items_list': [1, 2, 3]}})
+        shm = rickle.to_shared_memory()
+        try:
+            with Rickle.from_shared_memory(shm.name) as attached:
+                self.assertIsInstance(attached, MappedRickle)
+                self.assertDictEqual(attached.dict(), rickle.dict())
+                self.assertEqual(attached('/nested/items_list').list(), [1, 2, 3])
+        finally:
+            shm.close()
+            shm.unlink()
+
+        with self.assertRaises(TypeError):
+            Rickle({'value': {1, 2}}).to_shared_memory()
+
     def test_add_api(self):
         self.rickle.add_api("api_result", "https://official-joke-api.appspot.com/random_joke", load_as_rick=True)
         keys = self.rickle.get("api_result").keys()
@@ -101,6 +198,278 @@ class TestBaseRickle(unittest.TestCase):
         self.assertTrue('setup' in keys)
         self.assertTrue('punchline' in keys)
 
+    def test_add_api_conditional(self):
+        served = {'full': 0, 'not_modified': 0}
+
+        class ETagHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/error':
+                    # Fails once, then recovers
+                    served['error'] = served.get('error', 0) + 1
+                    if self.headers.get('If-None-Match') == '"e1"':
+                        self.send_response(304)
+                    else:
+                        self.send_response(503 if served['error'] == 1 else 200)
+                    self.send_header('ETag', f'"e{served["error"]}"')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if self.headers.get('If-None-Match') == '"v1"':
+                    served['not_modified'] += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                served['full'] += 1
+                body = json.dumps({'version': 1}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', '"v1"')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        httpd = HTTPServer(('localhost', 0), ETagHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://localhost:{httpd.server_address[1]}/config"
+            rickle = Rickle(load_lambda=True)
+            rickle.add_api("hot_api", url, hot_load=True)
+
+            self.assertDictEqual(rickle.hot_api(), {'version': 1})
+            self.assertDictEqual(rickle.hot_api(), {'version': 1})
+            self.assertDictEqual(served, {'full': 1, 'not_modified': 1})
+
+            # Error responses are not cached, so they are not replayed for a 304
+            error_url = f"http://localhost:{httpd.server_address[1]}/error"
+            self.assertEqual(http_fetch(error_url, as_json=False)[0], 503)
+            self.assertEqual(http_fetch(error_url, as_json=False)[0], 200)
+            self.assertEqual(served['error'], 2)
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+    def test_add_secret_batched(self):
+        calls = {'clients': 0, 'get_secret': 0, 'get_secrets': 0}
+
+        def create_client(provider_access_key):
+            calls['clients'] += 1
+            return provider_access_key['vault']
+
+        def get_secret(client, secret_id, secret_version, provider_access_key):
+            calls['get_secret'] += 1
+            return client[secret_id]
+
+        def get_secrets(client, secret_ids, provider_access_key):
+            calls['get_secrets'] += 1
+            return {secret_id: client[secret_id] for secret_id in secret_ids}
+
+        register_secret_provider('unittest', create_client, get_secret, get_secrets)
+
+        access_key = {'vault': {'user': 'admin', 'pass': 's3cr3t', 'conf': '{"port": 8080}'}}
+        base = {
+            'user': {'type': 'secret', 'provider': 'unittest', 'secret_id': 'user', 'provider_access_key': access_key},
+            'pass': {'type': 'secret', 'provider': 'unittest', 'secret_id': 'pass', 'provider_access_key': access_key},
+            'conf': {'type': 'secret', 'provider': 'unittest', 'secret_id': 'conf', 'provider_access_key': access_key,
+                     'load_as_rick': True},
+        }
+
+        rickle = Rickle(base)
+        self.assertEqual(rickle.user, 'admin')
+        self.assertEqual(rickle.conf.port, 8080)
+        self.assertDictEqual(calls, {'clients': 1, 'get_secret': 0, 'get_secrets': 1})
+
+        rickle.add_secret('again', secret_id='pass', provider='unittest', provider_access_key=access_key)
+        self.assertEqual(rickle.again, 's3cr3t')
+        self.assertDictEqual(calls, {'clients': 1, 'get_secret': 1, 'get_secrets': 1})
+
+        secret_cache.clear()
+        rickle = Rickle(base, RICKLE_SECRET_CACHE_TTL=60)
+        rickle.add_secret('again', secret_id='pass', provider='unittest', provider_access_key=access_key,
+                          hot_load=True)
+        self.assertEqual(rickle.again(), 's3cr3t')
+        self.assertDictEqual(calls, {'clients': 1, 'get_secret': 1, 'get_secrets': 2})
+        secret_cache.clear()
+
+        # Secrets of nested nodes are fetched in one batch for the whole document
+        rickle = Rickle({'database': {'user': base['user']}, 'servers': [{'pass': base['pass']}]}, deep=True)
+        self.assertEqual(rickle.database.user, 'admin')
+        self.assertEqual(rickle.servers[0].get('pass'), 's3cr3t')
+        self.assertDictEqual(calls, {'clients': 1, 'get_secret': 1, 'get_secrets': 3})
+
+        # Dictionaries in lists are data, not secrets, also when malformed
+        rows = [{'type': 'secret', 'note': 'x'}, base['user'], base['pass']]
+        rickle = Rickle({'rows': rows}, deep=True)
+        self.assertDictEqual(rickle.rows[0].dict(), rows[0])
+        self.assertEqual(rickle.rows[1].secret_id, 'user')
+        self.assertDictEqual(calls, {'clients': 1, 'get_secret': 1, 'get_secrets': 3})
+
+
+class TestFlatRickle(unittest.TestCase):
+
+    data = {
+        'name': 'Bob',
+        'servers': [{'host': 'alpha', 'ports': [80, 443]}, 'beta'],
+        'deep': {'er': {'est': None}},
+    }
+
+    def test_iter_flat(self):
+        rickle = Rickle(self.data, deep=True)
+        flat = list(rickle.iter_flat())
+        self.assertListEqual(flat, [('/name', 'Bob'),
+                                    ('/servers/[0]/host', 'alpha'),
+                                    ('/servers/[0]/ports/[0]', 80),
+                                    ('/servers/[0]/ports/[1]', 443),
+                                    ('/servers/[1]', 'beta'),
+                                    ('/deep/er/est', None)])
+        for path, value in flat:
+            self.assertEqual(rickle.get(path), value)
+        # Lists of dictionaries are walked when not internalized too
+        self.assertListEqual(list(Rickle(self.data).iter_flat(prefix='/config/')),
+                             [('/config' + path, value) for path, value in flat])
+
+        loaded = Rickle.from_flat((('/config' + path, value) for path, value in flat), prefix='/config/')
+        self.assertDictEqual(loaded.dict(), self.data)
+        self.assertEqual(loaded.servers[0].host, 'alpha')
+        with self.assertRaises(ValueError):
+            Rickle.from_flat({'/name': 'Bob'}, prefix='/config/')
+
+    def test_iter_flat_diff(self):
+        old = Rickle(self.data, deep=True)
+        self.assertListEqual(list(Rickle(self.data).iter_flat_diff(old)), list())
+
+        new = Rickle(self.data, deep=True)
+        new.set('/name', 'Alice')
+        new.servers[0].ports.pop()
+        new.put('/deep', 1)
+        new.put('/owner/name', 'team')
+        self.assertListEqual(list(new.iter_flat_diff(old)), [('put', '/name', 'Alice'),
+                                                            ('delete', '/servers/[0]/ports/[1]', None),
+                                                            ('delete', '/deep/er/est', None),
+                                                            ('put', '/deep', 1),
+                                                            ('put', '/owner/name', 'team')])
+        # Equal but of another type
+        self.assertListEqual(list(Rickle({'a': True}).iter_flat_diff(Rickle({'a': 1}))), [('put', '/a', True)])
+
+
+class TestDiffRickle(unittest.TestCase):
+
+    old = {
+        'name': 'Bob',
+        'servers': [{'host': 'alpha', 'ports': [80, 443]}, 'beta', 'gamma'],
+        'deep': {'er': {'est': None}},
+        'strange key': 1,
+    }
+    new = {
+        'name': 'Alice',
+        'servers': [{'host': 'alpha', 'ports': [80]}, 'beta'],
+        'deep': 1,
+        'strange key': 2,
+        'owner': {'names': ['team']},
+    }
+
+    def test_diff(self):
+        old = Rickle(copy.deepcopy(self.old), deep=True)
+        new = Rickle(copy.deepcopy(self.new), deep=True)
+        self.assertListEqual(old.diff(Rickle(copy.deepcopy(self.old))), list())
+        self.assertListEqual(old.diff(new), [{'op': 'replace', 'path': '/name', 'value': 'Alice'},
+                                             {'op': 'remove', 'path': '/servers/[0]/ports/[1]'},
+                                             {'op': 'remove', 'path': '/servers/[2]'},
+                                             {'op': 'replace', 'path': '/deep', 'value': 1},
+                                             {'op': 'replace', 'path': '/strange key', 'value': 2},
+                                             {'op': 'add', 'path': '/owner', 'value': {'names': ['team']}}])
+        with self.assertRaises(ValueError):
+            old.diff(Rickle([{'name': 'Bob'}]))
+
+    def test_apply_patch(self):
+        for deep in [False, True]:
+            old = Rickle(copy.deepcopy(self.old), deep=deep)
+            new = Rickle(copy.deepcopy(self.new), deep=deep)
+            old.apply_patch(old.diff(new))
+            self.assertDictEqual(old.dict(), self.new)
+            self.assertListEqual(old.diff(new), list())
+
+        rickle = Rickle({'names': ['Bob']})
+        rickle.apply_patch([{'op': 'add', 'path': '/names/[0]', 'value': 'Alice'}])
+        self.assertListEqual(rickle.names, ['Alice', 'Bob'])
+        with self.assertRaises(KeyError):
+            rickle.apply_patch([{'op': 'remove', 'path': '/missing'}])
+        with self.assertRaises(KeyError):
+            rickle.apply_patch([{'op': 'replace', 'path': '/names/[2]', 'value': 'Eve'}])
+        with self.assertRaises(ValueError):
+            rickle.apply_patch([{'op': 'move', 'path': '/names'}])
+
+
+class TestDigestRickle(unittest.TestCase):
+
+    data = {
+        'name': 'Bob',
+        'servers': [{'host': 'alpha', 'ports': [80, 443]}, 'beta'],
+        'deep': {'er': {'est': None}},
+    }
+
+    def test_digest(self):
+        rickle = Rickle(copy.deepcopy(self.data), deep=True)
+        digest = rickle.digest()
+        self.assertEqual(len(digest), 64)
+        # Stable, independent of key order and of internalized lists
+        self.assertEqual(Rickle({k: self.data[k] for k in reversed(self.data)}).digest(), digest)
+        self.assertNotEqual(Rickle({'a': 1}).digest(), Rickle({'a': True}).digest())
+        self.assertEqual(rickle.digest('/deep/er'), Rickle(self.data['deep']['er']).digest())
+        self.assertEqual(rickle.digest('/servers/[0]/ports'), rickle.servers[0].digest('/ports'))
+
+        loaded = pickle.loads(pickle.dumps(rickle))
+        self.assertNotIn('_digests', loaded.__dict__)
+        self.assertEqual(loaded.digest(), digest)
+
+    def test_invalidation(self):
+        rickle = Rickle(copy.deepcopy(self.data), deep=True)
+        digest = rickle.digest()
+        deep_digest = rickle.digest('/deep')
+
+        changes = [
+            (lambda: setattr(rickle.deep.er, 'est', 1), lambda: rickle.set('/deep/er/est', None)),
+            (lambda: rickle.servers[0].__setitem__('host', 'gamma'), lambda: setattr(rickle.servers[0], 'host', 'alpha')),
+            (lambda: rickle.put('/deep/er/new', 1), lambda: rickle.remove('/deep/er/new')),
+            (lambda: rickle.apply_patch([{'op': 'add', 'path': '/servers/[0]/ports/[2]', 'value': 8080}]),
+             lambda: rickle.apply_patch([{'op': 'remove', 'path': '/servers/[0]/ports/[2]'}])),
+        ]
+        for change, revert in changes:
+            change()
+            self.assertNotEqual(rickle.digest(), digest)
+            revert()
+            self.assertEqual(rickle.digest(), digest)
+
+        # Only the changed path is invalidated
+        rickle.name = 'Alice'
+        self.assertEqual(rickle.deep.__dict__['_digests'][False], deep_digest)
+        self.assertDictEqual(rickle.__dict__['_digests'], dict())
+
+    def test_mutated_values(self):
+        a = Rickle({'svc': {'name': 'web', 'ports': [80]}})
+        b = Rickle({'svc': {'name': 'web', 'ports': [80]}})
+        self.assertListEqual(a.diff(b), list())
+        digest = a.digest()
+
+        # Lists held as values are changed in place, without the node noticing
+        a.svc.ports.append(8080)
+        self.assertNotEqual(a.digest(), digest)
+        self.assertListEqual(b.diff(a), [{'op': 'add', 'path': '/svc/ports/[1]', 'value': 8080}])
+
+        # Nodes shared by several parents invalidate all of them
+        shared = Rickle({'name': 'web'})
+        first, second = Rickle({'a': 1}), Rickle({'b': 2})
+        first.svc = shared
+        second.svc = shared
+        digests = first.digest(), second.digest()
+        shared.name = 'api'
+        self.assertNotEqual(first.digest(), digests[0])
+        self.assertNotEqual(second.digest(), digests[1])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
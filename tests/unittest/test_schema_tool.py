@@ -1,5 +1,6 @@
+import array
 import unittest
-from rickle.schema import Schema
+from rickle.schema import Schema, SchemaViolation, SchemaInferrer
 
 class TestAdvanced(unittest.TestCase):
 
@@ -353,3 +354,116 @@ class TestAdvanced(unittest.TestCase):
         schema = Schema.generate_from_obj(sample_data, include_extended_properties=False)
 
         self.assertDictEqual(schema.schema, expected_schema)
+
+class TestCompiled(unittest.TestCase):
+
+    def test_compile(self):
+        schema = Schema({
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'required': True},
+                'code': {'type': 'regex', 'pattern': '^[A-Z]{3}$', 'nullable': True},
+                'ports': {'type': 'array', 'items': [{'type': 'integer'}], 'max': 3},
+                'owner': {'type': 'object', 'nullable': True, 'properties': {'id': {'type': 'integer', 'required': True}}},
+            }
+        })
+
+        validate = schema.compile()
+        self.assertTrue(validate({'name': 'a', 'code': 'ABC', 'ports': [80, 443], 'owner': {'id': 1}}))
+        self.assertTrue(validate({'name': 'a', 'code': None, 'owner': None}))
+        self.assertFalse(validate({'name': 'a', 'ports': [80, '443']}))
+        self.assertFalse(validate({'name': 'a', 'ports': [1, 2, 3, 4]}))
+        self.assertFalse(validate({'name': 'a', 'owner': {}}))
+        self.assertFalse(validate({'code': 'ABC'}))
+
+        # Reused by validate, recompiled when the schema is replaced
+        self.assertTrue(schema.validate({'name': 'a'}))
+        self.assertIs(schema._compiled, validate)
+        schema.schema = {'type': 'object', 'properties': {'name': {'type': 'integer'}}}
+        self.assertFalse(schema.validate({'name': 'a'}))
+        self.assertIsNot(schema._compiled, validate)
+
+    def test_validate_many(self):
+        schema = Schema({
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'required': True},
+                'ports': {'type': 'array', 'items': [{'type': 'integer'}], 'max': 2},
+            }
+        })
+        objects = [{'name': 'a', 'ports': [80]},
+                   {'ports': [80, '443', 8080]},
+                   {'name': 1}] * 50
+
+        results = list(schema.validate_many(objects))
+        self.assertEqual(len(results), 150)
+        self.assertListEqual(results[0], [])
+        self.assertListEqual(results[1], [SchemaViolation('/name', 'required', 'missing'),
+                                          SchemaViolation('/ports', 'length <= 2', 'length == 3'),
+                                          SchemaViolation('/ports/[1]', 'integer', 'string')])
+        self.assertListEqual(results[2], [SchemaViolation('/name', 'string', 'integer')])
+
+        first = list(schema.validate_many(objects[:3], fail_fast=True))
+        self.assertListEqual(first[1], [SchemaViolation('/name', 'required', 'missing')])
+
+        self.assertListEqual(list(schema.validate_many(iter(objects), jobs=2, chunk_size=16)), results)
+
+    def test_scalar_arrays(self):
+        schema = Schema({
+            'type': 'object',
+            'properties': {
+                'values': {'type': 'array', 'items': [{'type': 'number'}]},
+                'counts': {'type': 'array', 'items': [{'type': 'integer'}], 'nullable': True},
+            }
+        })
+
+        self.assertTrue(schema.validate({'values': [0.5] * 1000, 'counts': list(range(1000))}))
+        self.assertTrue(schema.validate({'values': array.array('d', [0.5, 1.5]), 'counts': array.array('q', [1, 2])}))
+        self.assertTrue(schema.validate({'values': [], 'counts': None}))
+
+        values = [0.5] * 1000
+        values[700] = 'x'
+        results = list(schema.validate_many([{'values': values},
+                                             {'values': array.array('q', [1, 2])}]))
+        self.assertListEqual(results[0], [SchemaViolation('/values/[700]', 'number', 'string')])
+        self.assertListEqual(results[1], [SchemaViolation('/values/[0]', 'number', 'integer'),
+                                          SchemaViolation('/values/[1]', 'number', 'integer')])
+
+
+class TestInferrer(unittest.TestCase):
+
+    documents = [
+        {'id': 1, 'name': 'a', 'score': 1, 'tags': ['x', 'y'], 'meta': {'owner': None}},
+        {'id': 2, 'score': 2.5, 'tags': [], 'values': [1, 0.5], 'meta': {'owner': 'b'}},
+    ]
+
+    def test_infer(self):
+        schema = Schema.generate_from_stream(self.documents).schema
+        properties = schema['properties']
+
+        self.assertEqual(properties['id']['type'], 'integer')
+        self.assertTrue(properties['id']['required'])
+        self.assertFalse(properties['name']['required'])
+        self.assertEqual(properties['score']['type'], 'number')
+        self.assertEqual((properties['tags']['min'], properties['tags']['max']), (0, 2))
+        self.assertEqual(properties['tags']['items'][0]['type'], 'string')
+        self.assertEqual(properties['values']['items'][0]['type'], 'any')
+        self.assertTrue(properties['meta']['properties']['owner']['nullable'])
+        self.assertTrue(all(Schema(schema).validate(d) for d in self.documents))
+
+        without_extras = Schema.generate_from_stream(self.documents, include_extended_properties=False).schema
+        self.assertDictEqual(without_extras['properties']['meta'], {'type': 'object', 'properties': {'owner': {'type': 'string'}}})
+
+    def test_merge(self):
+        first = SchemaInferrer().update(self.documents[0])
+        second = SchemaInferrer().update(self.documents[1])
+        self.assertEqual(first.merge(second).count, 2)
+        self.assertDictEqual(first.schema().schema, Schema.generate_from_stream(self.documents).schema)
+
+        parallel = Schema.generate_from_stream(iter(self.documents * 20), jobs=2, chunk_size=3)
+        self.assertDictEqual(parallel.schema, first.schema().schema)
+
+    def test_max_properties(self):
+        inferrer = SchemaInferrer(max_properties=2)
+        inferrer.update_many({str(i): i} for i in range(10))
+        self.assertListEqual(list(inferrer.schema().schema['properties']), ['0', '1'])
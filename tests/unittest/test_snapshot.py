@@ -0,0 +1,152 @@
+import datetime
+import os
+import pickle
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+from rickle import Rickle
+from rickle.snapshot import read_snapshot, read_snapshot_header, write_snapshot, MappedRickle, encode_mapped, \
+    SNAPSHOT_MAGIC, SNAPSHOT_FORMAT
+
+
+class _Payload:
+
+    def __reduce__(self):
+        return os.getcwd, ()
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = Path(self.temp_dir.name, 'config.yaml')
+        self.source.write_text("name: Bob\nnested:\n  ages: [1, 2, 3]\n  'strange key': true\n")
+        self.snapshot = Path(self.temp_dir.name, 'config.snapshot')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_save_load(self):
+        rickle = Rickle(str(self.source))
+        rickle.save_snapshot(self.snapshot)
+
+        header = read_snapshot_header(self.snapshot)
+        self.assertEqual(header['source'], str(self.source.resolve()))
+        self.assertEqual(header['class'], 'Rickle')
+
+        loaded = Rickle.load_snapshot(self.snapshot)
+        self.assertDictEqual(loaded.dict(), rickle.dict())
+        self.assertEqual(loaded('/nested/strange key'), True)
+
+    def test_invalidation(self):
+        Rickle(str(self.source)).save_snapshot(self.snapshot)
+        self.assertIsNotNone(read_snapshot(self.snapshot))
+
+        self.source.write_text("name: Alice\n")
+        stat = self.source.stat()
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertIsNone(read_snapshot(self.snapshot))
+
+        # Rebuilt from the recorded source, and saved again
+        loaded = Rickle.load_snapshot(self.snapshot)
+        self.assertDictEqual(loaded.dict(), {'name': 'Alice'})
+        self.assertIsNotNone(read_snapshot(self.snapshot))
+
+    def test_missing(self):
+        with self.assertRaises(ValueError):
+            Rickle.load_snapshot(self.snapshot)
+
+        loaded = Rickle.load_snapshot(self.snapshot, source=str(self.source))
+        self.assertEqual(loaded.name, 'Bob')
+        self.assertTrue(self.snapshot.is_file())
+
+    def test_corrupt_header(self):
+        header = b'\xff{not json'
+        self.snapshot.write_bytes(struct.pack('<8sHI', SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(header)) + header)
+        self.assertIsNone(read_snapshot_header(self.snapshot))
+        self.assertIsNone(read_snapshot(self.snapshot))
+
+    def test_untrusted(self):
+        write_snapshot(_Payload(), self.snapshot, source=self.source)
+        with self.assertRaises(pickle.UnpicklingError):
+            Rickle.load_snapshot(self.snapshot)
+        self.assertEqual(read_snapshot(self.snapshot, trusted=True), os.getcwd())
+
+    def test_failed_write(self):
+        self.snapshot.mkdir()
+        with self.assertRaises(OSError):
+            Rickle(str(self.source)).save_snapshot(self.snapshot)
+        self.assertListEqual(sorted(p.name for p in Path(self.temp_dir.name).iterdir()),
+                             ['config.snapshot', 'config.yaml'])
+
+
+class TestMappedRickle(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            'name': 'Bob',
+            'age': 2 ** 70,
+            'score': 0.5,
+            'active': True,
+            'nothing': None,
+            'servers': [
+                {'name': 'alpha', 'port': 8080},
+                {'name': 'beta', 'port': 8081, 'tags': ['a', 'b']},
+            ],
+            'nested': {'deeper': {'name': 'deepest'}},
+        }
+        self.rickle = Rickle(self.data, deep=True)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot = Path(self.temp_dir.name, 'config.mapped')
+        self.rickle.save_snapshot(self.snapshot, mapped=True)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_access(self):
+        with MappedRickle(self.snapshot) as mapped:
+            self.assertEqual(mapped.name, 'Bob')
+            self.assertEqual(mapped.get('age'), 2 ** 70)
+            self.assertIsNone(mapped.get('nothing', 'default'))
+            self.assertEqual(mapped.get('missing', 'default'), 'default')
+            self.assertEqual(mapped('/servers/[1]/tags/[0]'), 'a')
+            self.assertEqual(mapped.servers[-1].port, 8081)
+            self.assertEqual(len(mapped.servers), 2)
+            self.assertIsInstance(mapped.nested, MappedRickle)
+            self.assertEqual(mapped.get('/nested/deeper/name'), 'deepest')
+            self.assertIsNone(mapped.get('/nested/nope/name'))
+            self.assertDictEqual(mapped.dict(), self.rickle.dict())
+            self.assertDictEqual(mapped.nested.to_rickle().dict(), self.data['nested'])
+            with self.assertRaises(TypeError):
+                mapped.name = 'Alice'
+
+    def test_search_path(self):
+        with MappedRickle(self.snapshot) as mapped:
+            self.assertListEqual(mapped.search_path('name'), self.rickle.search_path('name'))
+            self.assertListEqual(mapped.search_path('port', report_parent=True),
+                                 self.rickle.search_path('port', report_parent=True))
+            self.assertListEqual(mapped.search_path('missing'), list())
+            self.assertListEqual(mapped.nested.search_path('name'), ['/deeper/name'])
+            self.assertTrue(mapped.has('tags', deep=True))
+
+    def test_buffer(self):
+        mapped = MappedRickle(encode_mapped(self.rickle))
+        self.assertEqual(mapped('/servers/[0]/name'), 'alpha')
+        mapped.close()
+
+    def test_pickle(self):
+        with self.assertRaises(TypeError):
+            encode_mapped({'value': {1, 2}})
+        encoded = encode_mapped({'value': {1, 2}, 'born': datetime.date(1990, 1, 2)}, allow_pickle=True)
+        with MappedRickle(encoded) as mapped:
+            self.assertEqual(mapped.born, datetime.date(1990, 1, 2))
+            with self.assertRaises(ValueError):
+                mapped.get('value')
+        with MappedRickle(encoded, allow_pickle=True) as mapped:
+            self.assertEqual(mapped.value, {1, 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
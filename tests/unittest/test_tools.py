@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from rickle.tools import detect_format, infer_read_string_type, infer_read_file_type, classify_string, file_type_reader
+from rickle.tools import flatten_dict, iter_flatten, inflate_dict
+
+
+class TestFormat(unittest.TestCase):
+
+    samples = {
+        'json': '{"name": "Bob", "ages": [1, 2]}',
+        'yaml': '# People\nname: Bob\nages:\n  - 1\n  - 2\n',
+        'toml': 'name = "Bob"\nages = [1, 2]\n\n[address]\ncity = "Cape Town"\n',
+        'ini': '[person]\nname = Bob\nage = 2\n',
+        'xml': '<?xml version="1.0"?>\n<person><name>Bob</name></person>',
+    }
+
+    def test_detect_format(self):
+        for format_type, sample in self.samples.items():
+            self.assertEqual(detect_format(sample), format_type)
+            self.assertEqual(detect_format(sample.encode('utf-8')), format_type)
+            self.assertEqual(classify_string(sample), format_type)
+
+        self.assertEqual(detect_format('[1, 2]'), 'json')
+        self.assertEqual(detect_format('["a"]'), 'json')
+        self.assertEqual(detect_format('[1]'), 'json')
+        self.assertEqual(detect_format('[1]\n[2]\n'), 'json')
+        self.assertEqual(detect_format('["a"]\nname = "Bob"\n'), 'toml')
+        self.assertEqual(detect_format('export NAME=Bob\n'), 'env')
+        self.assertIsNone(detect_format('Bob'))
+        self.assertIsNone(detect_format('[names]'))
+
+    def test_infer_read(self):
+        self.assertDictEqual(infer_read_string_type(self.samples['toml']),
+                             {'name': 'Bob', 'ages': [1, 2], 'address': {'city': 'Cape Town'}})
+        self.assertDictEqual(infer_read_string_type(self.samples['ini']), {'person': {'name': 'Bob', 'age': '2'}})
+        # Not detected, tried in turn
+        self.assertEqual(infer_read_string_type('Bob'), 'Bob')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = Path(temp_dir, 'config.conf')
+            config_file.write_text(self.samples['toml'])
+            self.assertEqual(infer_read_file_type(config_file)['address']['city'], 'Cape Town')
+
+        self.assertIs(file_type_reader('.yml'), file_type_reader('.YAML'))
+        self.assertIsNone(file_type_reader('.conf'))
+
+
+class TestFlatten(unittest.TestCase):
+
+    nested = {
+        'name': 'Bob',
+        'servers': [{'host': 'alpha', 'ports': [80, 443]}, 'beta'],
+        'empty': {},
+        'deep': {'er': {'est': None}},
+    }
+
+    def test_flatten(self):
+        flat = flatten_dict(self.nested, path_sep='.')
+        self.assertListEqual(list(flat.items()), [('name', 'Bob'),
+                                                  ('servers.(0).host', 'alpha'),
+                                                  ('servers.(0).ports.(0)', 80),
+                                                  ('servers.(0).ports.(1)', 443),
+                                                  ('servers.(1)', 'beta'),
+                                                  ('deep.er.est', None)])
+        self.assertListEqual(list(iter_flatten(self.nested, path_sep='.')), list(flat.items()))
+        self.assertDictEqual(flatten_dict([[1], 2], path_sep='/', list_brackets=('[', ']')), {'[0]/[0]': 1, '[1]': 2})
+        self.assertDictEqual(flatten_dict('Bob'), {})
+
+        # Deeper than the recursion limit
+        deep = leaf = dict()
+        for _ in range(5000):
+            leaf['a'] = dict()
+            leaf = leaf['a']
+        leaf['a'] = 1
+        self.assertEqual(len(next(iter(flatten_dict(deep, path_sep='.')))), 5001 * 2 - 1)
+
+    def test_round_trip(self):
+        nested = {k: v for k, v in self.nested.items() if k != 'empty'}
+        self.assertDictEqual(inflate_dict(flatten_dict(nested, path_sep='.'), path_sep='.'), nested)
+
+    def test_inflate(self):
+        flat = {'servers/[2]': 'gamma', 'servers/[0]/host': 'alpha', 'servers/[1]': 'beta', 'servers/[0]/port': 80}
+        self.assertDictEqual(inflate_dict(flat, path_sep='/', list_brackets=('[', ']')),
+                             {'servers': [{'host': 'alpha', 'port': 80}, 'beta', 'gamma']})
+        self.assertDictEqual(inflate_dict({'a.(1)': 1}, path_sep='.'), {'a': [None, 1]})
+        # Not only indices, stays a dictionary
+        self.assertDictEqual(inflate_dict({'a.(0)': 1, 'a.b': 2}, path_sep='.'), {'a': {'(0)': 1, 'b': 2}})
+        with self.assertRaises(ValueError):
+            inflate_dict({'a': 1, 'a.b': 2}, path_sep='.')
+        with self.assertRaises(ValueError):
+            inflate_dict({'a': None, 'a.b': 2}, path_sep='.')
+        with self.assertRaises(ValueError):
+            inflate_dict({'a.b': 2, 'a': None}, path_sep='.')
+        with self.assertRaises(ValueError):
+            inflate_dict({'a.b': 1, 'a': 2}, path_sep='.')
+        # Top-level indices are keys
+        self.assertDictEqual(inflate_dict({'(0)': 1, '(1).a': 2}, path_sep='.'), {'(0)': 1, '(1)': {'a': 2}})
+
+
+if __name__ == "__main__":
+    unittest.main()